@@ -0,0 +1,68 @@
+"""
+Benchmark: the consolidated analytics query vs. the original five per-aggregate queries.
+
+Runs both against the Neo4j instance from .env for an existing user, checks they agree and
+reports wall time per page load and total DB hits (from PROFILE).
+
+    python Benchmarks/bench_analytics.py <username> [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.Neo4j_Connection import Connect
+from Modules.GetAnalytics import ANALYTICS_QUERY
+from Modules.TasteProfiles import ensure_profile
+
+LEGACY_QUERIES = {
+    "total_ratings": "MATCH (u:User {username: $user})-[:RATED]->(m:Movie) RETURN count(*) AS total_ratings",
+    "avg_rating": "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie) RETURN avg(r.rating) AS avg_rating",
+    "rating_dist": "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie) RETURN r.rating AS rating, count(*) AS count ORDER BY rating",
+    "genre_dist": "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie)-[:HAS_GENRE]->(g:Genre) RETURN g.type AS genre, count(*) AS count, avg(r.rating) AS avg_rating ORDER BY count DESC",
+    "largest_disparity": "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie) WHERE m.averageRating IS NOT NULL RETURN m.primaryTitle AS title, m.startYear AS year, r.rating AS user_rating, m.averageRating / 2 AS avg_rating, ABS(r.rating - (m.averageRating / 2)) AS diff ORDER BY diff DESC LIMIT 1",
+}
+
+
+def db_hits(plan):
+    return plan.get("dbHits", 0) + sum(db_hits(child) for child in plan.get("children", []))
+
+
+def profile(db, query, params):
+    with db.session() as session:
+        summary = session.run("PROFILE " + query, params).consume()
+    return db_hits(summary.profile)
+
+
+def time_it(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    user = sys.argv[1]
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    db = Connect()
+    ensure_profile(user, db)
+    params = {"user": user}
+
+    legacy = {key: db.run_query(query, params) for key, query in LEGACY_QUERIES.items()}
+    fused = dict(db.run_query(ANALYTICS_QUERY, params)[0])
+    assert legacy["total_ratings"][0]["total_ratings"] == fused["total_ratings"]
+    assert [(r["rating"], r["count"]) for r in legacy["rating_dist"]] == list(zip(fused["rating_dist"]["rating"], fused["rating_dist"]["count"]))
+    assert {r["genre"]: r["count"] for r in legacy["genre_dist"]} == dict(zip(fused["genre_dist"]["genre"], fused["genre_dist"]["count"]))
+
+    legacy_ms = time_it(lambda: [db.run_query(q, params) for q in LEGACY_QUERIES.values()], repeats)
+    fused_ms = time_it(lambda: db.run_query(ANALYTICS_QUERY, params), repeats)
+    legacy_hits = sum(profile(db, q, params) for q in LEGACY_QUERIES.values())
+    fused_hits = profile(db, ANALYTICS_QUERY, params)
+
+    print(f"legacy (5 queries): {legacy_ms:8.2f} ms/page  {legacy_hits:>10,} db hits")
+    print(f"consolidated:       {fused_ms:8.2f} ms/page  {fused_hits:>10,} db hits")
+    print(f"speedup: {legacy_ms / fused_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: sequential sync queries vs. fanning them out on the async access layer (Database/Neo4j_Async).
+
+Uses stand-in drivers with an injected per-query round-trip latency, so it needs no database.
+
+    python Benchmarks/bench_async_fanout.py [latency_ms] [queries]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.Neo4j_Connection import Neo4jConnection
+from Database.Neo4j_Async import AsyncNeo4jConnection, run_async
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        for row in self.rows:
+            yield row
+
+    async def fetch(self, n):
+        batch, self.rows = self.rows[:n], self.rows[n:]
+        return batch
+
+    def consume(self):
+        self.rows = []
+        return FakeSummary()
+
+
+class FakeAsyncResult(FakeResult):
+    async def consume(self):
+        return FakeResult.consume(self)
+
+
+class FakeSummary:
+    result_available_after = 0
+    result_consumed_after = 0
+
+
+class FakeSession:
+    def __init__(self, latency, rows):
+        self.latency = latency
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSyncSession(FakeSession):
+    def run(self, query, parameters=None):
+        time.sleep(self.latency)
+        return FakeResult({"i": i} for i in range(self.rows))
+
+
+class FakeAsyncSession(FakeSession):
+    async def run(self, query, parameters=None):
+        await asyncio.sleep(self.latency)
+        return FakeAsyncResult({"i": i} for i in range(self.rows))
+
+
+class FakeDriver:
+    def __init__(self, session_cls, latency, rows=100):
+        self.session_cls = session_cls
+        self.latency = latency
+        self.rows = rows
+
+    def session(self, **config):
+        return self.session_cls(self.latency, self.rows)
+
+
+def main():
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 20) / 1000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    queries = [(f"RETURN {i}", {}) for i in range(n_queries)]
+
+    sync_db = Neo4jConnection.__new__(Neo4jConnection)
+    sync_db.driver = FakeDriver(FakeSyncSession, latency)
+    async_db = AsyncNeo4jConnection(FakeDriver(FakeAsyncSession, latency))
+
+    start = time.perf_counter()
+    sequential = [sync_db.run_query(q, p) for q, p in queries]
+    sequential_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    gathered = run_async(async_db.gather(*queries))
+    gathered_ms = (time.perf_counter() - start) * 1000
+    assert [len(r) for r in sequential] == [len(r) for r in gathered]
+
+    streamed = sum(1 for _ in async_db.iter_records("RETURN 1", batch_size=7))
+    assert streamed == 100
+
+    print(f"{n_queries} queries @ {latency * 1000:.0f} ms round trip")
+    print(f"sequential sync: {sequential_ms:8.1f} ms")
+    print(f"async gather:    {gathered_ms:8.1f} ms  ({sequential_ms / gathered_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
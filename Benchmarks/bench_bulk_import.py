@@ -0,0 +1,124 @@
+"""
+Benchmark: bulk Letterboxd import (Modules/BulkRatings) vs. submitting the same ratings one at a time.
+
+Builds a synthetic catalogue and title index, writes a Letterboxd-style CSV with some typos,
+punctuation changes and off-by-one years, and imports it against a stand-in database that
+charges a fixed latency per round trip. Reports match statistics, round trips and wall time;
+the one-at-a-time figure is what the same ratings cost through the Submit button.
+
+    python Benchmarks/bench_bulk_import.py [rows] [movies]
+"""
+import io
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Modules.BulkRatings import TitleResolver, import_ratings
+from Modules.MovieSearch import MovieSearchIndex
+
+ROUND_TRIP_SECONDS = 0.002
+WORDS = ["night", "love", "dark", "city", "last", "star", "river", "secret", "king", "road", "blue", "ghost",
+         "summer", "war", "house", "dream", "fire", "lost", "world", "heart"]
+
+
+class FakeTx:
+    def run(self, query, parameters=None):
+        rows = len(parameters.get("ratings", [])) if parameters else 0
+        return FakeResult(rows)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def single(self):
+        return {"written": self.rows}
+
+    def consume(self):
+        return None
+
+
+class FakeSession:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work):
+        self.db.round_trips += 1
+        time.sleep(ROUND_TRIP_SECONDS)
+        return work(FakeTx())
+
+
+class FakeDB:
+    def __init__(self):
+        self.round_trips = 0
+
+    def session(self, **config):
+        return FakeSession(self)
+
+
+def synthetic_catalogue(n, rng):
+    titles = set()
+    while len(titles) < n:
+        titles.add(" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))).title())
+    return pd.DataFrame({
+        "tconst": [f"tt{i:07d}" for i in range(n)],
+        "title": list(titles),
+        "year": [rng.randint(1950, 2024) for _ in range(n)],
+        "numVotes": [rng.randint(25_000, 2_000_000) for _ in range(n)],
+    })
+
+
+def letterboxd_csv(movies, n, rng):
+    """Mostly exact rows, plus typos, punctuation, off-by-one years and films not in the catalogue"""
+    rows = []
+    for _ in range(n):
+        movie = movies.iloc[rng.randrange(len(movies))]
+        title, year, kind = movie["title"], int(movie["year"]), rng.random()
+        if kind < 0.05:
+            i = rng.randrange(1, len(title) - 1)
+            title = title[:i] + title[i + 1:]
+        elif kind < 0.10:
+            title = title.replace(" ", ": ", 1)
+        elif kind < 0.15:
+            year += rng.choice([-1, 1])
+        elif kind < 0.20:
+            title = f"Obscure Short Film {rng.randint(0, 10**6)}"
+        rows.append({"Date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "Name": title,
+                     "Year": year, "Letterboxd URI": "https://boxd.it/x", "Rating": rng.choice([1, 2.5, 3, 3.5, 4, 4.5, 5])})
+    return pd.DataFrame(rows).to_csv(index=False)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000
+    n_movies = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    rng = random.Random(5)
+
+    movies = synthetic_catalogue(n_movies, rng)
+    start = time.perf_counter()
+    resolver = TitleResolver(MovieSearchIndex(movies))
+    print(f"Title index for {n_movies} movies built in {time.perf_counter() - start:.2f}s (once per index reload)")
+
+    csv = letterboxd_csv(movies, n_rows, rng)
+    db = FakeDB()
+    result = import_ratings("bench", io.StringIO(csv), db=db, resolver=resolver)
+
+    print(f"{result['rows']} rows: {result['matched']} matched {result['match_methods']}, "
+          f"{len(result['unmatched'])} not found, {result['duplicates']} repeats")
+    print(f"bulk import:   {db.round_trips:5d} round trips  {result['seconds']:6.2f} s")
+    one_at_a_time = result["written"] * ROUND_TRIP_SECONDS
+    print(f"one at a time: {result['written']:5d} round trips  {one_at_a_time:6.2f} s of round-trip latency alone "
+          f"({ROUND_TRIP_SECONDS * 1000:.0f} ms each)")
+
+
+if __name__ == "__main__":
+    main()
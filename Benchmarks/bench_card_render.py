@@ -0,0 +1,99 @@
+"""
+Benchmark: paginated, class-styled recommendation cards vs. the original inline-styled renderer.
+
+Builds synthetic recommendations and compares the HTML sent to the browser (payload bytes and
+st.markdown calls) and the time to build it, for the full result list vs. one page.
+
+    python Benchmarks/bench_card_render.py [recommendations] [page_size]
+"""
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Modules.RecommendationCards import CARD_CSS, render_cards_html, role_map
+
+
+def legacy_card_html(rec):
+    """The per-card HTML display_recommendations() built before pagination"""
+    html_parts = []
+    html_parts.append("<div style='background:#1e1e1e;padding:20px;border-radius:16px;border:1px solid #444;margin-bottom:25px;box-shadow:0 4px 12px rgba(0,0,0,0.3);color:white;font-family:sans-serif;'>")
+    html_parts.append(f"<h2 style='margin-bottom:8px;'>🎬 {rec.get('recommendation')} <span style='font-size:0.7em; color:gray;'>({rec.get('rec_year')})</span></h2>")
+    genre_tags = " ".join([
+        f"<span style='background:#FF5C5C; color:white; padding:4px 8px; border-radius:8px; font-size:0.8em; margin-right:5px;'>{g}</span>"
+        for g in rec.get('all_genres') or []
+    ])
+    html_parts.append(f"<div style='margin-bottom:8px;'>{genre_tags}</div>")
+    html_parts.append(f"<p style='margin:2px 0;'><strong>Runtime:</strong> {rec.get('rec_runtime')} mins</p>")
+    html_parts.append(f"<p style='margin:2px 0;'><strong>Avg Rating:</strong> {round(rec.get('rec_rating')/2, 2)}/5 ⭐ | <strong>Votes:</strong> {rec.get('rec_votes'):,}</p>")
+    html_parts.append(f"<p style='margin:2px 0;'><strong>Recommendation Score:</strong> <span style='color:#ffd700;'>{rec.get('total_score', 0.0):.2f}</span></p>")
+    html_parts.append("""
+        <details style='margin-top:15px;'>
+            <summary style='cursor: pointer; font-weight:bold; font-size:1.05em; padding:4px 0;'>💡 Why was this recommended?</summary>
+            <div style='margin-top:8px; transition: all 0.3s ease; line-height:1.6;'>
+        """)
+    if rec['shared_actors']:
+        html_parts.append(f"<p style='margin:3px 0; font-weight:600;'>🎭 Familiar Actors:</p><p style='margin-left:12px; color:#ccc;'>{', '.join(rec.get('shared_actors'))}</p>")
+    if rec['shared_directors']:
+        html_parts.append(f"<p style='margin:3px 0; font-weight:600;'>🎬 Director(s):</p><p style='margin-left:12px; color:#ccc;'>{', '.join(rec.get('shared_directors'))}</p>")
+    crew_by_role = defaultdict(list)
+    for name, role in rec['shared_others']:
+        crew_by_role[role].append(name)
+    if crew_by_role:
+        html_parts.append("<p style='margin:3px 0; font-weight:600;'>🛠 Other Collaborators:</p><ul style='margin:0 0 0 15px;padding:0;list-style:none;color:#ccc;'>")
+        for role, people in sorted(crew_by_role.items()):
+            html_parts.append(f"<li style='margin:2px 0;'>└ {role_map.get(role, role.title())}: {', '.join(sorted(people))}</li>")
+        html_parts.append("</ul>")
+    html_parts.append("</div></details></div>")
+    return "".join(html_parts)
+
+
+def synthetic_recommendations(n, seed=3):
+    rng = random.Random(seed)
+    genres = ["Drama", "Comedy", "Action", "Thriller", "Sci-Fi", "Romance", "Horror"]
+    roles = ["WROTE", "PRODUCED", "EDITED", "SHOT", "CAST"]
+    return [{
+        "id": f"tt{i:07d}",
+        "recommendation": f"Movie Title Number {i}",
+        "rec_year": rng.randint(1950, 2024),
+        "rec_runtime": rng.randint(80, 180),
+        "rec_rating": rng.randint(40, 95) / 10,
+        "rec_votes": rng.randint(25_000, 2_000_000),
+        "total_score": rng.random() * 40,
+        "all_genres": rng.sample(genres, 3),
+        "shared_actors": [f"Actor {rng.randint(0, 500)}" for _ in range(rng.randint(0, 4))],
+        "shared_directors": [f"Director {rng.randint(0, 100)}" for _ in range(rng.randint(0, 1))],
+        "shared_composers": [],
+        "shared_others": [[f"Crew {rng.randint(0, 900)}", rng.choice(roles)] for _ in range(rng.randint(0, 5))],
+    } for i in range(n)]
+
+
+def timed(fn, repeats=200):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        out = fn()
+    return out, (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 75
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    recs = synthetic_recommendations(n)
+
+    legacy, legacy_ms = timed(lambda: [legacy_card_html(r) for r in recs])
+    page, page_ms = timed(lambda: f"<style>{CARD_CSS}</style>" + render_cards_html(recs[:page_size]))
+    everything, _ = timed(lambda: render_cards_html(recs), repeats=20)
+
+    legacy_bytes = sum(len(html.encode("utf-8")) for html in legacy)
+    page_bytes = len(page.encode("utf-8"))
+    print(f"{n} recommendations, {page_size} per page")
+    print(f"legacy (all cards, inline styles): {legacy_bytes / 1024:8.1f} KiB  {n:3d} st.markdown calls  {legacy_ms:6.2f} ms")
+    print(f"paginated (one page + stylesheet): {page_bytes / 1024:8.1f} KiB  {2:3d} st.markdown calls  {page_ms:6.2f} ms")
+    print(f"class-styled cards for all {n}:    {len(everything.encode('utf-8')) / 1024:8.1f} KiB")
+    print(f"payload per view: {legacy_bytes / page_bytes:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
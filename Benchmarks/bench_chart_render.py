@@ -0,0 +1,128 @@
+"""
+Benchmark: User Analytics chart preparation (Modules/Analytics_Utils) vs. the original per-element path.
+
+Follows the page's real path: get_analytics() parses the single aggregated ANALYTICS_QUERY row
+(served here by a stand-in database, aggregated from a synthetic user's ratings) into the
+rating and genre frames, a few dozen rows each, and safe_bar_chart() turns them into figures.
+Times, per page view:
+  - parsing the aggregated row into DataFrames,
+  - building the three bar charts (px.bar + .map label formatting vs. one-trace figures with
+    vectorized labels),
+  - a rerun with unchanged data, which the figure cache serves without rebuilding anything.
+
+    python Benchmarks/bench_chart_render.py [ratings] [repeats]
+"""
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+import plotly.express as px
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Modules import GetAnalytics
+from Modules.Analytics_Utils import build_bar_figure, bar_figure, figure_cache
+from Modules.TasteProfiles import mark_profile_built
+from Modules.theme_config import CUSTOM_THEME
+
+GENRES = ["Action", "Adventure", "Animation", "Biography", "Comedy", "Crime", "Documentary", "Drama", "Family",
+          "Fantasy", "History", "Horror", "Music", "Musical", "Mystery", "Romance", "Sci-Fi", "Sport", "Thriller",
+          "War", "Western"]
+
+
+def legacy_bar_figure(df, index_col, value_col, theme=CUSTOM_THEME):
+    """The figure safe_bar_chart() built on every rerun before figures were memoized"""
+    df_sorted = df.sort_values(by=index_col).reset_index(drop=True)
+    df_sorted[index_col] = df_sorted[index_col].astype(str)
+    df_sorted["value_num"] = pd.to_numeric(df_sorted[value_col], errors="coerce")
+    df_sorted["value_label"] = df_sorted["value_num"].map(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
+    fig = px.bar(
+        df_sorted, x=index_col, y="value_num", text="value_label", color=index_col,
+        color_discrete_sequence=theme["color_sequence"],
+        labels={index_col: index_col.capitalize(), "value_num": value_col.capitalize()},
+        template=theme["template"]
+    )
+    fig.update_traces(textposition="outside")
+    fig.update_xaxes(tickmode="array", tickvals=df_sorted[index_col], ticktext=[str(val) for val in df_sorted[index_col]],
+                     title_font=dict(color=theme["axis_color"]), tickfont=dict(color=theme["axis_color"]))
+    fig.update_yaxes(title_font=dict(color=theme["axis_color"]), tickfont=dict(color=theme["axis_color"]))
+    fig.update_layout(font=dict(family=theme["font_family"], color=theme["font_color"]), showlegend=False,
+                      margin=dict(l=20, r=20, t=20, b=40), height=400)
+    return fig
+
+
+class FakeDB:
+    """Answers ANALYTICS_QUERY with the row Neo4j returns: distributions as parallel lists"""
+
+    def __init__(self, row):
+        self.row = row
+
+    def run_query(self, query, parameters=None):
+        return [self.row]
+
+
+def synthetic_row(n, seed=13):
+    rng = random.Random(seed)
+    ratings = pd.DataFrame({
+        "rating": [rng.choice([0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0]) for _ in range(n)],
+        "genre": [rng.choice(GENRES) for _ in range(n)],
+    })
+    rating_dist = ratings.groupby("rating").size()
+    genre_dist = ratings.groupby("genre")["rating"].agg(["size", "mean"]).sort_values("size", ascending=False)
+    return {
+        "total_ratings": n,
+        "avg_rating": float(ratings["rating"].mean()),
+        "rating_dist": {"rating": rating_dist.index.tolist(), "count": rating_dist.tolist()},
+        "genre_dist": {"genre": genre_dist.index.tolist(), "count": genre_dist["size"].tolist(),
+                       "avg_rating": genre_dist["mean"].tolist()},
+        "largest_disparity": [{"title": "Movie 1", "year": 2001, "user_rating": 5.0, "avg_rating": 2.1, "diff": 2.9}],
+    }
+
+
+def charts(rating_dist, genre_dist):
+    """The three safe_bar_chart() calls of the User Analytics page"""
+    return [(rating_dist, "rating", "count"), (genre_dist, "genre", "count"), (genre_dist, "genre", "avg_rating")]
+
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        out = fn()
+    return out, (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    db = FakeDB(synthetic_row(n))
+    GetAnalytics.Connect = lambda: db
+    mark_profile_built("bench")
+
+    (total, _, rating_dist, genre_dist, _), parse_ms = timed(lambda: GetAnalytics._query_analytics("bench"), repeats)
+    assert total == n and rating_dist["count"].sum() == n
+
+    specs = charts(rating_dist, genre_dist)
+    _, legacy_fig_ms = timed(lambda: [legacy_bar_figure(*spec) for spec in specs], repeats)
+    _, build_ms = timed(lambda: [build_bar_figure(*spec) for spec in specs], repeats)
+    figure_cache.invalidate()
+    _, first_ms = timed(lambda: [bar_figure(*spec) for spec in specs], 1)
+    _, rerun_ms = timed(lambda: [bar_figure(*spec) for spec in specs], repeats)
+
+    # Same bars, heights and labels as the original one-trace-per-category figure
+    for spec in specs:
+        legacy = legacy_bar_figure(*spec)
+        new = bar_figure(*spec).data[0]
+        assert [x for trace in legacy.data for x in trace.x] == list(new.x)
+        assert [t for trace in legacy.data for t in trace.text] == list(new.text)
+        assert [y for trace in legacy.data for y in trace.y] == list(new.y)
+
+    print(f"{n} ratings aggregated to {len(rating_dist)} rating and {len(genre_dist)} genre rows, 3 bar charts per page view")
+    print(f"aggregated row -> DataFrames:          {parse_ms:8.2f} ms")
+    print(f"figures:              original       {legacy_fig_ms:8.2f} ms   vectorized  {build_ms:8.2f} ms")
+    print(f"memoized figures:     first view     {first_ms:8.2f} ms   rerun       {rerun_ms:8.2f} ms")
+    print(f"{figure_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: movie embeddings and the IVF index (Modules/MovieEmbeddings) vs. brute-force search.
+
+Builds a synthetic catalogue whose cast and crew come from overlapping "scenes" (groups of
+people who keep working together), runs the offline build into a temporary directory and
+memory-maps the result like the app does. Then, for random users and "more like this" queries:
+  - brute force: every movie vector scored against the query,
+  - IVF: only the EMBEDDING_NPROBE closest lists,
+reporting build time, latency per lookup and recall@k of the IVF results against brute force.
+
+    python Benchmarks/bench_embeddings.py [movies] [queries] [nprobe]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Modules.MovieEmbeddings import build_vectors, build_ivf, save_embeddings, load_embeddings
+from Modules.app_config import EMBEDDING_NPROBE, RECOMMENDATION_LIMIT
+
+GENRES = ["Action", "Adventure", "Animation", "Biography", "Comedy", "Crime", "Documentary", "Drama", "Family",
+          "Fantasy", "History", "Horror", "Music", "Musical", "Mystery", "Romance", "Sci-Fi", "Sport", "Thriller",
+          "War", "Western"]
+
+
+def synthetic_catalogue(n, rng, scenes=None, people_per_scene=60):
+    scenes = scenes or max(10, n // 50)
+    ids = np.array([f"tt{i:07d}" for i in range(n)], dtype=object)
+    movies = pd.DataFrame({
+        "tconst": ids,
+        "year": rng.integers(1950, 2025, n),
+        "runtime": rng.normal(105, 20, n).clip(60, 240).round(),
+        "averageRating": rng.normal(6.5, 1.0, n).clip(1, 10).round(1),
+        "numVotes": rng.lognormal(10, 1.5, n).round() + 25_000,
+    })
+    movies.loc[rng.random(n) < 0.03, "runtime"] = np.nan
+
+    # Each movie belongs to one scene, which decides its usual genres and most of its people
+    scene = rng.integers(0, scenes, n)
+    scene_genres = rng.integers(0, len(GENRES), (scenes, 3))
+    genre_rows = [(ids[i], GENRES[g]) for i in range(n) for g in set(rng.choice(scene_genres[scene[i]], 2))]
+    credits = []
+    for i in range(n):
+        regulars = scene[i] * people_per_scene + rng.choice(people_per_scene, 8, replace=False)
+        drifters = rng.integers(0, scenes * people_per_scene, 2)
+        credits.extend((f"nm{p:07d}", ids[i]) for p in np.concatenate([regulars, drifters]))
+    return movies, pd.DataFrame(genre_rows, columns=["tconst", "genre"]), pd.DataFrame(credits, columns=["nconst", "tconst"])
+
+
+def brute_force(embeddings, query, k, exclude=()):
+    scores = np.asarray(embeddings.vectors @ query)
+    scores[list(exclude)] = -np.inf
+    top = np.argpartition(-scores, k - 1)[:k]
+    return [embeddings.ids[i] for i in top[np.argsort(-scores[top])]]
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    out = [fn(item) for item in items]
+    return out, (time.perf_counter() - start) / len(items) * 1000
+
+
+def main():
+    n_movies = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    nprobe = int(sys.argv[3]) if len(sys.argv) > 3 else EMBEDDING_NPROBE
+    rng = np.random.default_rng(7)
+    movies, genres, credits = synthetic_catalogue(n_movies, rng)
+
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        vectors, genre_names, genre_mask = build_vectors(movies, genres, credits)
+        vectors_s = time.perf_counter() - start
+        ivf = build_ivf(vectors)
+        ivf_s = time.perf_counter() - start - vectors_s
+        save_embeddings(path, movies["tconst"], vectors, genre_names, genre_mask, ivf, {})
+        embeddings = load_embeddings(path)
+        print(f"{n_movies} movies, {len(credits)} credits -> {vectors.shape[1]} dims, {len(ivf[0])} lists, "
+              f"nprobe {nprobe}")
+        print(f"build: vectors {vectors_s:.1f}s, IVF {ivf_s:.1f}s; {vectors.nbytes / 1e6:.0f} MB memory-mapped")
+
+        # Users rate a few dozen movies, mostly from the scenes they like
+        users = []
+        for _ in range(n_queries):
+            rated = rng.choice(n_movies, rng.integers(5, 60), replace=False)
+            users.append(dict(zip(movies["tconst"].to_numpy()[rated], rng.choice([1, 2, 3, 3.5, 4, 4.5, 5], len(rated)))))
+        queries = [embeddings.user_vector(ratings) for ratings in users]
+        excluded = [embeddings.movie_index.get_indexer(list(ratings)) for ratings in users]
+        k = RECOMMENDATION_LIMIT
+
+        exact, brute_ms = timed(lambda i: brute_force(embeddings, queries[i], k, excluded[i]), range(n_queries))
+        approx, ivf_ms = timed(lambda i: [t for t, _ in embeddings.search(queries[i], k, excluded[i], nprobe=nprobe)],
+                               range(n_queries))
+        recall = np.mean([len(set(a) & set(e)) / k for a, e in zip(approx, exact)])
+        print(f"recommendations (top {k}): brute force {brute_ms:7.2f} ms   IVF {ivf_ms:6.2f} ms   "
+              f"recall@{k} {recall:.3f}")
+
+        seeds = rng.choice(n_movies, n_queries, replace=False)
+        exact, brute_ms = timed(lambda i: brute_force(embeddings, embeddings.vectors[i], 10, [i]), seeds)
+        approx, ivf_ms = timed(lambda i: [t for t, _ in embeddings.similar(embeddings.ids[i], 10)], seeds)
+        recall = np.mean([len(set(a) & set(e)) / 10 for a, e in zip(approx, exact)])
+        print(f"more like this (top 10):  brute force {brute_ms:7.2f} ms   IVF {ivf_ms:6.2f} ms   recall@10 {recall:.3f}")
+
+        _, filtered_ms = timed(lambda i: embeddings.search(queries[i], k, excluded[i], genres=["Western"], nprobe=nprobe),
+                               range(n_queries))
+        print(f"one-genre filter (Western): IVF {filtered_ms:6.2f} ms (more lists are probed until {k} qualify)")
+        del embeddings
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Query-plan regression check: EXPLAINs every query the app runs while serving a request and fails
+if a plan scans a whole label or builds a cartesian product that is not anchored on index seeks.
+
+Run it against the Neo4j instance from .env after `python -m Database.Schema`; nothing is
+executed, only planned. Offline jobs (graph snapshot and search-index loads, profile backfill,
+precompute) read whole labels by design and are not checked.
+
+    python Benchmarks/check_query_plans.py [--verbose]
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.Neo4j_Connection import Connect
+from Database.Schema import missing_schema
+from Modules.app_config import COLLAB_ROLES, COLLAB_CAP_PER_ROLE, RECOMMENDATION_LIMIT, MOVIE_TITLE_FULLTEXT_INDEX
+from Modules import (
+    AuthService, BulkRatings, GetAnalytics, GraphSnapshot, MovieSearch, RecommendMovies, ReferenceData, TasteProfiles
+)
+
+USER = {"user": "someone"}
+SCORED = [{"id": "tt0000001", "score": 1.0}]
+RATING = {"ratings": [{"user": "someone", "tconst": "tt0000001", "rating": 4.0, "discovery": "Friend",
+                       "date": "2024-01-01", "time": "20:00:00"}], "roles": COLLAB_ROLES}
+
+# (name, query, representative parameters)
+QUERIES = [
+    ("AuthService.register", AuthService.REGISTER_QUERY, {"username": "someone", "password": "hash"}),
+    ("AuthService.verify", AuthService.PASSWORD_QUERY, {"username": "someone"}),
+    ("AuthService.rehash", AuthService.REHASH_QUERY, {"username": "someone", "old": "hash", "new": "hash"}),
+    ("RecommendMovies.scores", RecommendMovies.SCORES_QUERY,
+     {**USER, "genres": ["Drama"], "per_role": COLLAB_CAP_PER_ROLE, "limit": RECOMMENDATION_LIMIT}),
+    ("RecommendMovies.details", RecommendMovies.SCORED_DETAILS_QUERY, {**USER, "scored": SCORED, "roles": COLLAB_ROLES}),
+    ("RecommendMovies.precomputed", RecommendMovies.PRECOMPUTED_QUERY, {**USER, "max_age_ms": 1000}),
+    ("GraphSnapshot.user_ratings (snapshot and embeddings engines)", GraphSnapshot.USER_RATINGS_QUERY, USER),
+    ("GetAnalytics.analytics", GetAnalytics.ANALYTICS_QUERY, USER),
+    ("TasteProfiles.rating_write", TasteProfiles.RATING_WRITE_QUERY, RATING),
+    ("TasteProfiles.rebuild", TasteProfiles.REBUILD_QUERY, {**USER, "roles": COLLAB_ROLES}),
+    ("TasteProfiles.profile_built", TasteProfiles.PROFILE_BUILT_QUERY, USER),
+    ("TasteProfiles.existing_rating (Rate Movies page)", TasteProfiles.EXISTING_RATING_QUERY,
+     {**USER, "tconst": "tt0000001"}),
+    ("BulkRatings.import", BulkRatings.IMPORT_QUERY,
+     {**USER, "ratings": [{"tconst": "tt0000001", "rating": 4.0, "date": "2024-01-01"}], "discovery": "Imported"}),
+    ("BulkRatings.bump_version", BulkRatings.BUMP_VERSION_QUERY, USER),
+    ("MovieSearch.fulltext", MovieSearch.FULLTEXT_QUERY,
+     {"index": MOVIE_TITLE_FULLTEXT_INDEX, "query": "godfather~", "limit": 10}),
+    ("ReferenceData.genres", ReferenceData.GENRES_QUERY, {}),
+    ("ReferenceData.professions", ReferenceData.PROFESSIONS_QUERY, {}),
+    ("ReferenceData.movie_metadata", ReferenceData.MOVIE_METADATA_QUERY, {"ids": ["tt0000001"]}),
+    ("ReferenceData.top_movies", ReferenceData.TOP_MOVIES_QUERY, {"limit": 10}),
+]
+
+SCAN_OPERATORS = {"AllNodesScan", "NodeByLabelScan", "DirectedRelationshipTypeScan",
+                  "UndirectedRelationshipTypeScan", "DirectedAllRelationshipsScan", "UndirectedAllRelationshipsScan"}
+# Lookup lists of a few dozen nodes, cached in-process; scanning them is cheaper than any index
+SCAN_ALLOWED = {"Genre", "Profession"}
+
+
+def operator(plan):
+    # Neo4j 5 reports e.g. "NodeByLabelScan@neo4j"
+    return plan["operatorType"].split("@")[0]
+
+
+def details(plan):
+    return str(plan.get("args", plan.get("arguments", {})).get("Details", ""))
+
+
+def leaves(plan):
+    children = plan.get("children") or []
+    if not children:
+        yield plan
+    for child in children:
+        yield from leaves(child)
+
+
+def plan_problems(plan):
+    problems = []
+    op = operator(plan)
+    if op in SCAN_OPERATORS and not any(f":{label}" in details(plan) for label in SCAN_ALLOWED):
+        problems.append(f"{op} {details(plan)}")
+    if op == "CartesianProduct":
+        # A product of two single-row seeks (e.g. the user and one movie) is fine; anything else multiplies rows
+        unanchored = [operator(leaf) for leaf in leaves(plan)
+                      if "Seek" not in operator(leaf) and operator(leaf) != "Argument"]
+        if unanchored:
+            problems.append(f"CartesianProduct over {', '.join(unanchored)}")
+    for child in plan.get("children") or []:
+        problems.extend(plan_problems(child))
+    return problems
+
+
+def format_plan(plan, depth=0):
+    lines = [f"{'  ' * depth}{operator(plan)}  {details(plan)}"]
+    for child in plan.get("children") or []:
+        lines.extend(format_plan(child, depth + 1))
+    return lines
+
+
+def main():
+    verbose = "--verbose" in sys.argv
+    db = Connect()
+    missing = missing_schema(db)
+    if missing:
+        print(f"[ERROR] Missing constraints/indexes ({', '.join(missing)}); run `python -m Database.Schema` first")
+
+    failures = 0
+    with db.session() as session:
+        for name, query, parameters in QUERIES:
+            plan = session.run("EXPLAIN " + query, parameters).consume().plan
+            problems = plan_problems(plan)
+            failures += bool(problems)
+            print(f"{'FAIL' if problems else 'OK  '} {name}")
+            for problem in problems:
+                print(f"       {problem}")
+            if verbose or problems:
+                print("\n".join(f"         {line}" for line in format_plan(plan)))
+
+    sys.exit(1 if failures or missing else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Parity check: in-process CSR scorer (Modules/GraphSnapshot) vs. the original three-query Cypher scorer.
+
+The bounded Cypher generator (score_candidates) is not compared here: it keys collaborators on
+nconst and caps them per role, so it deliberately differs on the shared names below. Its
+behaviour under load is covered by load_test_candidates.py.
+
+Seeds a small fixture graph into the Neo4j instance from .env (every node is namespaced with
+a `__parity__` prefix and removed afterwards), scores the fixture user both ways and compares
+the ranked ids and scores.
+
+    python Benchmarks/check_snapshot_parity.py
+"""
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.Neo4j_Connection import Connect
+from Modules.app_config import COLLAB_ROLES
+from Modules.GraphSnapshot import load_snapshot, get_user_ratings
+from legacy_recommender import get_candidate_movie_ids, get_scored_movies
+
+PREFIX = "__parity__"
+USER = f"{PREFIX}user"
+GENRES = [f"{PREFIX}{g}" for g in ("Drama", "Comedy", "Horror", "Sci-Fi")]
+
+
+def seed_fixture(db, seed=7, n_movies=120, n_people=60):
+    rng = random.Random(seed)
+    movies = [{
+        "tconst": f"{PREFIX}tt{i:04d}",
+        "title": f"Parity Movie {i}",
+        # Distinct vote counts so ORDER BY numVotes has no ties to break differently
+        "votes": 1000 + i * 37,
+        "rating": rng.randint(10, 99) / 10,
+        "genres": rng.sample(GENRES, rng.randint(1, 2)),
+    } for i in range(n_movies)]
+    # A couple of shared names exercise the name-keyed collaborator matching
+    names = [f"{PREFIX}Person {i % (n_people - 2)}" for i in range(n_people)]
+    credits = [{
+        "nconst": f"{PREFIX}nm{rng.randrange(n_people):04d}",
+        "tconst": m["tconst"],
+        "role": rng.choice(COLLAB_ROLES),
+    } for m in movies for _ in range(5)]
+    people = [{"nconst": f"{PREFIX}nm{i:04d}", "name": names[i]} for i in range(n_people)]
+    ratings = [{"tconst": m["tconst"], "rating": rng.choice([1.0, 2.5, 3.5, 4.5, 5.0])}
+               for m in rng.sample(movies, 12)]
+
+    db.run_query("""
+        UNWIND $movies AS movie
+        CREATE (m:Movie {tconst: movie.tconst, primaryTitle: movie.title,
+                         numVotes: movie.votes, averageRating: movie.rating})
+        WITH m, movie
+        UNWIND movie.genres AS genre
+        MERGE (g:Genre {type: genre})
+        CREATE (m)-[:HAS_GENRE]->(g)
+    """, {"movies": movies})
+    db.run_query("UNWIND $people AS person CREATE (:Person {nconst: person.nconst, name: person.name})",
+                 {"people": people})
+    for role in COLLAB_ROLES:
+        db.run_query(f"""
+            UNWIND $rows AS row
+            MATCH (p:Person {{nconst: row.nconst}}), (m:Movie {{tconst: row.tconst}})
+            MERGE (p)-[:{role}]->(m)
+        """, {"rows": [c for c in credits if c["role"] == role]})
+    db.run_query("""
+        CREATE (u:User {username: $user})
+        WITH u
+        UNWIND $ratings AS rating
+        MATCH (m:Movie {tconst: rating.tconst})
+        CREATE (u)-[:RATED {rating: rating.rating}]->(m)
+    """, {"user": USER, "ratings": ratings})
+
+
+def remove_fixture(db):
+    db.run_query("""
+        MATCH (n)
+        WHERE n.tconst STARTS WITH $prefix OR n.nconst STARTS WITH $prefix
+           OR n.type STARTS WITH $prefix OR n.username STARTS WITH $prefix
+        DETACH DELETE n
+    """, {"prefix": PREFIX})
+
+
+def main():
+    db = Connect()
+    remove_fixture(db)
+    seed_fixture(db)
+    try:
+        failures = 0
+        snapshot = load_snapshot(db)
+        for genres in ([GENRES[0]], GENRES[:2], GENRES):
+            candidates, memory_error = get_candidate_movie_ids(USER, genres)
+            assert not memory_error
+            collaborators = candidates[0]["collaborators"] if candidates else []
+            cypher = get_scored_movies([c["id"] for c in candidates], collaborators) if candidates else []
+            in_process, _ = snapshot.recommend(get_user_ratings(USER, db), genres)
+
+            same_ids = [r["id"] for r in cypher] == [r["id"] for r in in_process]
+            max_diff = max((abs(a["score"] - b["score"]) for a, b in zip(cypher, in_process)), default=0.0)
+            ok = same_ids and max_diff < 1e-9
+            failures += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} genres={len(genres)} cypher={len(cypher)} "
+                  f"snapshot={len(in_process)} max |Δscore|={max_diff:.2e}")
+    finally:
+        remove_fixture(db)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
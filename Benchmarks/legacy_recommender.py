@@ -0,0 +1,98 @@
+"""
+The original three-query recommender, kept as the baseline the benchmarks compare against.
+
+get_candidate_movie_ids expands every collaborator (keyed on person name) of every rated movie,
+which is what runs out of Neo4j query memory for heavy users; get_scored_movies then scores the
+candidates in a second round trip. Modules/RecommendMovies replaced both with score_candidates
+and the in-process engines.
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.Neo4j_Connection import Connect
+from Modules.RecommendMovies import is_out_of_memory
+from neo4j.exceptions import TransientError
+
+
+def get_candidate_movie_ids(user, genres, db=None):
+    """Candidate ids with the collaborators that reached them, plus whether Neo4j ran out of memory"""
+    db = db or Connect()
+
+    query = """
+    MATCH (u:User {username: $user})-[r:RATED]->(m:Movie)
+    WITH u, m, r.rating / 5.0 AS rating_weight
+
+    MATCH (m)<-[rel]-(p:Person)
+    WHERE type(rel) IN [
+        'ACTED_IN', 'DIRECTED', 'WROTE', 'PRODUCED', 'COMPOSED_SCORE_FOR',
+        'EDITED', 'SHOT', 'CAST', 'DESIGNED_PRODUCTION', 'ANIMATED'
+    ]
+
+    WITH u, p.name AS person_name, type(rel) AS role, rating_weight
+    WITH u, role, person_name, SUM(rating_weight) AS influence
+
+    WITH u, collect({person: person_name, role: role, weight: influence}) AS collaborators
+
+    UNWIND collaborators AS wc
+    MATCH (p:Person {name: wc.person})-[rel]->(rec:Movie)
+    WHERE type(rel) = wc.role
+
+    MATCH (rec)-[:HAS_GENRE]->(g:Genre)
+    WHERE g.type IN $genres AND NOT EXISTS {
+        MATCH (u)-[:RATED]->(rec)
+    }
+
+    WITH DISTINCT rec, collaborators
+    WITH rec, collaborators ORDER BY rec.numVotes DESC
+    LIMIT 75
+    RETURN rec.tconst AS id, collaborators
+    """
+
+    try:
+        results = db.run_query(query, {"user": user, "genres": genres})
+        return [{"id": r["id"], "collaborators": r["collaborators"]} for r in results], False
+    except TransientError as e:
+        if is_out_of_memory(e):
+            return [], True
+        raise
+
+
+def get_scored_movies(ids, collaborators, db=None):
+    """[{"id", "score"}] best first for the candidates above"""
+    db = db or Connect()
+
+    query = """
+    UNWIND $ids AS movieId
+    MATCH (rec:Movie {tconst: movieId})
+    WITH rec, rec.averageRating AS rec_rating, rec.numVotes AS rec_votes
+
+    UNWIND $collaborators AS wc
+    MATCH (p:Person {name: wc.person})-[rel]->(rec)
+    WHERE type(rel) = wc.role
+
+    WITH rec, wc, type(rel) AS role, rec_rating, rec_votes
+    WITH rec, rec_rating, rec_votes,
+         SUM(
+            CASE role
+                WHEN 'ACTED_IN' THEN 4.0
+                WHEN 'DIRECTED' THEN 3.0
+                WHEN 'WROTE' THEN 2.0
+                WHEN 'PRODUCED' THEN 2.0
+                WHEN 'COMPOSED_SCORE_FOR' THEN 2.0
+                ELSE 1.0
+            END * wc.weight
+         ) AS total_collab_score
+
+    WITH rec,
+         total_collab_score,
+         log(1 + rec.numVotes) AS popularity_score,
+         rec.averageRating * 1.5 AS quality_score,
+         total_collab_score + log(1 + rec.numVotes) + rec.averageRating * 1.5 AS total_score
+
+    RETURN rec.tconst AS id, total_score
+    ORDER BY total_score DESC
+    """
+
+    results = db.run_query(query, {"ids": ids, "collaborators": collaborators})
+    return [{"id": r["id"], "score": r["total_score"]} for r in results]
@@ -0,0 +1,123 @@
+"""
+Load test: bounded, nconst-keyed candidate generator (score_candidates) vs. the original
+name-keyed candidate query (get_candidate_movie_ids) for a heavy user.
+
+Seeds a synthetic graph into the Neo4j instance from .env (every node is namespaced with a
+`__load__` prefix and removed afterwards) with one user who has rated thousands of movies,
+builds that user's taste profile and times both generators for growing genre sets. The
+original query either errors with MemoryPoolOutOfMemoryError or returns; the bounded one
+should always return, reporting whether it had to narrow.
+
+    python Benchmarks/load_test_candidates.py [ratings] [movies] [people]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.Neo4j_Connection import Connect
+from Modules.app_config import COLLAB_ROLES
+from Modules.RecommendMovies import score_candidates
+from legacy_recommender import get_candidate_movie_ids
+from Modules.TasteProfiles import rebuild_profile
+
+PREFIX = "__load__"
+USER = f"{PREFIX}user"
+GENRES = [f"{PREFIX}{g}" for g in ("Drama", "Comedy", "Action", "Thriller", "Horror", "Sci-Fi", "Romance", "Crime")]
+
+
+def seed_fixture(db, n_ratings, n_movies, n_people, seed=11, batch=5_000):
+    rng = random.Random(seed)
+    movies = [{
+        "tconst": f"{PREFIX}tt{i:07d}",
+        "votes": rng.randint(1_000, 2_000_000),
+        "rating": rng.randint(10, 99) / 10,
+        "genres": rng.sample(GENRES, rng.randint(1, 3)),
+    } for i in range(n_movies)]
+    for start in range(0, n_movies, batch):
+        db.run_query("""
+            UNWIND $movies AS movie
+            CREATE (m:Movie {tconst: movie.tconst, primaryTitle: movie.tconst,
+                             numVotes: movie.votes, averageRating: movie.rating})
+            WITH m, movie
+            UNWIND movie.genres AS genre
+            MERGE (g:Genre {type: genre})
+            CREATE (m)-[:HAS_GENRE]->(g)
+        """, {"movies": movies[start:start + batch]})
+
+    people = [{"nconst": f"{PREFIX}nm{i:07d}", "name": f"{PREFIX}Person {i % (n_people // 2)}"} for i in range(n_people)]
+    for start in range(0, n_people, batch):
+        db.run_query("UNWIND $people AS person CREATE (:Person {nconst: person.nconst, name: person.name})",
+                     {"people": people[start:start + batch]})
+
+    credits = [{
+        "nconst": f"{PREFIX}nm{rng.randrange(n_people):07d}",
+        "tconst": m["tconst"],
+        "role": rng.choice(COLLAB_ROLES),
+    } for m in movies for _ in range(8)]
+    for role in COLLAB_ROLES:
+        rows = [c for c in credits if c["role"] == role]
+        for start in range(0, len(rows), batch):
+            db.run_query(f"""
+                UNWIND $rows AS row
+                MATCH (p:Person {{nconst: row.nconst}}), (m:Movie {{tconst: row.tconst}})
+                CREATE (p)-[:{role}]->(m)
+            """, {"rows": rows[start:start + batch]})
+
+    ratings = [{"tconst": m["tconst"], "rating": rng.choice([1.0, 2.5, 3.5, 4.5, 5.0])}
+               for m in rng.sample(movies, n_ratings)]
+    db.run_query("CREATE (:User {username: $user})", {"user": USER})
+    for start in range(0, n_ratings, batch):
+        db.run_query("""
+            MATCH (u:User {username: $user})
+            UNWIND $ratings AS rating
+            MATCH (m:Movie {tconst: rating.tconst})
+            CREATE (u)-[:RATED {rating: rating.rating}]->(m)
+        """, {"user": USER, "ratings": ratings[start:start + batch]})
+
+    with db.session() as session:
+        session.execute_write(rebuild_profile, USER)
+
+
+def remove_fixture(db):
+    db.run_query("""
+        MATCH (n)
+        WHERE n.tconst STARTS WITH $prefix OR n.nconst STARTS WITH $prefix
+           OR n.type STARTS WITH $prefix OR n.username STARTS WITH $prefix
+        CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+    """, {"prefix": PREFIX})
+
+
+def main():
+    n_ratings = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000
+    n_movies = int(sys.argv[2]) if len(sys.argv) > 2 else 60_000
+    n_people = int(sys.argv[3]) if len(sys.argv) > 3 else 20_000
+
+    db = Connect()
+    remove_fixture(db)
+    start = time.perf_counter()
+    seed_fixture(db, n_ratings, n_movies, n_people)
+    print(f"Seeded {n_movies} movies, {n_people} people and {n_ratings} ratings in {time.perf_counter() - start:.1f}s")
+
+    try:
+        for size in (1, 2, 4, len(GENRES)):
+            genres = GENRES[:size]
+
+            start = time.perf_counter()
+            legacy, memory_error = get_candidate_movie_ids(USER, genres)
+            legacy_ms = (time.perf_counter() - start) * 1000
+            legacy_result = "out of memory" if memory_error else f"{len(legacy)} rows"
+
+            start = time.perf_counter()
+            rows, narrowed = score_candidates(USER, genres, db)
+            bounded_ms = (time.perf_counter() - start) * 1000
+
+            print(f"genres={size}  original: {legacy_ms:8.1f} ms ({legacy_result})  "
+                  f"bounded: {bounded_ms:8.1f} ms ({len(rows)} rows{', narrowed' if narrowed else ''})")
+    finally:
+        remove_fixture(db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Load test: concurrent logins through Modules/AuthService vs. the original inline bcrypt path.
+
+Simulates a burst of users signing in at once (one thread per Streamlit script run) against a
+stand-in database that answers the password lookup after a fixed delay, so only the app side
+is measured. Reports throughput and latency percentiles for both paths, how many bcrypt calls
+ran at once, and the cost of a rerun resolved from the session token.
+
+    python Benchmarks/load_test_login.py [logins] [concurrency] [bcrypt_rounds]
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Modules import AuthService
+
+DB_LATENCY_SECONDS = 0.002
+
+
+class FakeRecord(dict):
+    pass
+
+
+class FakeResult:
+    def __init__(self, record):
+        self.record = record
+
+    def single(self):
+        return self.record
+
+
+class FakeSession:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, parameters=None, **kwargs):
+        time.sleep(DB_LATENCY_SECONDS)
+        parameters = {**(parameters or {}), **kwargs}
+        stored = self.db.users.get(parameters["username"])
+        return FakeResult(FakeRecord(password=stored) if stored else None)
+
+
+class FakeDB:
+    """Stands in for Neo4jConnection: every user's stored hash, looked up with a fixed delay"""
+
+    def __init__(self, users):
+        self.users = users
+
+    def session(self, **config):
+        return FakeSession(self)
+
+    def run_query(self, query, parameters=None):
+        return []
+
+
+class ConcurrencyGauge:
+    def __init__(self):
+        self.current = self.peak = 0
+        self.lock = threading.Lock()
+
+    def wrap(self, fn):
+        def wrapped(*args, **kwargs):
+            with self.lock:
+                self.current += 1
+                self.peak = max(self.peak, self.current)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.current -= 1
+        return wrapped
+
+
+def legacy_verify_user(username, password, db):
+    """verify_user() as it was: the lookup and checkpw on the script thread"""
+    with db.session() as session:
+        record = session.run("MATCH (u:User {username: $username}) RETURN u.password AS password",
+                             username=username).single()
+        if record:
+            return bcrypt.checkpw(password.encode(), record["password"].encode())
+        return False
+
+
+def burst(login, users, concurrency):
+    latencies = []
+
+    def one(username):
+        start = time.perf_counter()
+        ok = login(username)
+        latencies.append(time.perf_counter() - start)
+        return ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as script_threads:
+        results = list(script_threads.map(one, users))
+    elapsed = time.perf_counter() - start
+    assert all(results), "a valid login was rejected"
+    return elapsed, np.array(latencies) * 1000
+
+
+def report(name, elapsed, latencies, peak):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"{name:<28} {len(latencies) / elapsed:7.1f} logins/s  p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  "
+          f"p99 {p99:7.1f} ms  peak bcrypt calls at once: {peak}")
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    print(f"Hashing {logins} stand-in users at {rounds} rounds...")
+    users = {f"user{i}": bcrypt.hashpw(f"password{i}".encode(), bcrypt.gensalt(rounds)).decode() for i in range(logins)}
+    db = FakeDB(users)
+    names = list(users)
+    password = lambda username: "password" + username[len("user"):]
+    print(f"{logins} logins from {concurrency} concurrent script threads, "
+          f"{AuthService.AUTH_HASH_WORKERS} bcrypt workers, {os.cpu_count()} CPUs")
+
+    gauge = ConcurrencyGauge()
+    original_checkpw = bcrypt.checkpw
+    bcrypt.checkpw = gauge.wrap(original_checkpw)
+    try:
+        elapsed, latencies = burst(lambda u: legacy_verify_user(u, password(u), db), names, concurrency)
+        report("original (script thread)", elapsed, latencies, gauge.peak)
+
+        gauge.peak = 0
+        # Stored hashes already use the benchmark's work factor, so no background rehash skews the timing
+        AuthService.BCRYPT_ROUNDS = rounds
+        tokens = {}
+
+        def service_login(username):
+            tokens[username] = AuthService.login(username, password(username), db)
+            return tokens[username]
+
+        elapsed, latencies = burst(service_login, names, concurrency)
+        report("AuthService (bcrypt pool)", elapsed, latencies, gauge.peak)
+    finally:
+        bcrypt.checkpw = original_checkpw
+
+    start = time.perf_counter()
+    for _ in range(100):
+        for username, token in tokens.items():
+            assert AuthService.session_user(token) == username
+    per_rerun = (time.perf_counter() - start) / (100 * len(tokens)) * 1e6
+    print(f"rerun resolved from session token: {per_rerun:.1f} µs (no database query, no bcrypt)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+from neo4j import AsyncGraphDatabase
+from dotenv import load_dotenv
+from Database.Neo4j_Connection import pool_settings
+from Database.QueryStats import query_stats
+import asyncio
+import atexit
+import os
+import threading
+import time
+
+load_dotenv()
+
+# For callers that fan several queries out at once (see Benchmarks/bench_async_fanout.py); the pages,
+# which issue one query at a time, use Database/Neo4j_Connection.
+# The async driver is bound to the event loop it first runs on, so one background loop owns every
+# async driver in the process and sync code (Streamlit pages) hands coroutines to it.
+_loop = None
+_loop_lock = threading.Lock()
+_drivers = {}
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="neo4j-async", daemon=True).start()
+        return _loop
+
+
+def submit(coro):
+    """Schedules a coroutine on the background loop; returns a concurrent.futures.Future"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def run_async(coro, timeout=None):
+    """Runs a coroutine on the background loop and blocks until it finishes"""
+    return submit(coro).result(timeout)
+
+
+def gather_sync(*coros):
+    """Runs several coroutines concurrently from sync code, returning their results in order"""
+    async def _gather():
+        return await asyncio.gather(*coros)
+    return run_async(_gather())
+
+
+def get_async_driver(uri, user, password):
+    """Returns the shared async driver for these credentials, creating it on first use"""
+    key = (uri, user, password)
+    with _loop_lock:
+        driver = _drivers.get(key)
+        if driver is None:
+            driver = AsyncGraphDatabase.driver(uri, auth=(user, password), **pool_settings())
+            _drivers[key] = driver
+        return driver
+
+
+def close_async_drivers():
+    """Closes every async driver (registered to run at interpreter exit)"""
+    with _loop_lock:
+        drivers = list(_drivers.values())
+        _drivers.clear()
+    if _loop is None:
+        return
+    for driver in drivers:
+        try:
+            run_async(driver.close(), timeout=10)
+        except Exception:
+            pass
+
+
+atexit.register(close_async_drivers)
+
+
+class AsyncNeo4jConnection:
+    """asyncio counterpart of Neo4jConnection. Every query gets its own session, so gathered queries run in parallel."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def run_query(self, query, parameters=None):
+        started = time.perf_counter()
+        try:
+            async with self.driver.session() as session:
+                result = await session.run(query, parameters or {})
+                records = [record async for record in result]
+                summary = await result.consume()
+        except Exception:
+            query_stats.record(query, time.perf_counter() - started, error=True)
+            raise
+        query_stats.record(query, time.perf_counter() - started, len(records), summary)
+        return records
+
+    async def gather(self, *queries):
+        """Runs (query, parameters) pairs concurrently, returning their records in order"""
+        return await asyncio.gather(*(self.run_query(query, parameters) for query, parameters in queries))
+
+    async def stream(self, query, parameters=None, batch_size=1000):
+        """Yields lists of up to `batch_size` records without materializing the whole result"""
+        async with self.driver.session(fetch_size=batch_size) as session:
+            result = await session.run(query, parameters or {})
+            while True:
+                batch = await result.fetch(batch_size)
+                if not batch:
+                    break
+                yield batch
+
+    def iter_records(self, query, parameters=None, batch_size=1000):
+        """Sync iterator over a large result, pulling one batch per hop to the background loop"""
+        batches = self.stream(query, parameters, batch_size)
+        try:
+            while True:
+                try:
+                    batch = run_async(batches.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield from batch
+        finally:
+            run_async(batches.aclose())
+
+
+def AsyncConnect():
+    NEO4J_URI = os.getenv("NEO4J_URI")
+    NEO4J_USER = os.getenv("NEO4J_USERNAME")
+    NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+    return AsyncNeo4jConnection(get_async_driver(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD))
@@ -1,32 +1,88 @@
 from neo4j import GraphDatabase
+from Database.QueryStats import instrument_session
 import streamlit as st
 from dotenv import load_dotenv
+import atexit
 import os
+import threading
+
+load_dotenv()
+
+# One pooled driver per (uri, user, password) for the whole process, shared by every page render and session;
+# a changed password gets its own driver rather than breaking connections already handed out
+_drivers = {}
+_drivers_lock = threading.Lock()
+
+
+def pool_settings():
+    """Driver pool options, overridable from .env"""
+    return {
+        "max_connection_pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", 50)),
+        "max_connection_lifetime": float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", 3600)),
+        "connection_acquisition_timeout": float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", 60)),
+        # Connections idle for longer than this are pinged before being handed out
+        "liveness_check_timeout": float(os.getenv("NEO4J_LIVENESS_CHECK_TIMEOUT", 30)),
+    }
+
+
+def get_driver(uri, user, password):
+    """Returns the shared driver for these credentials, creating it on first use"""
+    key = (uri, user, password)
+    with _drivers_lock:
+        driver = _drivers.get(key)
+        if driver is None:
+            driver = GraphDatabase.driver(uri, auth=(user, password), **pool_settings())
+            _drivers[key] = driver
+        return driver
+
+
+def close_drivers():
+    """Closes every pooled driver (registered to run at interpreter exit)"""
+    with _drivers_lock:
+        drivers = list(_drivers.values())
+        _drivers.clear()
+    for driver in drivers:
+        try:
+            driver.close()
+        except Exception:
+            pass
+
+
+atexit.register(close_drivers)
 
 
 # Neo4j Database Connection
 class Neo4jConnection:
-    def __init__(self, uri, user, password):
+    def __init__(self, uri, user, password, pooled=False):
+        # A pooled connection shares the process-wide driver, so close() leaves it open
+        self._owns_driver = not pooled
         try:
-            self.driver = GraphDatabase.driver(uri, auth=(user, password))  # drop the underscore
+            if pooled:
+                self.driver = get_driver(uri, user, password)
+            else:
+                self.driver = GraphDatabase.driver(uri, auth=(user, password))  # drop the underscore
         except Exception as e:
             st.error(f"❌ Neo4j Connection Error: {e}")
 
     def close(self):
-        self.driver.close()
+        if self._owns_driver:
+            self.driver.close()
+
+    def session(self, **config):
+        """A driver session whose queries are recorded in Database.QueryStats"""
+        return instrument_session(self.driver.session(**config), self.driver)
 
     def run_query(self, query, parameters=None):
-        with self.driver.session() as session:
+        with self.session() as session:
             result = session.run(query, parameters or {})
             return [record for record in result]
 
 
 def Connect():
     # Connect to Neo4j (Replace with your credentials)
-    load_dotenv()
     NEO4J_URI = os.getenv("NEO4J_URI")
     NEO4J_USER = os.getenv("NEO4J_USERNAME")
     NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
-    db = Neo4jConnection(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    db = Neo4jConnection(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, pooled=True)
 
-    return db
\ No newline at end of file
+    return db
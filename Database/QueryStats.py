@@ -0,0 +1,341 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import numpy as np
+
+# Instrumentation settings, overridable from .env
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() != "false"
+# Queries slower than this get a PROFILE plan sampled in the background (read-only queries only)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))
+# At most one PROFILE per fingerprint in this many seconds
+PROFILE_SAMPLE_INTERVAL_SECONDS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_SECONDS", 300))
+# Durations kept per fingerprint for percentiles
+QUERY_STATS_WINDOW = int(os.getenv("QUERY_STATS_WINDOW", 1024))
+
+PERCENTILES = (50, 90, 95, 99)
+
+_WRITE_CLAUSE = re.compile(
+    r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b|\bCALL\s+(?!\{|db\.index\.fulltext\.)",
+    re.IGNORECASE,
+)
+
+
+def fingerprint(query):
+    """The query with comments, literals and whitespace normalized, so parameter-free variants group together"""
+    text = re.sub(r"//[^\n]*", " ", query)
+    text = re.sub(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"", "?", text)
+    text = re.sub(r"(?<![\w$])-?\d+(?:\.\d+)?\b", "?", text)
+    return " ".join(text.split())
+
+
+def fingerprint_id(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def is_read_only(query):
+    return not _WRITE_CLAUSE.search(query) and not query.lstrip().upper().startswith(("PROFILE", "EXPLAIN"))
+
+
+def _plan_rows(plan, depth=0):
+    """Flattens a PROFILE plan into [(depth, operator, rows, dbHits)]"""
+    rows = [(depth, plan.get("operatorType"), plan.get("rows", 0), plan.get("dbHits", 0))]
+    for child in plan.get("children", []):
+        rows.extend(_plan_rows(child, depth + 1))
+    return rows
+
+
+class _QueryEntry:
+    def __init__(self, text):
+        self.text = text
+        self.id = fingerprint_id(text)
+        self.durations = deque(maxlen=QUERY_STATS_WINDOW)
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.server_available_ms = 0.0
+        self.server_consumed_ms = 0.0
+        self.last_profiled = 0.0
+        self.profile = None
+
+    def snapshot(self):
+        durations = np.asarray(self.durations, dtype="float64") * 1000
+        percentiles = np.percentile(durations, PERCENTILES) if len(durations) else [None] * len(PERCENTILES)
+        timed = max(self.count - self.errors, 1)
+        return {
+            "id": self.id,
+            "query": self.text,
+            "count": self.count,
+            "errors": self.errors,
+            "rows": self.rows,
+            "avg_rows": self.rows / timed,
+            "total_ms": self.total_seconds * 1000,
+            "max_ms": self.max_seconds * 1000,
+            **{f"p{p}_ms": (float(v) if v is not None else None) for p, v in zip(PERCENTILES, percentiles)},
+            "server_available_after_ms": self.server_available_ms / timed,
+            "server_consumed_after_ms": self.server_consumed_ms / timed,
+            "profile": self.profile,
+        }
+
+
+class QueryStats:
+    """Per-fingerprint query timings for the whole process"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._profiler = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-profiler")
+        self.started_at = time.time()
+
+    def _entry(self, query):
+        text = fingerprint(query)
+        entry = self._entries.get(text)
+        if entry is None:
+            entry = self._entries[text] = _QueryEntry(text)
+        return entry
+
+    def record(self, query, seconds, rows=0, summary=None, error=False, driver=None, parameters=None):
+        with self._lock:
+            entry = self._entry(query)
+            entry.count += 1
+            if error:
+                entry.errors += 1
+                return
+            entry.durations.append(seconds)
+            entry.rows += rows
+            entry.total_seconds += seconds
+            entry.max_seconds = max(entry.max_seconds, seconds)
+            if summary is not None:
+                entry.server_available_ms += summary.result_available_after or 0
+                entry.server_consumed_ms += summary.result_consumed_after or 0
+
+            sample = (
+                driver is not None
+                and seconds * 1000 >= SLOW_QUERY_MS
+                and time.time() - entry.last_profiled >= PROFILE_SAMPLE_INTERVAL_SECONDS
+                and is_read_only(query)
+            )
+            if sample:
+                entry.last_profiled = time.time()
+        if sample:
+            self._profiler.submit(self._profile, entry, driver, query, parameters)
+
+    def _profile(self, entry, driver, query, parameters):
+        try:
+            with driver.session() as session:
+                summary = session.execute_read(lambda tx: tx.run("PROFILE " + query, parameters or {}).consume())
+            plan = _plan_rows(summary.profile or {})
+            profile = {
+                "sampled_at": time.time(),
+                "db_hits": sum(hits for _, _, _, hits in plan),
+                "plan": [{"depth": d, "operator": op, "rows": rows, "db_hits": hits} for d, op, rows, hits in plan],
+            }
+        except Exception as e:
+            profile = {"sampled_at": time.time(), "error": str(e)}
+        with self._lock:
+            entry.profile = profile
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """Every fingerprint's aggregates, most total time first"""
+        with self._lock:
+            entries = [entry.snapshot() for entry in self._entries.values()]
+        return sorted(entries, key=lambda e: e["total_ms"], reverse=True)
+
+    def to_json(self):
+        return json.dumps({"started_at": self.started_at, "queries": self.snapshot()}, indent=2, default=str)
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP moviequeue_query_duration_seconds Client-side Neo4j query duration by fingerprint",
+            "# TYPE moviequeue_query_duration_seconds summary",
+        ]
+        entries = self.snapshot()
+        for e in entries:
+            for p in PERCENTILES:
+                if e[f"p{p}_ms"] is not None:
+                    lines.append(f'moviequeue_query_duration_seconds{{id="{e["id"]}",quantile="{p / 100}"}} {e[f"p{p}_ms"] / 1000:.6f}')
+            lines.append(f'moviequeue_query_duration_seconds_sum{{id="{e["id"]}"}} {e["total_ms"] / 1000:.6f}')
+            lines.append(f'moviequeue_query_duration_seconds_count{{id="{e["id"]}"}} {e["count"] - e["errors"]}')
+        for name, key, help_text in (
+            ("moviequeue_query_rows_total", "rows", "Records returned by fingerprint"),
+            ("moviequeue_query_errors_total", "errors", "Failed queries by fingerprint"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f'{name}{{id="{e["id"]}"}} {e[key]}' for e in entries]
+        lines += ["# HELP moviequeue_query_info Query text for each fingerprint id", "# TYPE moviequeue_query_info gauge"]
+        for e in entries:
+            text = e["query"][:200].replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'moviequeue_query_info{{id="{e["id"]}",query="{text}"}} 1')
+        return "\n".join(lines) + "\n"
+
+
+query_stats = QueryStats()
+
+
+# ==============================
+# INSTRUMENTED SESSIONS
+# ==============================
+class InstrumentedResult:
+    """Wraps a neo4j Result and records the query once it has been fully read (or discarded)"""
+
+    def __init__(self, result, query, parameters, started, driver):
+        self._result = result
+        self._query = query
+        self._parameters = parameters
+        self._started = started
+        self._driver = driver
+        self._rows = 0
+        self._recorded = False
+
+    def _finish(self, rows=None):
+        if self._recorded:
+            return
+        self._recorded = True
+        if rows is not None:
+            self._rows = rows
+        try:
+            summary = self._result.consume()
+        except Exception:
+            query_stats.record(self._query, time.perf_counter() - self._started, error=True)
+            raise
+        query_stats.record(self._query, time.perf_counter() - self._started, self._rows, summary,
+                           driver=self._driver, parameters=self._parameters)
+
+    def _fail(self):
+        """Records a result that raised while being read (e.g. a transient error mid-stream)"""
+        if not self._recorded:
+            self._recorded = True
+            query_stats.record(self._query, time.perf_counter() - self._started, error=True)
+
+    def _read(self, read, count):
+        try:
+            value = read()
+        except Exception:
+            self._fail()
+            raise
+        self._finish(count(value))
+        return value
+
+    def __iter__(self):
+        try:
+            for record in self._result:
+                self._rows += 1
+                yield record
+        except Exception:
+            self._fail()
+            raise
+        self._finish()
+
+    def data(self, *keys):
+        return self._read(lambda: self._result.data(*keys), len)
+
+    def values(self, *keys):
+        return self._read(lambda: self._result.values(*keys), len)
+
+    def value(self, key=0, default=None):
+        return self._read(lambda: self._result.value(key, default), len)
+
+    def single(self, strict=False):
+        return self._read(lambda: self._result.single(strict), lambda record: 0 if record is None else 1)
+
+    def to_df(self, *args, **kwargs):
+        return self._read(lambda: self._result.to_df(*args, **kwargs), len)
+
+    def consume(self):
+        self._finish()
+        return self._result.consume()
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+
+class _InstrumentedRunner:
+    def __init__(self, target, driver):
+        self._target = target
+        self._driver = driver
+        self._results = []
+
+    def run(self, query, parameters=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = self._target.run(query, parameters, **kwargs)
+        except Exception:
+            query_stats.record(query, time.perf_counter() - started, error=True)
+            raise
+        wrapped = InstrumentedResult(result, query, {**(parameters or {}), **kwargs}, started, self._driver)
+        self._results.append(wrapped)
+        return wrapped
+
+    def _finish_pending(self, raise_errors=True):
+        """Records every result left unread; the first failure is re-raised once all are recorded"""
+        error = None
+        for result in self._results:
+            try:
+                result._finish()
+            except Exception as e:
+                error = error or e
+        self._results.clear()
+        if error is not None and raise_errors:
+            raise error
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class InstrumentedTransaction(_InstrumentedRunner):
+    pass
+
+
+class InstrumentedSession(_InstrumentedRunner):
+    """Drop-in for a neo4j Session: run(), execute_read() and execute_write() are all timed"""
+
+    def _wrap_work(self, work):
+        def instrumented(tx, *args, **kwargs):
+            tx = InstrumentedTransaction(tx, self._driver)
+            try:
+                value = work(tx, *args, **kwargs)
+            except Exception:
+                # The work's own error is the one to surface (and retry on)
+                tx._finish_pending(raise_errors=False)
+                raise
+            tx._finish_pending()
+            return value
+        return instrumented
+
+    def execute_read(self, work, *args, **kwargs):
+        return self._target.execute_read(self._wrap_work(work), *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._target.execute_write(self._wrap_work(work), *args, **kwargs)
+
+    def close(self):
+        try:
+            self._finish_pending()
+        finally:
+            self._target.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._finish_pending(raise_errors=exc[0] is None)
+        except Exception:
+            self._target.__exit__(*exc)
+            raise
+        return self._target.__exit__(*exc)
+
+
+def instrument_session(session, driver):
+    return InstrumentedSession(session, driver) if QUERY_STATS_ENABLED else session
@@ -0,0 +1,88 @@
+"""
+Every constraint and index the app and the ETL rely on, applied idempotently.
+
+    python -m Database.Schema            # create whatever is missing and wait for it to come online
+    python -m Database.Schema --check    # only report what is missing
+"""
+import argparse
+import sys
+from neo4j.exceptions import Neo4jError
+from Database.Neo4j_Connection import Connect
+
+# (name, kind, statement); names are what SHOW CONSTRAINTS / SHOW INDEXES report
+SCHEMA = [
+    # Lookup keys
+    ("movie_tconst_unique", "constraint",
+     "CREATE CONSTRAINT movie_tconst_unique IF NOT EXISTS FOR (m:Movie) REQUIRE m.tconst IS UNIQUE"),
+    ("genre_type_unique", "constraint",
+     "CREATE CONSTRAINT genre_type_unique IF NOT EXISTS FOR (g:Genre) REQUIRE g.type IS UNIQUE"),
+    ("person_nconst_unique", "constraint",
+     "CREATE CONSTRAINT person_nconst_unique IF NOT EXISTS FOR (p:Person) REQUIRE p.nconst IS UNIQUE"),
+    ("platform_name_unique", "constraint",
+     "CREATE CONSTRAINT platform_name_unique IF NOT EXISTS FOR (s:StreamingPlatform) REQUIRE s.name IS UNIQUE"),
+    # Matched on every request (login, ratings, recommendations, analytics)
+    ("user_username_unique", "constraint",
+     "CREATE CONSTRAINT user_username_unique IF NOT EXISTS FOR (u:User) REQUIRE u.username IS UNIQUE"),
+    # MERGEd once per person by the ETL's upload_people()
+    ("profession_type_unique", "constraint",
+     "CREATE CONSTRAINT profession_type_unique IF NOT EXISTS FOR (p:Profession) REQUIRE p.type IS UNIQUE"),
+
+    # Collaborator names are matched by the original recommendation queries and shown on cards
+    ("person_name_index", "index",
+     "CREATE INDEX person_name_index IF NOT EXISTS FOR (p:Person) ON (p.name)"),
+    # Most-voted ordering (reference data warm-up, candidate selection)
+    ("movie_numvotes_index", "index",
+     "CREATE INDEX movie_numvotes_index IF NOT EXISTS FOR (m:Movie) ON (m.numVotes)"),
+    # Backs the title typeahead on the Rate Movies page
+    ("movie_title_fulltext", "index",
+     "CREATE FULLTEXT INDEX movie_title_fulltext IF NOT EXISTS FOR (m:Movie) ON EACH [m.primaryTitle]"),
+]
+
+
+def existing_schema(db):
+    """Names of the constraints and indexes already in the database"""
+    names = {r["name"] for r in db.run_query("SHOW CONSTRAINTS YIELD name RETURN name")}
+    names |= {r["name"] for r in db.run_query("SHOW INDEXES YIELD name RETURN name")}
+    return names
+
+
+def missing_schema(db):
+    existing = existing_schema(db)
+    return [name for name, _, _ in SCHEMA if name not in existing]
+
+
+def apply_schema(db=None, wait_seconds=300):
+    """Creates whatever is missing. Returns the names that could not be created (e.g. duplicate usernames)"""
+    db = db or Connect()
+    failed = []
+    with db.session() as session:
+        for name, kind, statement in SCHEMA:
+            try:
+                session.run(statement).consume()
+            except Neo4jError as e:
+                # A uniqueness constraint over existing duplicates fails with ConstraintCreationFailed (a
+                # DatabaseError, not a ClientError); report it and apply the rest
+                print(f"[ERROR] Could not create {kind} {name}: {e.message}")
+                failed.append(name)
+        if wait_seconds:
+            session.run("CALL db.awaitIndexes($seconds)", {"seconds": wait_seconds}).consume()
+    return failed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Create MovieQueue's Neo4j constraints and indexes")
+    parser.add_argument("--check", action="store_true", help="Only report missing constraints and indexes")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    db = Connect()
+    if not args.check:
+        apply_schema(db)
+    missing = missing_schema(db)
+    for name in missing:
+        print(f"[ERROR] Missing: {name}")
+    if not missing:
+        print(f"[INFO] All {len(SCHEMA)} constraints and indexes are in place.")
+    sys.exit(1 if missing else 0)
@@ -0,0 +1,179 @@
+import glob
+import gzip
+import json
+import os
+import pandas as pd
+from ETL_config import REL_OUTPUT_DIR, BULK_SHARD_ROWS, BULK_COMPRESS
+
+
+# ==============================
+# CSV SHARD WRITER
+# ==============================
+def _write_csv(name, header, df, output_dir, shard_rows, compress):
+    """Writes `<name>.header.csv` plus `<name>.partNNNN.csv[.gz]` data shards (no header rows)"""
+    for stale in glob.glob(os.path.join(output_dir, f"{name}.*")):
+        os.remove(stale)
+
+    header_path = os.path.join(output_dir, f"{name}.header.csv")
+    with open(header_path, "w", encoding="utf-8") as f:
+        f.write(",".join(header) + "\n")
+
+    suffix = ".csv.gz" if compress else ".csv"
+    files = []
+    for shard, start in enumerate(range(0, max(len(df), 1), shard_rows)):
+        path = os.path.join(output_dir, f"{name}.part{shard:04d}{suffix}")
+        df.iloc[start:start+shard_rows].to_csv(path, header=False, index=False, encoding="utf-8",
+                                               compression="gzip" if compress else None)
+        files.append(path)
+
+    return {"header": header_path, "files": files, "rows": len(df)}
+
+
+# ==============================
+# FRAME PREPARATION
+# ==============================
+def _movie_frames(df_movies):
+    movies = df_movies.drop_duplicates('tconst')
+    nodes = pd.DataFrame({
+        'tconst': movies['tconst'],
+        'primaryTitle': movies['primaryTitle'],
+        'startYear': pd.to_numeric(movies['startYear'], errors='coerce').astype('Int64'),
+        'runtimeMinutes': pd.to_numeric(movies['runtimeMinutes'], errors='coerce').astype('Int64'),
+        'averageRating': pd.to_numeric(movies['averageRating'], errors='coerce'),
+        'numVotes': movies['numVotes'].astype('Int64'),
+        'label': 'Movie',
+    })
+    has_genre = movies[['tconst', 'genres']].explode('genres').dropna().drop_duplicates()
+    has_genre = has_genre.rename(columns={'genres': 'genre'}).assign(type='HAS_GENRE')
+    genres = pd.DataFrame({'type': sorted(has_genre['genre'].unique()), 'label': 'Genre'})
+    return nodes, genres, has_genre
+
+
+def _people_frames(df_people):
+    people = df_people.drop_duplicates('nconst')
+    nodes = pd.DataFrame({
+        'nconst': people['nconst'],
+        'name': people['primaryName'],
+        'birthYear': pd.to_numeric(people['birthYear'], errors='coerce').astype('Int64'),
+        'deathYear': pd.to_numeric(people['deathYear'], errors='coerce').astype('Int64'),
+        'label': 'Person',
+    })
+    has_profession = pd.DataFrame({
+        'nconst': people['nconst'],
+        'profession': people['primaryProfession'].str.split(','),
+    }).explode('profession').dropna().drop_duplicates().assign(type='HAS_PROFESSION')
+    professions = pd.DataFrame({'type': sorted(has_profession['profession'].unique()), 'label': 'Profession'})
+    return nodes, professions, has_profession
+
+
+def _relationship_frame(rel_type, table, movie_ids, person_ids):
+    """Mirrors the Cypher MATCH/MERGE: drop dangling endpoints and duplicate pairs (last SET wins)"""
+    df = table.to_pandas()
+    df = df[df['tconst'].isin(movie_ids) & df['nconst'].isin(person_ids)]
+    df = df.drop_duplicates(['nconst', 'tconst'], keep='last')
+    columns = ['nconst', 'tconst'] + (['characters'] if rel_type == "ACTED_IN" else [])
+    return df[columns].assign(type=rel_type)
+
+
+# ==============================
+# BULK IMPORT EXPORT
+# ==============================
+def write_bulk_import(df_movies, df_people, relationship_map, output_dir=REL_OUTPUT_DIR,
+                      shard_rows=BULK_SHARD_ROWS, compress=BULK_COMPRESS):
+    """
+    Writes header + data CSVs for `neo4j-admin database import full` and returns a manifest
+    of {file group: {"kind", "header", "files", "rows"}}, which is also saved as manifest.json.
+    """
+    print("\n[STEP 2] Writing neo4j-admin Import Files...")
+    os.makedirs(output_dir, exist_ok=True)
+
+    movies, genres, has_genre = _movie_frames(df_movies)
+    people, professions, has_profession = _people_frames(df_people)
+
+    manifest = {}
+
+    def write(name, kind, header, df):
+        manifest[name] = {"kind": kind, **_write_csv(name, header, df, output_dir, shard_rows, compress)}
+        print(f"[INFO] {name}: {len(df):,} rows in {len(manifest[name]['files'])} shard(s)")
+
+    write("movies", "nodes", ["tconst:ID(Movie)", "primaryTitle", "startYear:int", "runtimeMinutes:int",
+                              "averageRating:float", "numVotes:int", ":LABEL"], movies)
+    write("genres", "nodes", ["type:ID(Genre)", ":LABEL"], genres)
+    write("people", "nodes", ["nconst:ID(Person)", "name", "birthYear:int", "deathYear:int", ":LABEL"], people)
+    write("professions", "nodes", ["type:ID(Profession)", ":LABEL"], professions)
+    write("has_genre", "relationships", [":START_ID(Movie)", ":END_ID(Genre)", ":TYPE"], has_genre)
+    write("has_profession", "relationships", [":START_ID(Person)", ":END_ID(Profession)", ":TYPE"], has_profession)
+
+    movie_ids, person_ids = set(movies['tconst']), set(people['nconst'])
+    for rel_type, table in relationship_map.items():
+        header = [":START_ID(Person)", ":END_ID(Movie)"] + (["characters"] if rel_type == "ACTED_IN" else []) + [":TYPE"]
+        write(rel_type.lower(), "relationships", header, _relationship_frame(rel_type, table, movie_ids, person_ids))
+
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    command = import_command(manifest)
+    with open(os.path.join(output_dir, "import_command.txt"), "w") as f:
+        f.write(command + "\n")
+
+    print(f"[INFO] Finished Writing Import Files to {output_dir}.")
+    return manifest
+
+
+def import_command(manifest, database="neo4j"):
+    """The offline importer invocation for a manifest (run with the database stopped)"""
+    args = []
+    for entry in manifest.values():
+        files = ",".join(os.path.abspath(p) for p in [entry["header"], *entry["files"]])
+        args.append(f"--{entry['kind']}={files}")
+    return "neo4j-admin database import full --overwrite-destination " + " ".join(args) + f" {database}"
+
+
+# ==============================
+# VALIDATION
+# ==============================
+def _count_data_rows(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+def validate_bulk_import(manifest, df_movies, df_people, relationship_map):
+    """
+    Re-reads every shard and checks its row count against the in-memory frames.
+    Returns a list of mismatch descriptions (empty when the export is consistent).
+    """
+    print("\n[STEP 3] Validating Import Files...")
+
+    movie_ids = set(df_movies['tconst'])
+    person_ids = set(df_people['nconst'])
+    expected = {
+        "movies": len(movie_ids),
+        "genres": len({g for gs in df_movies['genres'] for g in gs}),
+        "has_genre": sum(len(set(gs)) for gs in df_movies.drop_duplicates('tconst')['genres']),
+        "people": len(person_ids),
+        "professions": df_people['primaryProfession'].dropna().str.split(',').explode().nunique(),
+        "has_profession": int(df_people.drop_duplicates('nconst')['primaryProfession'].dropna()
+                              .str.split(',').map(lambda p: len(set(p))).sum()),
+    }
+    for rel_type, table in relationship_map.items():
+        pairs = {(t, n) for t, n in zip(table.column('tconst').to_pylist(), table.column('nconst').to_pylist())
+                 if t in movie_ids and n in person_ids}
+        expected[rel_type.lower()] = len(pairs)
+
+    errors = []
+    for name, count in expected.items():
+        entry = manifest.get(name)
+        if entry is None:
+            errors.append(f"{name}: missing from export (expected {count:,} rows)")
+            continue
+        on_disk = sum(_count_data_rows(p) for p in entry["files"])
+        if on_disk != count:
+            errors.append(f"{name}: {on_disk:,} rows on disk, expected {count:,}")
+
+    if errors:
+        for e in errors:
+            print(f"[ERROR] {e}")
+    else:
+        print(f"[INFO] All {len(expected)} file groups match the in-memory frames.")
+    return errors
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from ETL_config import (
+    CACHE_DIR, CACHE_ENABLED, CACHE_COLUMNS, CACHE_ROW_GROUP_SIZE, CACHE_BUILD_CHUNK_ROWS, STREAM_MIN_CHUNK_ROWS
+)
+
+# Toggled from the CLI (--no-cache / --rebuild-cache)
+_settings = {"enabled": CACHE_ENABLED, "rebuild": False}
+_rebuilt = set()
+
+
+def configure_cache(enabled=CACHE_ENABLED, rebuild=False):
+    _settings["enabled"] = enabled
+    _settings["rebuild"] = rebuild
+    _rebuilt.clear()
+
+
+def cache_enabled():
+    return _settings["enabled"]
+
+
+# ==============================
+# CACHE KEYS
+# ==============================
+def _quick_hash(path, span=1024 * 1024):
+    """SHA-1 over the first and last MB, enough to notice a replaced dump without reading GBs"""
+    digest = hashlib.sha1()
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        digest.update(f.read(span))
+        if size > span:
+            f.seek(max(span, size - span))
+            digest.update(f.read(span))
+    return digest.hexdigest()
+
+
+def _source_key(path, columns):
+    stat = os.stat(path)
+    return {
+        "source": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "quick_hash": _quick_hash(path),
+        "columns": list(columns) if columns is not None else None,
+    }
+
+
+def _cache_paths(path):
+    name = os.path.basename(path).rsplit(".", 1)[0]
+    base = os.path.join(CACHE_DIR, name)
+    return base + ".parquet", base + ".json"
+
+
+# ==============================
+# CACHE BUILD
+# ==============================
+def _build_cache(path, dtype, columns, parquet_path, manifest_path, key):
+    print(f"[INFO] Building Parquet cache for {path}...")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    if columns is not None:
+        dtype = {col: t for col, t in dtype.items() if col in columns}
+
+    tmp_path = parquet_path + ".tmp"
+    writer = None
+    rows = 0
+    try:
+        reader = pd.read_csv(path, delimiter='\t', dtype=dtype, na_values='\\N', usecols=columns,
+                             chunksize=CACHE_BUILD_CHUNK_ROWS)
+        with reader:
+            for chunk in reader:
+                # Categories are stored as plain strings; Parquet dictionary-encodes them on disk
+                for col in chunk.select_dtypes("category").columns:
+                    chunk[col] = chunk[col].astype("string")
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema, use_dictionary=True, compression="zstd")
+                writer.write_table(table.cast(writer.schema), row_group_size=CACHE_ROW_GROUP_SIZE)
+                rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        raise ValueError(f"{path} has no rows to cache")
+    os.replace(tmp_path, parquet_path)
+    with open(manifest_path, "w") as f:
+        json.dump({**key, "rows": rows}, f, indent=2)
+    print(f"[INFO] Cached {rows:,} rows to {parquet_path}.")
+
+
+def ensure_cache(path, dtype):
+    """Returns the Parquet cache for a TSV, (re)building it when the source or CACHE_COLUMNS changed"""
+    columns = CACHE_COLUMNS.get(path)
+    parquet_path, manifest_path = _cache_paths(path)
+    key = _source_key(path, columns)
+
+    fresh = False
+    if os.path.exists(parquet_path) and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        fresh = all(manifest.get(k) == v for k, v in key.items())
+
+    if not fresh or (_settings["rebuild"] and path not in _rebuilt):
+        _build_cache(path, dtype, columns, parquet_path, manifest_path, key)
+        _rebuilt.add(path)
+    return parquet_path
+
+
+# ==============================
+# CACHE READS
+# ==============================
+def _check_columns(path, columns):
+    cached = CACHE_COLUMNS.get(path)
+    if columns is not None and cached is not None and not set(columns) <= set(cached):
+        raise ValueError(f"{sorted(set(columns) - set(cached))} are pruned from the {path} cache; add them to CACHE_COLUMNS")
+
+
+def _restore_dtypes(df, dtype):
+    return df.astype({col: t for col, t in dtype.items() if col in df.columns})
+
+
+def read_cached(path, dtype, columns=None, filters=None):
+    """
+    Reads a TSV through its memory-mapped Parquet cache. `filters` use pyarrow's DNF syntax,
+    e.g. [('titleType', '==', 'movie')], and let whole row groups be skipped from their statistics.
+    """
+    _check_columns(path, columns)
+    parquet_path = ensure_cache(path, dtype)
+    table = pq.read_table(parquet_path, columns=columns, filters=filters, memory_map=True)
+    return _restore_dtypes(table.to_pandas(), dtype)
+
+
+def iter_cached(path, dtype, columns=None, batch_rows=CACHE_BUILD_CHUNK_ROWS):
+    """
+    Yields the cached TSV as DataFrame chunks of `batch_rows` rows. `batch_rows` may also be a
+    callable returning the length wanted for the next chunk, so a caller can adapt it as it goes.
+    """
+    _check_columns(path, columns)
+    parquet_path = ensure_cache(path, dtype)
+    parquet_file = pq.ParquetFile(parquet_path, memory_map=True)
+    if not callable(batch_rows):
+        for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+            yield _restore_dtypes(batch.to_pandas(), dtype)
+        return
+
+    # Small record batches are regrouped (in Arrow, so categories survive) into chunks of the requested length
+    pending, rows = [], 0
+    for batch in parquet_file.iter_batches(batch_size=STREAM_MIN_CHUNK_ROWS, columns=columns):
+        pending.append(batch)
+        rows += batch.num_rows
+        if rows >= batch_rows():
+            yield _restore_dtypes(pa.Table.from_batches(pending).to_pandas(), dtype)
+            pending, rows = [], 0
+    if pending:
+        yield _restore_dtypes(pa.Table.from_batches(pending).to_pandas(), dtype)
+
+
+def key_range_filter(column, keys):
+    """Min/max predicate over a key set; sorted IMDb dumps then skip every row group outside it"""
+    keys = [k for k in keys if pd.notna(k)]
+    if not keys:
+        return None
+    return [(column, '>=', min(keys)), (column, '<=', max(keys))]
@@ -1,12 +1,31 @@
+import os
+
 # ===============================
 # ETL Configuration for MovieQueue
 # ===============================
 
-# Batch size for Neo4j inserts
+# Initial batch sizes for Neo4j inserts (the upload engine adapts them from observed latency)
 BATCH_SIZE = 100
+REL_BATCH_SIZE = 500
+
+# Parallel upload engine
+UPLOAD_WORKERS = 4
+# Batches buffered per worker before batch preparation blocks
+UPLOAD_QUEUE_SIZE = 8
+UPLOAD_MIN_BATCH_SIZE = 50
+UPLOAD_MAX_BATCH_SIZE = 5000
+# Batch size is steered so one transaction takes roughly this long
+UPLOAD_TARGET_BATCH_SECONDS = 0.5
+UPLOAD_MAX_RETRIES = 5
+UPLOAD_RETRY_BACKOFF_SECONDS = 0.2
 
 # Top-K movies to select per genre
 TOP_K = 250
+# A movie is kept if it is in the top-K of one of its genres under any of these keys
+# ('numVotes', 'averageRating' or 'weightedRating')
+TOP_K_RANKING_KEYS = ['numVotes']
+# m in the weighted rating v/(v+m)·R + m/(v+m)·C
+WEIGHTED_RATING_MIN_VOTES = 25_000
 
 # Input file paths
 MOVIE_DATA_PATH = "Data/title.basics.tsv"
@@ -17,6 +36,40 @@ PRINCIPALS_DATA_PATH = "Data/title.principals.tsv"
 # Output directory for generated relationships
 REL_OUTPUT_DIR = "Data/Relationships"
 
+# Parquet cache of parsed TSVs (disable with --no-cache, force with --rebuild-cache)
+CACHE_ENABLED = True
+CACHE_DIR = "Data/Cache"
+CACHE_ROW_GROUP_SIZE = 250_000
+# Rows parsed per chunk while building a cache, and per batch when streaming from it
+CACHE_BUILD_CHUNK_ROWS = 500_000
+
+# Incremental runs (--incremental): manifest of tconst/nconst/relationship content hashes
+INCREMENTAL_STATE_PATH = "Data/etl_state.sqlite"
+
+# Rewritten after every successful load; the app drops its cached reference data when it changes.
+# Same variable and default as Modules/app_config.py, so both sides always agree on the file
+ETL_MARKER_PATH = os.getenv("MOVIEQUEUE_ETL_MARKER", "Data/etl_completed.json")
+
+# neo4j-admin import export (--bulk-import), written to REL_OUTPUT_DIR
+# Rows per CSV data shard
+BULK_SHARD_ROWS = 1_000_000
+# Gzip the data shards (the importer reads .csv.gz directly)
+BULK_COMPRESS = True
+
+# Streaming ingestion (--stream)
+# Target in-memory size of each parsed TSV chunk
+STREAM_CHUNK_MEMORY_MB = 64
+# Rows read for the first chunk, before bytes/row has been measured
+STREAM_INITIAL_CHUNK_ROWS = 100_000
+STREAM_MIN_CHUNK_ROWS = 10_000
+# Chunks are shrunk whenever process RSS crosses this ceiling
+STREAM_MAX_RSS_MB = 1024
+
+# Columns actually used downstream; everything else is dropped while streaming
+STREAM_COLUMNS_BASICS = ['tconst', 'titleType', 'primaryTitle', 'startYear', 'runtimeMinutes', 'genres']
+STREAM_COLUMNS_NAMES = ['nconst', 'primaryName', 'birthYear', 'deathYear', 'primaryProfession']
+STREAM_COLUMNS_PRINCIPALS = ['tconst', 'nconst', 'category', 'job', 'characters']
+
 # Defining data types
 DTYPE_BASICS = {
     'tconst': 'string',
@@ -76,4 +129,12 @@ PROFESSION_TO_RELATIONSHIP = {
     "costume_designer": "DESIGNED_COSTUMES",
     "casting_director": "CAST",
     "choreographer": "CHOREOGRAPHED"
-}
\ No newline at end of file
+}
+
+# Columns kept in each file's Parquet cache (None keeps every column)
+CACHE_COLUMNS = {
+    MOVIE_DATA_PATH: STREAM_COLUMNS_BASICS,
+    RATINGS_DATA_PATH: None,
+    PEOPLE_DATA_PATH: STREAM_COLUMNS_NAMES,
+    PRINCIPALS_DATA_PATH: STREAM_COLUMNS_PRINCIPALS,
+}
@@ -0,0 +1,236 @@
+import os
+import sqlite3
+import pandas as pd
+from ETL_config import INCREMENTAL_STATE_PATH, BATCH_SIZE, REL_BATCH_SIZE, UPLOAD_WORKERS
+from ETL_upload import UploadEngine, iter_frame_records
+
+# Columns that make up each entity's content hash; a change in any of them is an update
+MOVIE_HASH_COLUMNS = ['primaryTitle', 'startYear', 'runtimeMinutes', 'averageRating', 'numVotes', 'genres']
+PERSON_HASH_COLUMNS = ['primaryName', 'birthYear', 'deathYear', 'primaryProfession']
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS movies (tconst TEXT PRIMARY KEY, hash INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS people (nconst TEXT PRIMARY KEY, hash INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS relationships (
+    rel_type TEXT NOT NULL, tconst TEXT NOT NULL, nconst TEXT NOT NULL, hash INTEGER NOT NULL,
+    PRIMARY KEY (rel_type, tconst, nconst)
+);
+"""
+
+
+# ==============================
+# SNAPSHOT HASHING
+# ==============================
+def _row_hashes(df, columns):
+    """Stable 64-bit content hash per row (stored signed, as SQLite integers are)"""
+    prepared = df[columns].copy()
+    for col in columns:
+        if prepared[col].map(lambda v: isinstance(v, list)).any():
+            prepared[col] = prepared[col].map(lambda v: ",".join(v) if isinstance(v, list) else v)
+        prepared[col] = prepared[col].astype("string")
+    return pd.util.hash_pandas_object(prepared, index=False).to_numpy().view("int64")
+
+
+def _relationship_frame(relationship_map):
+    frames = []
+    for rel_type, table in relationship_map.items():
+        df = table.to_pandas()
+        if 'characters' not in df.columns:
+            df['characters'] = ""
+        frames.append(df.assign(rel_type=rel_type))
+    if not frames:
+        return pd.DataFrame(columns=['rel_type', 'tconst', 'nconst', 'characters', 'hash'])
+    rels = pd.concat(frames, ignore_index=True).drop_duplicates(['rel_type', 'tconst', 'nconst'], keep='last')
+    rels['hash'] = _row_hashes(rels, ['characters'])
+    return rels
+
+
+# ==============================
+# STATE MANIFEST
+# ==============================
+def open_state(path=INCREMENTAL_STATE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(STATE_SCHEMA)
+    return conn
+
+
+def _diff(conn, table, keys, snapshot):
+    """Splits a hashed snapshot into (inserts, updates, deletes) against the stored manifest"""
+    state = pd.read_sql_query(f"SELECT {', '.join(keys)}, hash FROM {table}", conn)
+    # Nullable ints so the outer join doesn't round 64-bit hashes through float64
+    state['hash'] = state['hash'].astype('Int64')
+    snapshot = snapshot.assign(hash=snapshot['hash'].astype('Int64'))
+    merged = snapshot.merge(state, on=keys, how='outer', suffixes=('', '_old'), indicator=True)
+    inserts = merged[merged['_merge'] == 'left_only']
+    updates = merged[(merged['_merge'] == 'both') & (merged['hash'] != merged['hash_old'])]
+    deletes = merged.loc[merged['_merge'] == 'right_only', keys]
+    return inserts.drop(columns=['hash_old', '_merge']), updates.drop(columns=['hash_old', '_merge']), deletes
+
+
+def _commit_state(conn, table, keys, upserts, deletes):
+    columns = keys + ['hash']
+    placeholders = ", ".join("?" for _ in columns)
+    where = " AND ".join(f"{k} = ?" for k in keys)
+    with conn:
+        conn.executemany(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                         upserts[columns].astype(object).itertuples(index=False, name=None))
+        conn.executemany(f"DELETE FROM {table} WHERE {where}", deletes[keys].astype(object).itertuples(index=False, name=None))
+
+
+# ==============================
+# DELTA WRITES
+# ==============================
+def _records(df):
+    """Rows as dicts with NaN/NA turned into None so Cypher sees nulls"""
+    return iter_frame_records(df.astype(object).where(pd.notna(df), None))
+
+
+def _push_movies(db, upserts, deletes, workers):
+    if len(upserts):
+        # SET (not ON CREATE SET) so rating/vote changes reach existing nodes; genres are re-synced
+        UploadEngine(db, BATCH_SIZE, workers=workers).run("""
+        UNWIND $movies AS movie
+        MERGE (m:Movie {tconst: movie.tconst})
+        SET m.primaryTitle = movie.primaryTitle,
+            m.startYear = toInteger(movie.startYear),
+            m.runtimeMinutes = toInteger(movie.runtimeMinutes),
+            m.averageRating = toFloat(movie.averageRating),
+            m.numVotes = toInteger(movie.numVotes)
+        WITH m, movie
+        OPTIONAL MATCH (m)-[old:HAS_GENRE]->(g:Genre)
+        WHERE NOT g.type IN movie.genres
+        DELETE old
+        WITH DISTINCT m, movie
+        FOREACH (genre IN movie.genres |
+            MERGE (g:Genre {type: genre})
+            MERGE (m)-[:HAS_GENRE]->(g)
+        )
+        """, _records(upserts[['tconst'] + MOVIE_HASH_COLUMNS]), param="movies", partition_key="tconst",
+            total=len(upserts), desc="Upserting Movies")
+    if len(deletes):
+        # Re-checked here in case someone rated a movie since _rated_movies(); returns what was actually deleted
+        results = db.run_query("""
+        UNWIND $ids AS id
+        MATCH (m:Movie {tconst: id})
+        WHERE NOT EXISTS { MATCH (:User)-[:RATED]->(m) }
+        WITH m, m.tconst AS tconst
+        DETACH DELETE m
+        RETURN tconst
+        """, {"ids": deletes['tconst'].tolist()})
+        return {r["tconst"] for r in results}
+    return set()
+
+
+def _rated_movies(db, ids):
+    """The subset of `ids` that users have rated"""
+    if not ids:
+        return set()
+    results = db.run_query("""
+    UNWIND $ids AS id
+    MATCH (m:Movie {tconst: id})
+    WHERE EXISTS { MATCH (:User)-[:RATED]->(m) }
+    RETURN m.tconst AS tconst
+    """, {"ids": ids})
+    return {r["tconst"] for r in results}
+
+
+def _push_people(db, upserts, deletes, workers):
+    if len(upserts):
+        people = upserts[['nconst'] + PERSON_HASH_COLUMNS].copy()
+        people['primaryProfession'] = people['primaryProfession'].map(lambda x: x.split(",") if pd.notna(x) else [])
+        UploadEngine(db, BATCH_SIZE, workers=workers).run("""
+        UNWIND $people AS person
+        MERGE (p:Person {nconst: person.nconst})
+        SET p.name = person.primaryName,
+            p.birthYear = toInteger(person.birthYear),
+            p.deathYear = toInteger(person.deathYear)
+        WITH p, person
+        OPTIONAL MATCH (p)-[old:HAS_PROFESSION]->(pr:Profession)
+        WHERE NOT pr.type IN person.primaryProfession
+        DELETE old
+        WITH DISTINCT p, person
+        FOREACH (prof IN person.primaryProfession |
+            MERGE (pr:Profession {type: prof})
+            MERGE (p)-[:HAS_PROFESSION]->(pr)
+        )
+        """, _records(people), param="people", partition_key="nconst", total=len(people), desc="Upserting People")
+    if len(deletes):
+        db.run_query("UNWIND $ids AS id MATCH (p:Person {nconst: id}) DETACH DELETE p",
+                     {"ids": deletes['nconst'].tolist()})
+
+
+def _push_relationships(db, upserts, deletes, workers):
+    for rel_type, rows in upserts.groupby('rel_type', sort=False):
+        set_characters = "SET r.characters = row.characters" if rel_type == "ACTED_IN" else ""
+        UploadEngine(db, REL_BATCH_SIZE, workers=workers).run(f"""
+            UNWIND $rows AS row
+            MATCH (p:Person {{nconst: row.nconst}})
+            MATCH (m:Movie {{tconst: row.tconst}})
+            MERGE (p)-[r:{rel_type}]->(m)
+            {set_characters}
+        """, _records(rows[['tconst', 'nconst', 'characters']]), partition_key="tconst", total=len(rows), desc=rel_type)
+    for rel_type, rows in deletes.groupby('rel_type', sort=False):
+        db.run_query(f"""
+            UNWIND $rows AS row
+            MATCH (:Person {{nconst: row.nconst}})-[r:{rel_type}]->(:Movie {{tconst: row.tconst}})
+            DELETE r
+        """, {"rows": rows[['tconst', 'nconst']].to_dict(orient="records")})
+
+
+def run_incremental(db, df_movies, df_people, relationship_map, state_path=INCREMENTAL_STATE_PATH, workers=UPLOAD_WORKERS):
+    """
+    Diffs the filtered snapshot against the state manifest and pushes only inserts, updates and
+    deletes to Neo4j. The manifest is only advanced once the matching writes have succeeded, so a
+    failed run is simply replayed next time.
+    """
+    print("\n[STEP 2] Computing Delta Against Previous Snapshot...")
+    conn = open_state(state_path)
+
+    movies = df_movies.drop_duplicates('tconst').copy()
+    movies['hash'] = _row_hashes(movies, MOVIE_HASH_COLUMNS)
+    people = df_people.drop_duplicates('nconst').copy()
+    people['hash'] = _row_hashes(people, PERSON_HASH_COLUMNS)
+    rels = _relationship_frame(relationship_map)
+
+    movie_ins, movie_upd, movie_del = _diff(conn, 'movies', ['tconst'], movies)
+    people_ins, people_upd, people_del = _diff(conn, 'people', ['nconst'], people)
+    rel_ins, rel_upd, rel_del = _diff(conn, 'relationships', ['rel_type', 'tconst', 'nconst'], rels)
+
+    # Movies that users have rated are kept, with their cast and crew (and those people, whose COLLAB_WEIGHT
+    # edges feed taste profiles), when they drop out of the top-K. Their manifest rows stay as they are,
+    # so they are reconsidered on every run.
+    kept = _rated_movies(db, movie_del['tconst'].tolist())
+    if kept:
+        kept_rels = rel_del['tconst'].isin(kept)
+        kept_people = set(rel_del.loc[kept_rels, 'nconst'])
+        movie_del = movie_del[~movie_del['tconst'].isin(kept)]
+        rel_del = rel_del[~kept_rels]
+        people_del = people_del[~people_del['nconst'].isin(kept_people)]
+        print(f"[INFO] Keeping {len(kept):,} rated movies that left the top-K, and {len(kept_people):,} people credited on them")
+
+    for name, (ins, upd, dele) in {"Movies": (movie_ins, movie_upd, movie_del),
+                                   "People": (people_ins, people_upd, people_del),
+                                   "Relationships": (rel_ins, rel_upd, rel_del)}.items():
+        print(f"[INFO] {name}: {len(ins):,} inserts, {len(upd):,} updates, {len(dele):,} deletes")
+
+    print("\n[STEP 3] Pushing Delta to Neo4j...")
+    movie_up = pd.concat([movie_ins, movie_upd])
+    people_up = pd.concat([people_ins, people_upd])
+    rel_up = pd.concat([rel_ins, rel_upd])
+
+    # Nodes before the relationships that reference them; deletes in the reverse order
+    _push_movies(db, movie_up, movie_del.iloc[0:0], workers)
+    _commit_state(conn, 'movies', ['tconst'], movie_up, movie_del.iloc[0:0])
+    _push_people(db, people_up, people_del.iloc[0:0], workers)
+    _commit_state(conn, 'people', ['nconst'], people_up, people_del.iloc[0:0])
+    _push_relationships(db, rel_up, rel_del, workers)
+    _commit_state(conn, 'relationships', ['rel_type', 'tconst', 'nconst'], rel_up, rel_del)
+    _push_people(db, people_up.iloc[0:0], people_del, workers)
+    _commit_state(conn, 'people', ['nconst'], people_up.iloc[0:0], people_del)
+    deleted = _push_movies(db, movie_up.iloc[0:0], movie_del, workers)
+    _commit_state(conn, 'movies', ['tconst'], movie_up.iloc[0:0], movie_del[movie_del['tconst'].isin(deleted)])
+
+    conn.close()
+    print(f"[INFO] Finished Incremental Update.")
+    return len(movie_up) + len(people_up) + len(rel_up) + len(movie_del) + len(people_del) + len(rel_del)
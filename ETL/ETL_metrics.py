@@ -0,0 +1,68 @@
+import os
+import resource
+import time
+
+
+# ==============================
+# MEMORY PROBES
+# ==============================
+def current_rss_mb():
+    """Resident set size of this process in MB (falls back to the peak on non-Linux hosts)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """High-water RSS of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux and bytes on macOS
+    return peak / 1024 if os.uname().sysname != "Darwin" else peak / (1024 * 1024)
+
+
+# ==============================
+# STAGE METRICS
+# ==============================
+class StageMetrics:
+    """Times an ETL stage and tracks rows processed and peak RSS while it runs"""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.peak_mb = 0.0
+        self.start = None
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.sample()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        self.sample()
+        if exc_type is None:
+            print(f"[METRICS] {self.summary()}")
+        return False
+
+    def sample(self):
+        rss = current_rss_mb()
+        if rss > self.peak_mb:
+            self.peak_mb = rss
+        return rss
+
+    def add_rows(self, n):
+        self.rows += n
+        return self.sample()
+
+    @property
+    def rows_per_sec(self):
+        elapsed = self.elapsed or (time.perf_counter() - self.start)
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.name}: {self.rows:,} rows in {self.elapsed:.1f}s "
+                f"({self.rows_per_sec:,.0f} rows/s), peak RSS {self.peak_mb:,.0f} MB")
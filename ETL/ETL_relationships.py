@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from ETL_config import PROFESSION_TO_RELATIONSHIP
+
+
+# ==============================
+# COLUMNAR RELATIONSHIP CLASSIFIER
+# ==============================
+def _relationship_types(series):
+    """
+    Maps a principals column onto relationship types without touching individual rows:
+    the lookup runs once per distinct value and is broadcast back through the category codes.
+    Unknown or missing values map to None.
+    """
+    as_cat = series.astype('category')
+    categories = as_cat.cat.categories
+    per_category = np.asarray(categories.str.lower().map(PROFESSION_TO_RELATIONSHIP), dtype=object)
+    # Code -1 (missing) lands on the trailing None
+    per_category = np.append(per_category, None)
+    per_category[pd.isna(per_category)] = None
+    return per_category[as_cat.cat.codes.to_numpy()]
+
+
+def classify_relationships(df_principals):
+    """
+    Classifies principals rows by relationship type, using `category` first and `job` as fallback.
+    Returns {rel_type: pyarrow.Table} in first-seen order; ACTED_IN tables carry a `characters`
+    column, every other table just (tconst, nconst).
+    """
+    rel_type = _relationship_types(df_principals['category'])
+    if 'job' in df_principals.columns:
+        missing = pd.isna(rel_type)
+        rel_type[missing] = _relationship_types(df_principals['job'])[missing]
+
+    keep = ~pd.isna(rel_type)
+    frame = pd.DataFrame({
+        'rel_type': rel_type[keep],
+        'tconst': df_principals['tconst'].to_numpy()[keep],
+        'nconst': df_principals['nconst'].to_numpy()[keep],
+    })
+    if 'characters' in df_principals.columns:
+        frame['characters'] = df_principals['characters'].to_numpy()[keep]
+    else:
+        frame['characters'] = None
+
+    tables = {}
+    for rel, group in frame.groupby('rel_type', sort=False):
+        if rel == "ACTED_IN":
+            cols = group[['tconst', 'nconst']].assign(characters=group['characters'].fillna(""))
+        else:
+            cols = group[['tconst', 'nconst']]
+        tables[rel] = pa.Table.from_pandas(cols, preserve_index=False)
+
+    return tables
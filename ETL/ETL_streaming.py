@@ -0,0 +1,80 @@
+import gc
+import pandas as pd
+from ETL_config import STREAM_CHUNK_MEMORY_MB, STREAM_INITIAL_CHUNK_ROWS, STREAM_MIN_CHUNK_ROWS, STREAM_MAX_RSS_MB
+from ETL_metrics import current_rss_mb
+from ETL_cache import cache_enabled, iter_cached
+
+
+# ==============================
+# CHUNKED TSV READER
+# ==============================
+class ChunkSizer:
+    """
+    Chunk length that keeps each chunk near STREAM_CHUNK_MEMORY_MB. It is re-derived from the
+    measured bytes/row of the first chunk, and halved whenever the process RSS crosses
+    STREAM_MAX_RSS_MB so peak memory stays flat.
+    """
+
+    def __init__(self):
+        self.rows = STREAM_INITIAL_CHUNK_ROWS
+        self.base_rows = None
+        self.scale = 1.0
+
+    def observe(self, chunk, metrics=None):
+        if self.base_rows is None and len(chunk):
+            bytes_per_row = chunk.memory_usage(deep=True).sum() / len(chunk)
+            self.base_rows = max(STREAM_MIN_CHUNK_ROWS, int(STREAM_CHUNK_MEMORY_MB * 1024 * 1024 / bytes_per_row))
+
+        rss = metrics.add_rows(len(chunk)) if metrics else current_rss_mb()
+        if rss > STREAM_MAX_RSS_MB:
+            self.scale = max(self.scale / 2, STREAM_MIN_CHUNK_ROWS / (self.base_rows or self.rows))
+            gc.collect()
+        elif rss < 0.8 * STREAM_MAX_RSS_MB:
+            self.scale = min(1.0, self.scale * 2)
+
+        self.rows = max(STREAM_MIN_CHUNK_ROWS, int((self.base_rows or self.rows) * self.scale))
+
+
+def iter_tsv_chunks(path, dtype, usecols=None, metrics=None):
+    """
+    Yields a TSV file as DataFrame chunks sized by ChunkSizer, from its Parquet cache when that is
+    enabled (already column-pruned and decoded) or straight from the TSV otherwise.
+    """
+    sizer = ChunkSizer()
+    if cache_enabled():
+        for chunk in iter_cached(path, dtype, columns=usecols, batch_rows=lambda: sizer.rows):
+            sizer.observe(chunk, metrics)
+            yield chunk
+        return
+
+    if usecols is not None:
+        dtype = {col: t for col, t in dtype.items() if col in usecols}
+
+    with pd.read_csv(path, delimiter='\t', dtype=dtype, na_values='\\N', usecols=usecols, iterator=True) as reader:
+        while True:
+            try:
+                chunk = reader.get_chunk(sizer.rows)
+            except StopIteration:
+                return
+            sizer.observe(chunk, metrics)
+            yield chunk
+
+
+# ==============================
+# CHUNKED FILTERS
+# ==============================
+def stream_filter(path, dtype, column, keep, usecols=None, metrics=None):
+    """Yields only the rows of each chunk whose `column` value is in `keep`"""
+    for chunk in iter_tsv_chunks(path, dtype, usecols=usecols, metrics=metrics):
+        survivors = chunk[chunk[column].isin(keep)]
+        del chunk
+        if len(survivors):
+            yield survivors
+
+
+def collect_chunks(chunks, columns=None):
+    """Concatenates surviving chunks into a single frame (empty frame if nothing survived)"""
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from ETL_config import TOP_K, WEIGHTED_RATING_MIN_VOTES
+
+
+# ==============================
+# RANKING KEYS
+# ==============================
+def weighted_rating(df, min_votes=WEIGHTED_RATING_MIN_VOTES):
+    """IMDb-style Bayesian rating: v/(v+m)·R + m/(v+m)·C, with C the catalogue mean rating"""
+    votes = df['numVotes'].to_numpy(dtype='float64')
+    rating = pd.to_numeric(df['averageRating'], errors='coerce').to_numpy(dtype='float64')
+    mean = np.nanmean(rating) if len(rating) else 0.0
+    return votes / (votes + min_votes) * rating + min_votes / (votes + min_votes) * mean
+
+
+def ranking_values(df, key):
+    if key == 'weightedRating' and key not in df.columns:
+        return weighted_rating(df)
+    return pd.to_numeric(df[key], errors='coerce').to_numpy(dtype='float64')
+
+
+# ==============================
+# PER-GENRE TOP-K
+# ==============================
+def _genre_pairs(genres):
+    """
+    (row index, genre code) for every movie/genre pair, computed in Arrow without exploding the
+    frame. `genres` may hold comma-separated strings (as read from the TSV) or lists.
+    """
+    first = genres.first_valid_index()
+    if first is not None and isinstance(genres.loc[first], list):
+        lists = pa.array(genres, type=pa.list_(pa.string()), from_pandas=True)
+    else:
+        lists = pc.split_pattern(pa.array(genres.astype(object), type=pa.string(), from_pandas=True), ",")
+    rows = pc.list_parent_indices(lists).to_numpy()
+    flat = pc.list_flatten(lists)
+    # "" is what an empty genres field splits into
+    keep = pc.not_equal(flat, "").to_numpy(zero_copy_only=False)
+    codes = pc.dictionary_encode(flat).indices.to_numpy()
+    return rows[keep], codes[keep]
+
+
+def select_top_k(df, ks=(TOP_K,), keys=('numVotes',)):
+    """
+    Per-genre top-K over a frame whose `genres` column holds comma-separated strings or lists.
+
+    One stable sort per ranking key orders every (genre, movie) pair by genre then key
+    descending; each pair's rank within its genre then answers every K at once.
+    Ties keep catalogue order, matching `nlargest(keep='first')`.
+    Returns {(key, k): ndarray of selected row positions}.
+    """
+    rows, codes = _genre_pairs(df['genres'])
+    selected = {}
+    for key in keys:
+        values = ranking_values(df, key)[rows]
+        valid = ~np.isnan(values)
+        key_rows, key_codes, key_values = rows[valid], codes[valid], values[valid]
+
+        order = np.lexsort((-key_values, key_codes))
+        sorted_codes = key_codes[order]
+        group_start = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+        group_sizes = np.diff(np.r_[group_start, len(sorted_codes)])
+        rank = np.arange(len(sorted_codes)) - np.repeat(group_start, group_sizes)
+
+        sorted_rows = key_rows[order]
+        for k in ks:
+            selected[(key, k)] = np.unique(sorted_rows[rank < k])
+    return selected
+
+
+def top_movie_mask(df, k=TOP_K, keys=('numVotes',)):
+    """Boolean mask of rows that are in the top-K of any of their genres under any ranking key"""
+    mask = np.zeros(len(df), dtype=bool)
+    for positions in select_top_k(df, ks=(k,), keys=keys).values():
+        mask[positions] = True
+    return mask
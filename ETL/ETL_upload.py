@@ -0,0 +1,145 @@
+import queue
+import random
+import threading
+import time
+import zlib
+from tqdm import tqdm
+from neo4j.exceptions import TransientError, ServiceUnavailable, SessionExpired
+from ETL_config import UPLOAD_WORKERS, UPLOAD_QUEUE_SIZE, UPLOAD_MIN_BATCH_SIZE, UPLOAD_MAX_BATCH_SIZE, UPLOAD_TARGET_BATCH_SECONDS, UPLOAD_MAX_RETRIES, UPLOAD_RETRY_BACKOFF_SECONDS
+
+# Errors worth replaying a batch for (TransientError covers DeadlockDetected)
+RETRYABLE_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
+
+_STOP = object()
+
+
+# ==============================
+# ROW SOURCES
+# ==============================
+def iter_frame_records(df, step=10_000):
+    """Yields DataFrame rows as dicts, converting one slice at a time instead of the whole frame"""
+    for i in range(0, len(df), step):
+        yield from df.iloc[i:i+step].to_dict(orient="records")
+
+
+def iter_table_records(table, step=10_000):
+    """Yields pyarrow Table rows as dicts, one record batch at a time"""
+    for batch in table.to_batches(max_chunksize=step):
+        yield from batch.to_pylist()
+
+
+def _write_batch(tx, query, param, batch):
+    tx.run(query, {param: batch}).consume()
+
+
+# ==============================
+# UPLOAD ENGINE
+# ==============================
+class UploadEngine:
+    """
+    Pipelined UNWIND uploader.
+
+    The calling thread slices rows into batches while a pool of workers, each with its own
+    session and bounded queue, sends them as managed write transactions. Batches are retried
+    with jittered backoff on transient errors/deadlocks, and the batch size is steered towards
+    UPLOAD_TARGET_BATCH_SECONDS from observed latency. When a partition key is given, rows with
+    the same key always go to the same worker so workers don't contend for the same node.
+    """
+
+    def __init__(self, db, batch_size, workers=UPLOAD_WORKERS, queue_size=UPLOAD_QUEUE_SIZE,
+                 min_batch_size=UPLOAD_MIN_BATCH_SIZE, max_batch_size=UPLOAD_MAX_BATCH_SIZE,
+                 target_seconds=UPLOAD_TARGET_BATCH_SECONDS, max_retries=UPLOAD_MAX_RETRIES):
+        self.db = db
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_seconds = target_seconds
+        self.max_retries = max_retries
+        self.batch_size = min(max(batch_size, min_batch_size), max_batch_size)
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    # ---------- batch sizing ----------
+    def _observe(self, rows, seconds):
+        if rows == 0 or seconds <= 0:
+            return
+        ideal = self.target_seconds * rows / seconds
+        with self._lock:
+            # Move halfway towards the ideal size to damp noise from individual batches
+            resized = int(0.5 * self.batch_size + 0.5 * ideal)
+            self.batch_size = min(max(resized, self.min_batch_size), self.max_batch_size)
+
+    # ---------- worker ----------
+    def _send(self, session, query, param, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                session.execute_write(_write_batch, query, param, batch)
+                return
+            except RETRYABLE_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(UPLOAD_RETRY_BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random()))
+
+    def _worker(self, work, query, param, progress, errors):
+        try:
+            with self.db.session() as session:
+                while True:
+                    batch = work.get()
+                    if batch is _STOP:
+                        return
+                    if errors:
+                        continue  # drain so the producer never blocks on a dead pipeline
+                    start = time.perf_counter()
+                    self._send(session, query, param, batch)
+                    self._observe(len(batch), time.perf_counter() - start)
+                    with self._lock:
+                        progress.update(len(batch))
+        except Exception as e:
+            errors.append(e)
+            while work.get() is not _STOP:
+                pass
+
+    # ---------- producer ----------
+    def run(self, query, rows, param="rows", partition_key=None, total=None, desc="Uploading"):
+        """Uploads `rows` (an iterable of dicts) through `query`, which must UNWIND `$<param>`"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        errors = []
+        progress = tqdm(total=total, desc=desc)
+        threads = [
+            threading.Thread(target=self._worker, args=(q, query, param, progress, errors), daemon=True)
+            for q in queues
+        ]
+        for t in threads:
+            t.start()
+
+        buffers = [[] for _ in queues]
+        next_worker = 0
+        try:
+            for row in rows:
+                if errors:
+                    break
+                if partition_key is None:
+                    slot = next_worker
+                else:
+                    slot = zlib.crc32(str(row[partition_key]).encode()) % self.workers
+                buffers[slot].append(row)
+                if len(buffers[slot]) >= self.batch_size:
+                    queues[slot].put(buffers[slot])
+                    buffers[slot] = []
+                    if partition_key is None:
+                        next_worker = (next_worker + 1) % self.workers
+            for slot, buffer in enumerate(buffers):
+                if buffer and not errors:
+                    queues[slot].put(buffer)
+        finally:
+            for q in queues:
+                q.put(_STOP)
+            for t in threads:
+                t.join()
+            progress.close()
+
+        if errors:
+            raise errors[0]
@@ -1,12 +1,23 @@
 import pandas as pd
 import ast
-from tqdm import tqdm
-from collections import defaultdict
-from ETL_config import BATCH_SIZE, TOP_K, MOVIE_DATA_PATH, RATINGS_DATA_PATH, PEOPLE_DATA_PATH, PRINCIPALS_DATA_PATH, REL_OUTPUT_DIR, DTYPE_BASICS, DTYPE_RATINGS, DTYPE_NAMES, DTYPE_PRINCIPALS, PROFESSION_TO_RELATIONSHIP
+from ETL_config import BATCH_SIZE, REL_BATCH_SIZE, UPLOAD_WORKERS, TOP_K, MOVIE_DATA_PATH, RATINGS_DATA_PATH, PEOPLE_DATA_PATH, PRINCIPALS_DATA_PATH, REL_OUTPUT_DIR, DTYPE_BASICS, DTYPE_RATINGS, DTYPE_NAMES, DTYPE_PRINCIPALS, PROFESSION_TO_RELATIONSHIP
+from ETL_config import ETL_MARKER_PATH, TOP_K_RANKING_KEYS, STREAM_COLUMNS_BASICS, STREAM_COLUMNS_NAMES, STREAM_COLUMNS_PRINCIPALS
+from ETL_metrics import StageMetrics
+from ETL_streaming import iter_tsv_chunks, stream_filter, collect_chunks
+from ETL_relationships import classify_relationships
+from ETL_top_k import top_movie_mask
+from ETL_upload import UploadEngine, iter_frame_records, iter_table_records
+from ETL_bulk_import import write_bulk_import, validate_bulk_import, import_command
+from ETL_incremental import run_incremental
+from ETL_cache import configure_cache, cache_enabled, read_cached, key_range_filter
+import argparse
+import json
+import time
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from Database.Neo4j_Connection import Connect
+from Database.Schema import apply_schema
 
 os.makedirs(REL_OUTPUT_DIR, exist_ok=True)
 
@@ -16,30 +27,16 @@ os.makedirs(REL_OUTPUT_DIR, exist_ok=True)
 def setup_constraints(db):
     print("[STEP 0] Setting up database...")
 
-    with db.driver.session() as session:
-        session.run("""
-        CREATE CONSTRAINT movie_tconst_unique IF NOT EXISTS
-        FOR (m:Movie)
-        REQUIRE m.tconst IS UNIQUE
-        """)
-
-        session.run("""
-        CREATE CONSTRAINT genre_type_unique IF NOT EXISTS
-        FOR (g:Genre)
-        REQUIRE g.type IS UNIQUE
-        """)
-
-        session.run("""
-        CREATE CONSTRAINT person_nconst_unique IF NOT EXISTS
-        FOR (p:Person)
-        REQUIRE p.nconst IS UNIQUE
-        """)
-
-        session.run("""
-        CREATE CONSTRAINT platform_name_unique IF NOT EXISTS
-        FOR (s:StreamingPlatform)
-        REQUIRE s.name IS UNIQUE
-        """)
+    # Every constraint and index (including the app's) is declared in Database/Schema.py
+    failed = apply_schema(db)
+    if failed:
+        # apply_schema has printed why each one failed; loading without them would MERGE on unindexed keys
+        print(f"[ERROR] {len(failed)} constraint(s)/index(es) could not be created: {', '.join(failed)}")
+        if "user_username_unique" in failed:
+            print("[ERROR] Registration is not protected against duplicate usernames until the existing "
+                  "duplicates are resolved.")
+        print("[ERROR] Fix the cause, then rerun the ETL (or `python -m Database.Schema`).")
+        sys.exit(1)
 
     print(f"[INFO] Finished Setting Up Database.")
 
@@ -47,18 +44,37 @@ def setup_constraints(db):
 # ==============================
 # READ TSV FILES
 # ==============================
-def read_data(path, dtype):
-    return pd.read_csv(path, delimiter='\t', dtype=dtype, na_values='\\N')
+def read_data(path, dtype, metrics=None, filters=None):
+    # `filters` are pushed down into the Parquet cache; callers still filter the frame themselves
+    if cache_enabled():
+        df = read_cached(path, dtype, filters=filters)
+    else:
+        df = pd.read_csv(path, delimiter='\t', dtype=dtype, na_values='\\N')
+    if metrics:
+        metrics.add_rows(len(df))
+    return df
+
+def _key_filter(column, keys):
+    keys = list(keys)
+    key_range = key_range_filter(column, keys)
+    return key_range + [(column, 'in', keys)] if key_range else None
 
 # ==============================
 # FILTER MOVIES
 # ==============================
-def filter_top_movies(movie_csv, rating_csv, DTYPE_BASICS, DTYPE_RATINGS):
+def filter_top_movies(movie_csv, rating_csv, DTYPE_BASICS, DTYPE_RATINGS, stream=False, metrics=None):
     print("\n[STEP 1] Filtering Movies...")
 
-    df = read_data(movie_csv, DTYPE_BASICS)
-    ratings = read_data(rating_csv, DTYPE_RATINGS)
-    df = df[df['titleType'] == 'movie']
+    if stream:
+        df = collect_chunks(
+            chunk[chunk['titleType'] == 'movie']
+            for chunk in iter_tsv_chunks(movie_csv, DTYPE_BASICS, usecols=STREAM_COLUMNS_BASICS, metrics=metrics)
+        )
+        ratings = collect_chunks(iter_tsv_chunks(rating_csv, DTYPE_RATINGS, metrics=metrics))
+    else:
+        df = read_data(movie_csv, DTYPE_BASICS, metrics, filters=[('titleType', '==', 'movie')])
+        ratings = read_data(rating_csv, DTYPE_RATINGS, metrics)
+        df = df[df['titleType'] == 'movie']
 
     merged_data = df.merge(ratings, how='left', on='tconst')
 
@@ -66,15 +82,12 @@ def filter_top_movies(movie_csv, rating_csv, DTYPE_BASICS, DTYPE_RATINGS):
     merged_data = merged_data.dropna(subset=['numVotes'])
     merged_data['numVotes'] = merged_data['numVotes'].astype(int)
 
-    # Convert genres to list
-    merged_data['genres'] = merged_data['genres'].fillna("").apply(lambda x: x.split(",") if x else [])
+    # Per-genre top-K from a single sort per ranking key, keeping the full original rows (with all genres)
+    merged_data = merged_data.reset_index(drop=True)
+    top_movies = merged_data[top_movie_mask(merged_data, TOP_K, TOP_K_RANKING_KEYS)].copy()
 
-    # Find top movies BEFORE exploding
-    df_exploded = merged_data.explode('genres')
-    top_by_genre = df_exploded.groupby('genres', group_keys=False).apply(lambda x: x.nlargest(TOP_K, 'numVotes'))
-
-    # Then, get the full original rows (with all genres) for selected movies
-    top_movies = merged_data[merged_data['tconst'].isin(top_by_genre['tconst'])]
+    # Convert genres to list (only for the selected movies)
+    top_movies['genres'] = top_movies['genres'].fillna("").apply(lambda x: x.split(",") if x else [])
 
     print(f"[INFO] Filtered down to {len(top_movies)} top movies.")
     return top_movies
@@ -82,44 +95,57 @@ def filter_top_movies(movie_csv, rating_csv, DTYPE_BASICS, DTYPE_RATINGS):
 # ==============================
 # UPLOAD MOVIES
 # ==============================
-def upload_movies(df, db):
+def upload_movies(df, db, workers=UPLOAD_WORKERS):
     print("\n[STEP 2] Uploading Movies...")
 
-    with db.driver.session() as session:
-        for i in tqdm(range(0, len(df), BATCH_SIZE), desc="Uploading Movies"):
-            batch = df.iloc[i:i+BATCH_SIZE].to_dict(orient="records")
-            session.run("""
-            UNWIND $movies AS movie
-            MERGE (m:Movie {tconst: movie.tconst})
-            ON CREATE SET
-                m.primaryTitle = movie.primaryTitle,
-                m.startYear = toInteger(movie.startYear),
-                m.runtimeMinutes = CASE WHEN movie.runtimeMinutes=\"\\N\" THEN NULL ELSE toInteger(movie.runtimeMinutes) END,
-                m.averageRating = CASE WHEN movie.averageRating=\"\\N\" THEN NULL ELSE toFloat(movie.averageRating) END,
-                m.numVotes = movie.numVotes
-
-            FOREACH (genre IN movie.genres |
-                MERGE (g:Genre {type: genre})
-                MERGE (m)-[:HAS_GENRE]->(g)
-            )
-            """, {"movies": batch})
-
-    print(f"[INFO] Finished Movies Upload.")
+    # Create the shared Genre nodes up front so the MERGEs in each batch find them instead of racing to create them.
+    # Linking still locks the Genre node, so parallel batches do contend on popular genres; the resulting
+    # deadlocks are TransientErrors that UploadEngine retries with backoff.
+    genres = sorted({g for gs in df['genres'] for g in gs})
+    db.run_query("UNWIND $genres AS genre MERGE (:Genre {type: genre})", {"genres": genres})
+
+    engine = UploadEngine(db, BATCH_SIZE, workers=workers)
+    engine.run("""
+    UNWIND $movies AS movie
+    MERGE (m:Movie {tconst: movie.tconst})
+    ON CREATE SET
+        m.primaryTitle = movie.primaryTitle,
+        m.startYear = toInteger(movie.startYear),
+        m.runtimeMinutes = CASE WHEN movie.runtimeMinutes=\"\\N\" THEN NULL ELSE toInteger(movie.runtimeMinutes) END,
+        m.averageRating = CASE WHEN movie.averageRating=\"\\N\" THEN NULL ELSE toFloat(movie.averageRating) END,
+        m.numVotes = movie.numVotes
+
+    FOREACH (genre IN movie.genres |
+        MERGE (g:Genre {type: genre})
+        MERGE (m)-[:HAS_GENRE]->(g)
+    )
+    """, iter_frame_records(df), param="movies", partition_key="tconst", total=len(df), desc="Uploading Movies")
+
+    print(f"[INFO] Finished Movies Upload ({engine.retries} retried batches).")
 
 # ==============================
 # FILTER PEOPLE
 # ==============================
-def filter_people(people_csv, principals_csv, valid_movie_ids, DTYPE_NAMES, DTYPE_PRINCIPALS):
+def filter_people(people_csv, principals_csv, valid_movie_ids, DTYPE_NAMES, DTYPE_PRINCIPALS, stream=False, metrics=None):
     print("\n[STEP 3] Filtering People...")
 
-    
-    df_p = read_data(principals_csv, DTYPE_PRINCIPALS)
-    df_p = df_p[df_p['tconst'].isin(valid_movie_ids)]
+    if stream:
+        # Only rows that survive the tconst/nconst filters are ever held in memory
+        df_p = collect_chunks(stream_filter(principals_csv, DTYPE_PRINCIPALS, 'tconst', set(valid_movie_ids),
+                                            usecols=STREAM_COLUMNS_PRINCIPALS, metrics=metrics),
+                              columns=STREAM_COLUMNS_PRINCIPALS)
+        involved_people = set(df_p['nconst'].unique())
+        df_people = collect_chunks(stream_filter(people_csv, DTYPE_NAMES, 'nconst', involved_people,
+                                                 usecols=STREAM_COLUMNS_NAMES, metrics=metrics),
+                                   columns=STREAM_COLUMNS_NAMES)
+    else:
+        df_p = read_data(principals_csv, DTYPE_PRINCIPALS, metrics, filters=_key_filter('tconst', valid_movie_ids))
+        df_p = df_p[df_p['tconst'].isin(valid_movie_ids)]
 
-    involved_people = set(df_p['nconst'].unique())
+        involved_people = set(df_p['nconst'].unique())
 
-    df_people = read_data(people_csv, DTYPE_NAMES)
-    df_people = df_people[df_people['nconst'].isin(involved_people)]
+        df_people = read_data(people_csv, DTYPE_NAMES, metrics, filters=_key_filter('nconst', involved_people))
+        df_people = df_people[df_people['nconst'].isin(involved_people)]
 
     print(f"[INFO] Filtered down to {len(df_people)} people.")
 
@@ -128,31 +154,32 @@ def filter_people(people_csv, principals_csv, valid_movie_ids, DTYPE_NAMES, DTYP
 # ==============================
 # UPLOAD PEOPLE
 # ==============================
-def upload_people(df, db):
+def upload_people(df, db, workers=UPLOAD_WORKERS):
     print("\n[STEP 4] Uploading People...")
 
     df["birthYear"] = df["birthYear"].fillna("0").astype(int)
     df["deathYear"] = df["deathYear"].fillna("0").astype(int)
     df["primaryProfession"] = df["primaryProfession"].apply(lambda x: x.split(",") if pd.notna(x) else [])
 
-    with db.driver.session() as session:
-        for i in tqdm(range(0, len(df), BATCH_SIZE), desc="Uploading People"):
-            batch = df.iloc[i:i+BATCH_SIZE].to_dict(orient="records")
-            session.run("""
-            UNWIND $people AS person
-            MERGE (p:Person {nconst: person.nconst})
-            ON CREATE SET
-                p.name = person.primaryName,
-                p.birthYear = CASE WHEN person.birthYear=0 THEN NULL ELSE person.birthYear END,
-                p.deathYear = CASE WHEN person.deathYear=0 THEN NULL ELSE person.deathYear END
+    professions = sorted({prof for profs in df["primaryProfession"] for prof in profs})
+    db.run_query("UNWIND $professions AS prof MERGE (:Profession {type: prof})", {"professions": professions})
 
-            FOREACH (prof IN person.primaryProfession |
-                MERGE (pr:Profession {type: prof})
-                MERGE (p)-[:HAS_PROFESSION]->(pr)
-            )
-            """, {"people": batch})
+    engine = UploadEngine(db, BATCH_SIZE, workers=workers)
+    engine.run("""
+    UNWIND $people AS person
+    MERGE (p:Person {nconst: person.nconst})
+    ON CREATE SET
+        p.name = person.primaryName,
+        p.birthYear = CASE WHEN person.birthYear=0 THEN NULL ELSE person.birthYear END,
+        p.deathYear = CASE WHEN person.deathYear=0 THEN NULL ELSE person.deathYear END
 
-    print(f"[INFO] Finished People Upload.")
+    FOREACH (prof IN person.primaryProfession |
+        MERGE (pr:Profession {type: prof})
+        MERGE (p)-[:HAS_PROFESSION]->(pr)
+    )
+    """, iter_frame_records(df), param="people", partition_key="nconst", total=len(df), desc="Uploading People")
+
+    print(f"[INFO] Finished People Upload ({engine.retries} retried batches).")
 
 # ==============================
 # FILTER RELATIONSHIPS
@@ -160,35 +187,8 @@ def upload_people(df, db):
 def filter_relationships(df_principals):
     print("\n[STEP 5] Filtering People -> Movie Relationships...")
 
-    relationship_map = defaultdict(list)
-
-    for _, row in df_principals.iterrows():
-        tconst = row['tconst']
-        nconst = row['nconst']
-        category = row.get('category', '')
-        job = row.get('job', '')
-
-        rel_type = None
-
-        if pd.notna(category) and category.lower() in PROFESSION_TO_RELATIONSHIP:
-            rel_type = PROFESSION_TO_RELATIONSHIP[category.lower()]
-        elif pd.notna(job) and job.lower() in PROFESSION_TO_RELATIONSHIP:
-            rel_type = PROFESSION_TO_RELATIONSHIP[job.lower()]
-        else:
-            continue  # skip unknown/unsupported types
-
-        if rel_type == "ACTED_IN":
-            characters = row.get('characters', '')
-            relationship_map[rel_type].append({
-                'tconst': tconst,
-                'nconst': nconst,
-                'characters': characters if pd.notna(characters) else ""
-            })
-        else:
-            relationship_map[rel_type].append({
-                'tconst': tconst,
-                'nconst': nconst
-            })
+    # One Arrow table per relationship type, classified column-wise (category, then job)
+    relationship_map = classify_relationships(df_principals)
 
     print(f"[INFO] Finished Filtering People -> Movie Relationships.")
     return relationship_map
@@ -196,31 +196,33 @@ def filter_relationships(df_principals):
 # ==============================
 # UPLOAD RELATIONSHIP 
 # ==============================
-def upload_relationships(relationship_map, db):
+def upload_relationships(relationship_map, db, workers=UPLOAD_WORKERS):
     print("\n[STEP 6] Uploading People -> Movie Relationships...")
 
-    with db.driver.session() as session:
-        for rel_type, rows in relationship_map.items():
-            print(f"[INFO] Uploading {rel_type} relationships ({len(rows)} entries)...")
-
-            for i in range(0, len(rows), 500):  # batch in chunks
-                chunk = rows[i:i+500]
-
-                if rel_type == "ACTED_IN":
-                    session.run(f"""
-                        UNWIND $rows AS row
-                        MATCH (p:Person {{nconst: row.nconst}})
-                        MATCH (m:Movie {{tconst: row.tconst}})
-                        MERGE (p)-[r:{rel_type}]->(m)
-                        SET r.characters = row.characters
-                    """, parameters={'rows': chunk})
-                else:
-                    session.run(f"""
-                        UNWIND $rows AS row
-                        MATCH (p:Person {{nconst: row.nconst}})
-                        MATCH (m:Movie {{tconst: row.tconst}})
-                        MERGE (p)-[:{rel_type}]->(m)
-                    """, parameters={'rows': chunk})
+    for rel_type, rows in relationship_map.items():
+        print(f"[INFO] Uploading {rel_type} relationships ({len(rows)} entries)...")
+
+        if rel_type == "ACTED_IN":
+            query = f"""
+                UNWIND $rows AS row
+                MATCH (p:Person {{nconst: row.nconst}})
+                MATCH (m:Movie {{tconst: row.tconst}})
+                MERGE (p)-[r:{rel_type}]->(m)
+                SET r.characters = row.characters
+            """
+        else:
+            query = f"""
+                UNWIND $rows AS row
+                MATCH (p:Person {{nconst: row.nconst}})
+                MATCH (m:Movie {{tconst: row.tconst}})
+                MERGE (p)-[:{rel_type}]->(m)
+            """
+
+        # Every relationship touching a movie goes through the same worker, so workers never lock the
+        # same Movie node. Person nodes are not partitioned: someone credited on movies in different
+        # partitions is locked by several workers, and those conflicts are handled by UploadEngine's retries
+        engine = UploadEngine(db, REL_BATCH_SIZE, workers=workers)
+        engine.run(query, iter_table_records(rows), partition_key="tconst", total=len(rows), desc=rel_type)
 
     print(f"[INFO] Finished Uploading People -> Movie Relationships.")
 
@@ -229,20 +231,110 @@ def upload_relationships(relationship_map, db):
 # ==============================
 # PIPELINE
 # ==============================
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load IMDb datasets into the MovieQueue graph.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read TSVs in bounded chunks (see STREAM_* in ETL_config.py) to keep peak memory flat")
+    parser.add_argument("--bulk-import", action="store_true",
+                        help="Write neo4j-admin import CSVs to REL_OUTPUT_DIR instead of uploading through Cypher")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Diff against the previous snapshot (INCREMENTAL_STATE_PATH) and only push inserts, updates and deletes")
+    parser.add_argument("--constraints-only", action="store_true",
+                        help="Only create the database constraints (e.g. after a bulk import)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Parse the TSVs directly instead of going through the Parquet cache")
+    parser.add_argument("--rebuild-cache", action="store_true",
+                        help="Rebuild the Parquet cache of every TSV read in this run")
+    parser.add_argument("--workers", type=int, default=UPLOAD_WORKERS,
+                        help="Parallel Neo4j upload workers")
+    return parser.parse_args()
+
+
+def write_completion_marker(mode):
+    """Signals running app processes that the catalogue changed (see Modules/ReferenceData.py)"""
+    with open(ETL_MARKER_PATH, "w") as f:
+        json.dump({"completed_at": time.time(), "mode": mode}, f)
+    print(f"[INFO] Wrote ETL completion marker to {ETL_MARKER_PATH}")
+
+
+def run_bulk_import(args):
+    """Fresh-database fast path: same filtering, but writes neo4j-admin import CSVs instead of MERGEing"""
+    with StageMetrics("Filter Movies") as m:
+        df_movies = filter_top_movies(MOVIE_DATA_PATH, RATINGS_DATA_PATH, DTYPE_BASICS, DTYPE_RATINGS, stream=args.stream, metrics=m)
+    with StageMetrics("Filter People") as m:
+        df_people, df_principals = filter_people(PEOPLE_DATA_PATH, PRINCIPALS_DATA_PATH, df_movies['tconst'].unique(), DTYPE_NAMES, DTYPE_PRINCIPALS, stream=args.stream, metrics=m)
+    with StageMetrics("Filter Relationships") as m:
+        relationship_map = filter_relationships(df_principals)
+        m.add_rows(len(df_principals))
+
+    with StageMetrics("Write Import Files") as m:
+        manifest = write_bulk_import(df_movies, df_people, relationship_map)
+        m.add_rows(sum(entry["rows"] for entry in manifest.values()))
+
+    if validate_bulk_import(manifest, df_movies, df_people, relationship_map):
+        sys.exit(1)
+
+    print("\n[INFO] Stop the database, then run:")
+    print(import_command(manifest))
+    print("[INFO] Afterwards start the database and create the constraints with --constraints-only.")
+
+
+def run_incremental_update(args, db):
+    """Nightly refresh: same filtering, but only the rows that changed since the last run are written"""
+    with StageMetrics("Filter Movies") as m:
+        df_movies = filter_top_movies(MOVIE_DATA_PATH, RATINGS_DATA_PATH, DTYPE_BASICS, DTYPE_RATINGS, stream=args.stream, metrics=m)
+    with StageMetrics("Filter People") as m:
+        df_people, df_principals = filter_people(PEOPLE_DATA_PATH, PRINCIPALS_DATA_PATH, df_movies['tconst'].unique(), DTYPE_NAMES, DTYPE_PRINCIPALS, stream=args.stream, metrics=m)
+    with StageMetrics("Filter Relationships") as m:
+        relationship_map = filter_relationships(df_principals)
+        m.add_rows(len(df_principals))
+
+    with StageMetrics("Apply Delta") as m:
+        m.add_rows(run_incremental(db, df_movies, df_people, relationship_map, workers=args.workers))
+
+
 if __name__ == "__main__":
+    args = parse_args()
     print("Starting ETL Script...")
+    configure_cache(enabled=not args.no_cache, rebuild=args.rebuild_cache)
+
+    if args.bulk_import:
+        run_bulk_import(args)
+        print("\n✅ Bulk import files written successfully.")
+        sys.exit(0)
 
     db = Connect()
 
     setup_constraints(db)
-
-    df_movies = filter_top_movies(MOVIE_DATA_PATH, RATINGS_DATA_PATH, DTYPE_BASICS, DTYPE_RATINGS)
-    upload_movies(df_movies, db)
-
-    df_people, df_principals = filter_people(PEOPLE_DATA_PATH, PRINCIPALS_DATA_PATH, df_movies['tconst'].unique(), DTYPE_NAMES, DTYPE_PRINCIPALS)
-    upload_people(df_people, db)
-
-    relationship_map = filter_relationships(df_principals)    
-    upload_relationships(relationship_map, db)
-
-    print("\n✅ Full ETL completed successfully.")
\ No newline at end of file
+    if args.constraints_only:
+        # After a bulk import this is the first run against the newly loaded catalogue
+        write_completion_marker("constraints")
+        sys.exit(0)
+
+    if args.incremental:
+        run_incremental_update(args, db)
+        write_completion_marker("incremental")
+        print("\n✅ Incremental ETL completed successfully.")
+        sys.exit(0)
+
+    with StageMetrics("Filter Movies") as m:
+        df_movies = filter_top_movies(MOVIE_DATA_PATH, RATINGS_DATA_PATH, DTYPE_BASICS, DTYPE_RATINGS, stream=args.stream, metrics=m)
+    with StageMetrics("Upload Movies") as m:
+        upload_movies(df_movies, db, workers=args.workers)
+        m.add_rows(len(df_movies))
+
+    with StageMetrics("Filter People") as m:
+        df_people, df_principals = filter_people(PEOPLE_DATA_PATH, PRINCIPALS_DATA_PATH, df_movies['tconst'].unique(), DTYPE_NAMES, DTYPE_PRINCIPALS, stream=args.stream, metrics=m)
+    with StageMetrics("Upload People") as m:
+        upload_people(df_people, db, workers=args.workers)
+        m.add_rows(len(df_people))
+
+    with StageMetrics("Filter Relationships") as m:
+        relationship_map = filter_relationships(df_principals)
+        m.add_rows(len(df_principals))
+    with StageMetrics("Upload Relationships") as m:
+        upload_relationships(relationship_map, db, workers=args.workers)
+        m.add_rows(sum(len(rows) for rows in relationship_map.values()))
+
+    write_completion_marker("full")
+    print("\n✅ Full ETL completed successfully.")
@@ -1,57 +1,87 @@
+import hashlib
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
+import plotly.graph_objects as go
+from Modules.Cache import TTLLRUCache
 from Modules.theme_config import CUSTOM_THEME
+from Modules.app_config import FIGURE_CACHE_SIZE, FIGURE_CACHE_TTL_SECONDS
+
+# Finished figures keyed on a hash of their data; shared by every session, since equal data draws an equal chart
+figure_cache = TTLLRUCache(FIGURE_CACHE_SIZE, FIGURE_CACHE_TTL_SECONDS, name="figures")
+
+
+def format_labels(values, decimals=2):
+    """Vectorized f"{x:.2f}" with "N/A" for missing values"""
+    values = np.asarray(values, dtype="float64")
+    missing = np.isnan(values)
+    labels = np.char.mod(f"%.{decimals}f", np.where(missing, 0.0, values))
+    return np.where(missing, "N/A", labels)
+
+
+def data_hash(df, *params):
+    """Content hash of a frame plus the chart parameters, so identical charts share a cache entry"""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    digest.update(repr(tuple(df.columns)).encode())
+    digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+
+def build_bar_figure(df, index_col, value_col, theme=CUSTOM_THEME):
+    """Bar chart figure using a consistent custom theme"""
+    order = None if df[index_col].is_monotonic_increasing else np.argsort(df[index_col].to_numpy(), kind="stable")
+    x = df[index_col].to_numpy()
+    y = pd.to_numeric(df[value_col], errors="coerce").to_numpy(dtype="float64")
+    if order is not None:
+        x, y = x[order], y[order]
+    x = x.astype(str)
+
+    # One trace with per-bar colours draws the same chart as one trace per category, without the per-trace overhead
+    colors = np.resize(np.array(theme["color_sequence"], dtype=object), len(x))
+    fig = go.Figure(go.Bar(
+        x=x,
+        y=y,                                # ✅ Use numeric values for plotting
+        text=format_labels(y),              # ✅ Use formatted strings for display
+        textposition="outside",
+        marker_color=colors,
+        hovertemplate=f"{index_col.capitalize()}=%{{x}}<br>{value_col.capitalize()}=%{{y}}<extra></extra>",
+    ))
+
+    fig.update_xaxes(
+        title_text=index_col.capitalize(),
+        tickmode="array",
+        tickvals=x,
+        ticktext=x,
+        title_font=dict(color=theme["axis_color"]),
+        tickfont=dict(color=theme["axis_color"])
+    )
+    fig.update_yaxes(
+        title_text=value_col.capitalize(),
+        title_font=dict(color=theme["axis_color"]),
+        tickfont=dict(color=theme["axis_color"])
+    )
+    fig.update_layout(
+        template=theme["template"],
+        font=dict(family=theme["font_family"], color=theme["font_color"]),
+        showlegend=False,
+        margin=dict(l=20, r=20, t=20, b=40),
+        height=400
+    )
+    return fig
+
+
+def bar_figure(df, index_col, value_col, theme=CUSTOM_THEME):
+    """build_bar_figure(), memoized on the data, so an unchanged chart is not rebuilt on rerun"""
+    key = data_hash(df[[index_col, value_col]], "bar", index_col, value_col, sorted(theme.items()))
+    return figure_cache.get_or_compute(key, lambda: build_bar_figure(df, index_col, value_col, theme))
 
-def records_to_df(result):
-    """Safely converts Neo4j result records to a pandas DataFrame"""
-    return pd.DataFrame([dict(r) for r in result]) if result else pd.DataFrame()
 
 def safe_bar_chart(df, index_col, value_col, title="", theme=CUSTOM_THEME):
     """Bar chart using a consistent custom theme"""
     if not df.empty and index_col in df.columns and value_col in df.columns:
         st.subheader(title)
-
-        df_sorted = df.sort_values(by=index_col).reset_index(drop=True)
-        df_sorted[index_col] = df_sorted[index_col].astype(str)
-
-        # Keep original numeric y-values
-        df_sorted["value_num"] = pd.to_numeric(df_sorted[value_col], errors="coerce")
-
-        # Create formatted display values for labels
-        df_sorted["value_label"] = df_sorted["value_num"].map(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
-
-        fig = px.bar(
-            df_sorted,
-            x=index_col,
-            y="value_num",              # ✅ Use numeric values for plotting
-            text="value_label",         # ✅ Use formatted strings for display
-            color=index_col,
-            color_discrete_sequence=theme["color_sequence"],
-            labels={index_col: index_col.capitalize(), "value_num": value_col.capitalize()},
-            template=theme["template"]
-        )
-
-        fig.update_traces(textposition="outside")
-        fig.update_xaxes(
-            tickmode="array",
-            tickvals=df_sorted[index_col],
-            ticktext=[str(val) for val in df_sorted[index_col]],
-            title_font=dict(color=theme["axis_color"]),
-            tickfont=dict(color=theme["axis_color"])
-        )
-        fig.update_yaxes(
-            title_font=dict(color=theme["axis_color"]),
-            tickfont=dict(color=theme["axis_color"])
-        )
-        fig.update_layout(
-            font=dict(family=theme["font_family"], color=theme["font_color"]),
-            showlegend=False,
-            margin=dict(l=20, r=20, t=20, b=40),
-            height=400
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(bar_figure(df, index_col, value_col, theme), use_container_width=True)
     else:
         st.info(f"No data available for {title.lower()}.")
 
@@ -65,13 +95,17 @@ def safe_metric(label, value, decimals=2):
         st.metric(label, value)
 
 
+def build_pie_figure(df, names_col, values_col, title=""):
+    fig = px.pie(df, names=names_col, values=values_col, title=title)
+    fig.update_traces(textinfo='percent+label', pull=[0.05]*len(df))
+    return fig
+
+
 def safe_pie_chart(df, names_col, values_col, title=""):
     if not df.empty and names_col in df.columns and values_col in df.columns:
         st.subheader(title)
-        fig = px.pie(df, names=names_col, values=values_col, title=title)
-        fig.update_traces(textinfo='percent+label', pull=[0.05]*len(df))
+        key = data_hash(df[[names_col, values_col]], "pie", names_col, values_col, title)
+        fig = figure_cache.get_or_compute(key, lambda: build_pie_figure(df, names_col, values_col, title))
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info(f"No data available for {title.lower()}.")
-
-
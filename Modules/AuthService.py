@@ -0,0 +1,122 @@
+"""
+Password hashing, registration and sessions.
+
+bcrypt runs on a small shared thread pool, which caps how many hashes run at once at
+AUTH_HASH_WORKERS. The calling script thread still waits for its result; during a burst of
+logins the extra ones queue for a worker instead of all competing for the CPU. Registration is a single MERGE,
+which together with the User.username constraint (Database/Schema.py) is race-free.
+Successful logins get a session token that is remembered in-process, so reruns and page
+switches are resolved without running bcrypt again. Callers keep the token server side
+(st.session_state); it must never be put in a URL.
+"""
+import secrets
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from Database.Neo4j_Connection import Connect
+from Modules.Cache import TTLLRUCache
+from Modules.app_config import BCRYPT_ROUNDS, AUTH_HASH_WORKERS, SESSION_TOKEN_TTL_SECONDS, SESSION_TOKEN_CACHE_SIZE
+
+# Creates the user only if the name is free; `created` tells the caller which happened
+REGISTER_QUERY = """
+MERGE (u:User {username: $username})
+ON CREATE SET u.password = $password, u.createdAt = timestamp()
+RETURN u.password = $password AS created
+"""
+
+# Existence and the stored hash in one round trip
+PASSWORD_QUERY = "MATCH (u:User {username: $username}) RETURN u.password AS password"
+
+REHASH_QUERY = """
+MATCH (u:User {username: $username})
+WHERE u.password = $old
+SET u.password = $new
+"""
+
+_hash_pool = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="bcrypt")
+sessions = TTLLRUCache(SESSION_TOKEN_CACHE_SIZE, SESSION_TOKEN_TTL_SECONDS, name="sessions")
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash():
+    """Checked against when the user does not exist, so unknown names cost the same as wrong passwords"""
+    return bcrypt.hashpw(b"movie-queue", bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+
+
+# ==============================
+# HASHING
+# ==============================
+def hash_password(password, rounds=BCRYPT_ROUNDS):
+    return _hash_pool.submit(
+        lambda: bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+    ).result()
+
+
+def check_password(password, stored_hash):
+    return _hash_pool.submit(bcrypt.checkpw, password.encode(), stored_hash.encode()).result()
+
+
+def hash_rounds(stored_hash):
+    """Work factor of a "$2b$12$..." hash"""
+    try:
+        return int(stored_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+# ==============================
+# ACCOUNTS
+# ==============================
+def register(username, password, db=None):
+    """True if the account was created, False if the username is taken"""
+    db = db or Connect()
+    hashed = hash_password(password)
+    with db.session() as session:
+        record = session.run(REGISTER_QUERY, {"username": username, "password": hashed}).single()
+    return bool(record and record["created"])
+
+
+def verify(username, password, db=None):
+    db = db or Connect()
+    with db.session() as session:
+        record = session.run(PASSWORD_QUERY, {"username": username}).single()
+    if record is None or not record["password"]:
+        check_password(password, _dummy_hash())
+        return False
+    if not check_password(password, record["password"]):
+        return False
+
+    # Hashes made with an older work factor are upgraded in the background while the password is known
+    if hash_rounds(record["password"]) != BCRYPT_ROUNDS:
+        _hash_pool.submit(_rehash, username, password, record["password"], db)
+    return True
+
+
+def _rehash(username, password, old_hash, db):
+    new_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+    try:
+        db.run_query(REHASH_QUERY, {"username": username, "old": old_hash, "new": new_hash})
+    except Exception as e:
+        print(f"[ERROR] Could not upgrade the password hash for {username}: {e}")
+
+
+# ==============================
+# SESSIONS
+# ==============================
+def login(username, password, db=None):
+    """A new session token, or None if the credentials are wrong"""
+    if not verify(username, password, db):
+        return None
+    token = secrets.token_urlsafe(32)
+    sessions.set(token, username)
+    return token
+
+
+def session_user(token):
+    """Username for a live session token (no database or bcrypt work)"""
+    return sessions.get(token) if token else None
+
+
+def logout(token):
+    if token:
+        sessions.pop(token)
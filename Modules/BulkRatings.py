@@ -0,0 +1,217 @@
+"""
+Bulk rating import from a Letterboxd or IMDb CSV export.
+
+Rows are resolved to tconsts against the in-process title index (Modules/MovieSearch), written
+with one UNWIND per batch, and the user's taste profile is rebuilt once at the end instead of
+being updated row by row.
+
+    Letterboxd: ratings.csv / diary.csv   Name, Year, Rating (0.5-5), Date / Watched Date
+    IMDb:       ratings.csv               Const, Your Rating (1-10), Date Rated, Title, Year
+"""
+import time
+from collections import Counter
+import numpy as np
+import pandas as pd
+from Database.Neo4j_Connection import Connect
+from Modules.Cache import bump_rating_version
+from Modules.MovieSearch import get_search_index, normalize_title
+from Modules.TasteProfiles import rebuild_profile, mark_profile_built, forget_profile
+from Modules.RatingQueue import flush_pending
+from Modules.app_config import BULK_RATING_BATCH_SIZE
+
+IMPORT_DISCOVERY = "Imported"
+
+IMPORT_QUERY = """
+MATCH (u:User {username: $user})
+SET u.profileBuilt = false
+WITH u
+UNWIND $ratings AS row
+MATCH (m:Movie {tconst: row.tconst})
+MERGE (u)-[r:RATED]->(m)
+SET r.rating = row.rating,
+    r.discovery = coalesce(r.discovery, $discovery),
+    r.date = coalesce(date(row.date), r.date)
+RETURN count(r) AS written
+"""
+
+BUMP_VERSION_QUERY = """
+MATCH (u:User {username: $user})
+SET u.ratingsVersion = coalesce(u.ratingsVersion, 0) + 1
+"""
+
+
+# ==============================
+# PARSING
+# ==============================
+def _first_column(df, *names):
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+
+def _dates(values):
+    return pd.to_datetime(values, errors="coerce").dt.strftime("%Y-%m-%d").astype(object).where(lambda s: s.notna(), None)
+
+
+def read_export(file):
+    """DataFrame[tconst, title, year, rating, date] from either export format"""
+    df = pd.read_csv(file, dtype=str, keep_default_na=False, na_values=[""])
+    if "Const" in df.columns and "Your Rating" in df.columns:
+        source = "imdb"
+        rows = pd.DataFrame({
+            "tconst": df["Const"],
+            "title": _first_column(df, "Title"),
+            "year": _first_column(df, "Year"),
+            "rating": pd.to_numeric(df["Your Rating"], errors="coerce") / 2,
+            "date": _dates(_first_column(df, "Date Rated")),
+        })
+    elif "Name" in df.columns and "Rating" in df.columns:
+        source = "letterboxd"
+        rows = pd.DataFrame({
+            "tconst": None,
+            "title": df["Name"],
+            "year": _first_column(df, "Year"),
+            "rating": pd.to_numeric(df["Rating"], errors="coerce"),
+            "date": _dates(_first_column(df, "Watched Date", "Date")),
+        })
+    else:
+        raise ValueError("Unrecognised file: expected a Letterboxd (Name, Year, Rating) or IMDb (Const, Your Rating) export")
+
+    rows["year"] = pd.to_numeric(rows["year"], errors="coerce").astype("Int64")
+    # Ratings are half stars out of 5, like the Rate Movies page
+    rows["rating"] = (rows["rating"] * 2).round() / 2
+    return source, rows
+
+
+# ==============================
+# TITLE RESOLUTION
+# ==============================
+class TitleResolver:
+    """(normalized title, year) -> tconst over the search index, preferring the most-voted movie on ties"""
+
+    def __init__(self, index):
+        self.index = index
+        order = np.argsort(-index.num_votes, kind="stable")
+        self.by_title_year = {}
+        self.by_title = {}
+        for position in order:
+            key = normalize_title(index.title[position])
+            year = index.year[position]
+            year = int(year) if year is not None and not pd.isna(year) else None
+            self.by_title_year.setdefault((key, year), position)
+            self.by_title.setdefault(key, position)
+        self.known = set(index.tconst)
+
+    def resolve(self, title, year):
+        """(tconst, how) with how in exact / year±1 / title only / fuzzy, or (None, "unmatched")"""
+        key = normalize_title(title)
+        if not key:
+            return None, "unmatched"
+        if year is not None:
+            for candidate, how in ((year, "exact"), (year - 1, "year±1"), (year + 1, "year±1")):
+                position = self.by_title_year.get((key, candidate))
+                if position is not None:
+                    return self.index.tconst[position], how
+        else:
+            position = self.by_title.get(key)
+            if position is not None:
+                return self.index.tconst[position], "title only"
+
+        # Typos and punctuation differences: best trigram match, which must agree on the year when there is one
+        for position in self.index.fuzzy_matches(key, min_similarity=0.8)[:5]:
+            candidate_year = self.index.year[position]
+            if year is None or (candidate_year is not None and not pd.isna(candidate_year)
+                                and abs(int(candidate_year) - year) <= 1):
+                return self.index.tconst[position], "fuzzy"
+        return None, "unmatched"
+
+
+_resolver = None
+
+
+def get_resolver():
+    """Rebuilt whenever the search index is reloaded"""
+    global _resolver
+    index = get_search_index()
+    if _resolver is None or _resolver.index is not index:
+        _resolver = TitleResolver(index)
+    return _resolver
+
+
+def resolve_rows(rows, resolver):
+    """Adds tconst/match columns; IMDb rows already carry a tconst and only need to be in the catalogue"""
+    tconsts, matches = [], []
+    for tconst, title, year in zip(rows["tconst"], rows["title"], rows["year"]):
+        year = None if pd.isna(year) else int(year)
+        if isinstance(tconst, str) and tconst:
+            if tconst in resolver.known:
+                tconsts.append(tconst)
+                matches.append("id")
+                continue
+            tconst, how = resolver.resolve(title, year) if isinstance(title, str) else (None, "unmatched")
+        else:
+            tconst, how = resolver.resolve(title, year)
+        tconsts.append(tconst)
+        matches.append(how)
+    rows = rows.copy()
+    rows["tconst"] = tconsts
+    rows["match"] = matches
+    return rows
+
+
+# ==============================
+# IMPORT
+# ==============================
+def import_ratings(user, file, db=None, resolver=None, batch_size=BULK_RATING_BATCH_SIZE):
+    """
+    Imports every resolvable, rated row of `file` for `user` and returns match statistics.
+    A movie that appears more than once (e.g. rewatches in a diary) keeps its latest rating.
+    """
+    start = time.time()
+    db = db or Connect()
+    # Ratings still queued from the Submit button must land first, or they would overwrite the import
+    if not flush_pending(user):
+        raise ValueError("Some of your earlier ratings are still being saved. Try the import again in a moment.")
+    source, rows = read_export(file)
+    total = len(rows)
+    unrated = int(rows["rating"].isna().sum())
+    rows = rows[rows["rating"].between(0.5, 5)]
+
+    rows = resolve_rows(rows, resolver or get_resolver())
+    matched = rows[rows["tconst"].notna()]
+    unmatched = rows[rows["tconst"].isna()][["title", "year"]]
+    latest = matched.sort_values("date", na_position="first", kind="stable").drop_duplicates("tconst", keep="last")
+
+    ratings = [{"tconst": t, "rating": float(r), "date": d}
+               for t, r, d in zip(latest["tconst"], latest["rating"], latest["date"])]
+    written = 0
+    # Each batch marks the profile stale, so one that fails part-way leaves it for ensure_profile to rebuild
+    forget_profile(user)
+    with db.session() as session:
+        for offset in range(0, len(ratings), batch_size):
+            batch = ratings[offset:offset + batch_size]
+            written += session.execute_write(
+                lambda tx: tx.run(IMPORT_QUERY, {"user": user, "ratings": batch, "discovery": IMPORT_DISCOVERY}).single()["written"]
+            )
+
+        if ratings:
+            def finish(tx):
+                tx.run(BUMP_VERSION_QUERY, {"user": user}).consume()
+                rebuild_profile(tx, user)
+            session.execute_write(finish)
+    if ratings:
+        mark_profile_built(user)
+        bump_rating_version(user)
+
+    return {
+        "source": source,
+        "rows": total,
+        "unrated": unrated,
+        "matched": len(matched),
+        "match_methods": dict(Counter(matched["match"])),
+        "duplicates": len(matched) - len(latest),
+        "written": written,
+        "unmatched": unmatched.reset_index(drop=True),
+        "seconds": time.time() - start,
+    }
@@ -0,0 +1,98 @@
+import threading
+from collections import defaultdict
+from cachetools import TTLCache
+
+
+class TTLLRUCache:
+    """
+    Thread-safe in-process cache with a TTL and LRU eviction, shared by every Streamlit session
+    in the process. Keeps hit/miss counters so the caches can be inspected.
+    """
+
+    def __init__(self, maxsize, ttl, name=""):
+        self.name = name
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._cache[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value, or computes, stores and returns it on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def pop(self, key):
+        with self._lock:
+            return self._cache.pop(key, None)
+
+    def invalidate(self, predicate=None):
+        """Drops every entry whose key matches `predicate` (all entries if none is given)"""
+        with self._lock:
+            if predicate is None:
+                self._cache.clear()
+                return
+            for key in [k for k in list(self._cache.keys()) if predicate(k)]:
+                self._cache.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# ==============================
+# PER-USER RATING VERSIONS
+# ==============================
+# Per-user caches key their entries on (username, ..., rating_version(username)); bumping the
+# version on every rating write makes stale entries unreachable and purges them immediately.
+_rating_versions = defaultdict(int)
+_versions_lock = threading.Lock()
+_user_caches = []
+
+
+def register_user_cache(cache):
+    """Registers a cache whose keys start with the username, so rating writes purge them"""
+    _user_caches.append(cache)
+    return cache
+
+
+def rating_version(user):
+    with _versions_lock:
+        return _rating_versions[user]
+
+
+def bump_rating_version(user):
+    """Call after any write to the user's ratings"""
+    with _versions_lock:
+        _rating_versions[user] += 1
+    for cache in _user_caches:
+        cache.invalidate(lambda key: key[0] == user)
@@ -1,26 +1,76 @@
-from Modules.Analytics_Utils import records_to_df
+import pandas as pd
 from Database.Neo4j_Connection import Connect
+from Modules.TasteProfiles import ensure_profile
+from Modules.RatingQueue import flush_pending
+from Modules.Cache import TTLLRUCache, register_user_cache, rating_version
+from Modules.app_config import ANALYTICS_CACHE_SIZE, ANALYTICS_CACHE_TTL_SECONDS
 
-def get_analytics(user):
+# Every aggregate in one pass over the user's RATED edges (genres come from the taste profile).
+# Distributions come back as parallel lists, one per column, so their DataFrames are built column-wise.
+ANALYTICS_QUERY = """
+MATCH (u:User {username: $user})
+OPTIONAL MATCH (u)-[r:RATED]->(m:Movie)
+WITH u, collect(CASE WHEN r IS NULL THEN NULL ELSE {
+    rating: r.rating, title: m.primaryTitle, year: m.startYear, avg: m.averageRating
+} END) AS rated
+
+CALL {
+    WITH rated
+    UNWIND rated AS x
+    RETURN avg(x.rating) AS avg_rating
+}
+CALL {
+    WITH rated
+    UNWIND rated AS x
+    WITH x.rating AS rating, count(*) AS count
+    ORDER BY rating
+    RETURN {rating: collect(rating), count: collect(count)} AS rating_dist
+}
+CALL {
+    WITH rated
+    UNWIND rated AS x
+    WITH x WHERE x.avg IS NOT NULL
+    WITH x, ABS(x.rating - (x.avg / 2)) AS diff
+    ORDER BY diff DESC
+    LIMIT 1
+    RETURN collect({title: x.title, year: x.year, user_rating: x.rating, avg_rating: x.avg / 2, diff: diff}) AS largest_disparity
+}
+CALL {
+    WITH u
+    MATCH (u)-[gp:GENRE_PROFILE]->(g:Genre)
+    WHERE gp.count > 0
+    WITH g.type AS genre, gp.count AS count, gp.ratingSum / gp.count AS avg_rating
+    ORDER BY count DESC
+    RETURN {genre: collect(genre), count: collect(count), avg_rating: collect(avg_rating)} AS genre_dist
+}
+RETURN size(rated) AS total_ratings, avg_rating, rating_dist, genre_dist, largest_disparity
+"""
+
+# Keyed on (username, rating version), so a new rating is reflected on the next page view
+analytics_cache = register_user_cache(
+    TTLLRUCache(ANALYTICS_CACHE_SIZE, ANALYTICS_CACHE_TTL_SECONDS, name="analytics")
+)
 
+
+def _query_analytics(user):
     db = Connect()
+    ensure_profile(user, db)
+
+    results = db.run_query(ANALYTICS_QUERY, {"user": user})
+    row = dict(results[0]) if results else {}
 
-    params = {"user": user}
-
-    queries = {
-        "total_ratings": "MATCH (u:User {username: $user})-[:RATED]->(m:Movie) RETURN count(*) AS total_ratings",
-        "avg_rating": "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie) RETURN avg(r.rating) AS avg_rating",
-        "rating_dist": "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie) RETURN r.rating AS rating, count(*) AS count ORDER BY rating",
-        "genre_dist": "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie)-[:HAS_GENRE]->(g:Genre) RETURN g.type AS genre, count(*) AS count, avg(r.rating) AS avg_rating ORDER BY count DESC",
-        "largest_disparity": "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie) WHERE m.averageRating IS NOT NULL RETURN m.primaryTitle AS title, m.startYear AS year, r.rating AS user_rating, m.averageRating / 2 AS avg_rating, ABS(r.rating - (m.averageRating / 2)) AS diff ORDER BY diff DESC LIMIT 1"
-    }
-
-    results = {key: db.run_query(query, params) for key, query in queries.items()}
-    results_df = {key: records_to_df(res) for key, res in results.items()}
-
-    # Extract scalars
-    total_ratings = results_df["total_ratings"].iloc[0, 0] if not results_df["total_ratings"].empty else 0
-    avg_rating = results_df["avg_rating"].iloc[0, 0] if not results_df["avg_rating"].empty else None
-    largest_disparity = results_df["largest_disparity"].iloc[0].to_dict()
-    
-    return total_ratings, avg_rating, results_df["rating_dist"], results_df["genre_dist"], largest_disparity
\ No newline at end of file
+    total_ratings = row.get("total_ratings") or 0
+    avg_rating = row.get("avg_rating")
+    rating_dist = pd.DataFrame(row.get("rating_dist") or {}, columns=["rating", "count"])
+    genre_dist = pd.DataFrame(row.get("genre_dist") or {}, columns=["genre", "count", "avg_rating"])
+    largest_disparity = (row.get("largest_disparity") or [{}])[0]
+
+    return total_ratings, avg_rating, rating_dist, genre_dist, largest_disparity
+
+
+def get_analytics(user):
+    if not flush_pending(user):
+        # Some of the user's ratings are still queued: answer, but don't cache an answer that misses them
+        return _query_analytics(user)
+    key = (user, rating_version(user))
+    return analytics_cache.get_or_compute(key, lambda: _query_analytics(user))
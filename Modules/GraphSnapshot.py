@@ -0,0 +1,174 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from Database.Neo4j_Connection import Connect
+from Modules.ReferenceData import check_for_etl_update, on_catalogue_change
+from Modules.app_config import COLLAB_ROLES, ROLE_WEIGHTS, RECOMMENDATION_LIMIT, SNAPSHOT_REFRESH_SECONDS
+
+
+class GraphSnapshot:
+    """
+    Read-only, integer-indexed copy of the Movie–Person–Genre graph.
+
+    Each collaboration role is a people × movies CSR matrix (plus its transpose), so the
+    collaborator-weighted score becomes a handful of sparse matrix–vector products whose
+    cost is bounded by the user's neighbourhood, not by what Neo4j can hold in one query.
+    People are keyed by name, exactly like the Cypher scorer matches them.
+    """
+
+    def __init__(self, movies, genres, credits):
+        """
+        movies:  DataFrame[tconst, numVotes, averageRating]
+        genres:  DataFrame[tconst, genre]
+        credits: DataFrame[person, role, tconst]
+        """
+        self.movie_ids = movies['tconst'].to_numpy(dtype=object)
+        self.movie_index = pd.Index(self.movie_ids)
+        self.num_votes = pd.to_numeric(movies['numVotes'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+        self.avg_rating = pd.to_numeric(movies['averageRating'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+        n_movies = len(self.movie_ids)
+
+        self.genre_names = pd.Index(sorted(genres['genre'].dropna().unique()))
+        rows = self.movie_index.get_indexer(genres['tconst'])
+        cols = self.genre_names.get_indexer(genres['genre'])
+        keep = (rows >= 0) & (cols >= 0)
+        self.movie_genres = sparse.csr_matrix(
+            (np.ones(keep.sum()), (rows[keep], cols[keep])), shape=(n_movies, len(self.genre_names))
+        )
+
+        credits = credits[credits['role'].isin(COLLAB_ROLES)].dropna(subset=['person'])
+        self.person_names = pd.Index(credits['person'].unique())
+        self.roles = {}
+        self.roles_t = {}
+        for role, group in credits.groupby('role'):
+            rows = self.person_names.get_indexer(group['person'])
+            cols = self.movie_index.get_indexer(group['tconst'])
+            keep = cols >= 0
+            # Duplicate (name, movie) pairs are summed, like one Cypher row per matching person node
+            matrix = sparse.csr_matrix(
+                (np.ones(keep.sum()), (rows[keep], cols[keep])), shape=(len(self.person_names), n_movies)
+            )
+            self.roles[role] = matrix
+            self.roles_t[role] = matrix.T.tocsr()
+
+        self.loaded_at = time.time()
+
+    @property
+    def nbytes(self):
+        matrices = [self.movie_genres, *self.roles.values(), *self.roles_t.values()]
+        return sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in matrices)
+
+    def recommend(self, ratings, genres, limit=RECOMMENDATION_LIMIT):
+        """
+        Same semantics as the original get_candidate_movie_ids + get_scored_movies
+        (Benchmarks/legacy_recommender.py) for a user whose ratings are {tconst: rating}.
+        Returns ([{"id", "score"}] best first, collaborators).
+        """
+        n_movies = len(self.movie_ids)
+        rated = self.movie_index.get_indexer(list(ratings))
+        found = rated >= 0
+        rating_weight = np.zeros(n_movies)
+        rating_weight[rated[found]] = np.asarray(list(ratings.values()), dtype='float64')[found] / 5.0
+        is_rated = np.zeros(n_movies, dtype=bool)
+        is_rated[rated[found]] = True
+
+        collab_score = np.zeros(n_movies)
+        reach = np.zeros(n_movies)
+        collaborators = []
+        for role, matrix in self.roles.items():
+            influence = matrix @ rating_weight
+            people = np.flatnonzero(influence)
+            if not len(people):
+                continue
+            collaborators.extend(
+                {"person": self.person_names[i], "role": role, "weight": float(influence[i])} for i in people
+            )
+            collab_score += ROLE_WEIGHTS.get(role, 1.0) * (self.roles_t[role] @ influence)
+            reach += self.roles_t[role] @ (influence > 0).astype('float64')
+
+        genre_cols = self.genre_names.get_indexer(genres)
+        genre_cols = genre_cols[genre_cols >= 0]
+        in_genres = np.asarray(self.movie_genres[:, genre_cols].sum(axis=1)).ravel() > 0
+
+        candidates = np.flatnonzero((reach > 0) & in_genres & ~is_rated)
+        candidates = candidates[np.argsort(-self.num_votes[candidates], kind='stable')][:limit]
+
+        scores = collab_score[candidates] + np.log1p(self.num_votes[candidates]) + self.avg_rating[candidates] * 1.5
+        order = np.argsort(-scores, kind='stable')
+        scored = [{"id": self.movie_ids[candidates[i]], "score": float(scores[i])} for i in order]
+        return scored, collaborators
+
+
+# ==============================
+# LOADING FROM NEO4J
+# ==============================
+def _frame(result, columns):
+    return result.to_df().reindex(columns=columns)
+
+
+def load_snapshot(db=None):
+    db = db or Connect()
+    with db.session() as session:
+        movies = _frame(session.run(
+            "MATCH (m:Movie) RETURN m.tconst AS tconst, m.numVotes AS numVotes, m.averageRating AS averageRating"
+        ), ['tconst', 'numVotes', 'averageRating'])
+        genres = _frame(session.run(
+            "MATCH (m:Movie)-[:HAS_GENRE]->(g:Genre) RETURN m.tconst AS tconst, g.type AS genre"
+        ), ['tconst', 'genre'])
+        # One role at a time keeps the transfer (and peak memory) per query bounded
+        credits = pd.concat([
+            _frame(session.run(
+                f"MATCH (p:Person)-[:{role}]->(m:Movie) RETURN p.name AS person, m.tconst AS tconst"
+            ), ['person', 'tconst']).assign(role=role)
+            for role in COLLAB_ROLES
+        ], ignore_index=True)
+    return GraphSnapshot(movies, genres, credits)
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+_refreshing = threading.Event()
+
+
+def _refresh():
+    global _snapshot
+    try:
+        _snapshot = load_snapshot()
+    finally:
+        _refreshing.clear()
+
+
+@on_catalogue_change
+def _expire_snapshot():
+    if _snapshot is not None:
+        _snapshot.loaded_at = 0
+
+
+def get_snapshot():
+    """
+    The shared snapshot. The first call loads it synchronously; once it is older than
+    SNAPSHOT_REFRESH_SECONDS a background reload starts while the old one keeps serving.
+    """
+    global _snapshot
+    check_for_etl_update()
+    if _snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                _snapshot = load_snapshot()
+    elif time.time() - _snapshot.loaded_at > SNAPSHOT_REFRESH_SECONDS:
+        with _snapshot_lock:
+            if not _refreshing.is_set():
+                _refreshing.set()
+                threading.Thread(target=_refresh, daemon=True).start()
+    return _snapshot
+
+
+USER_RATINGS_QUERY = "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie) RETURN m.tconst AS tconst, r.rating AS rating"
+
+
+def get_user_ratings(user, db=None):
+    db = db or Connect()
+    results = db.run_query(USER_RATINGS_QUERY, {"user": user})
+    return {r["tconst"]: r["rating"] for r in results}
@@ -1,4 +1,6 @@
 import streamlit as st
+from Modules.app_config import ADMIN_USERS
+from Modules.auth import sign_out
 
 
 def global_sidebar():
@@ -16,10 +18,11 @@ def global_sidebar():
         st.sidebar.page_link("pages/2_Recommendations.py", label="Recommendations", icon="🎥")
         st.sidebar.page_link("pages/3_Rate_Movies.py", label="Rate Movies", icon="🎬")
         st.sidebar.page_link("pages/4_User_Analytics.py", label="User Analytics", icon="📊")
+        if st.session_state.username in ADMIN_USERS:
+            st.sidebar.page_link("pages/5_Query_Stats.py", label="Query Stats", icon="⏱")
 
         if st.sidebar.button("Logout"):
-            st.session_state.logged_in = False
-            st.session_state.username = ""
+            sign_out()
             st.rerun()
 
     else:
@@ -0,0 +1,365 @@
+"""
+Dense movie vectors and an IVF (inverted-file) nearest-neighbour index over them.
+
+An offline job (`python -m Modules.MovieEmbeddings`) builds one L2-normalized float32 vector
+per movie from three blocks:
+
+    genres        one-hot genre membership
+    metadata      z-scored release year, log runtime, IMDb rating and log vote count
+    collaborators truncated SVD of the movie x person credit matrix, so movies that share
+                  cast and crew (directly or through people who work together) end up close
+
+and clusters them with k-means into EMBEDDING_IVF_LISTS lists. Each build is written as .npy
+files into its own directory under EMBEDDINGS_DIR and published by atomically replacing the
+`current` pointer file, so a reader never mixes arrays from two builds. The app memory-maps
+them, so a process pays for the pages it touches rather than the whole matrix.
+
+A query (a movie's vector for "more like this", or the user's rating-weighted centroid for
+recommendations) is scored against the list centroids first and then only against the
+movies in the EMBEDDING_NPROBE closest lists: a few thousand dot products, not the catalogue.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from Database.Neo4j_Connection import Connect
+from Modules.app_config import (
+    COLLAB_ROLES, RECOMMENDATION_LIMIT, EMBEDDINGS_DIR, EMBEDDING_SVD_DIMS, EMBEDDING_MIN_CREDITS,
+    EMBEDDING_IVF_LISTS, EMBEDDING_NPROBE
+)
+
+# Share of each block in the final vector (each block is unit length before weighting)
+BLOCK_WEIGHTS = {"genres": 1.0, "metadata": 0.5, "collaborators": 1.0}
+
+# k-means is fitted on at most this many vectors; the rest are only assigned to their nearest list
+IVF_TRAINING_SAMPLE = 100_000
+IVF_KMEANS_ITERATIONS = 15
+
+# Rating that counts as neutral when building a user's centroid (ratings are 0.5-5 stars)
+NEUTRAL_RATING = 2.5
+
+# EMBEDDINGS_DIR/current names the published build-<ns> directory
+POINTER = "current"
+FILES = ("vectors.npy", "ids.npy", "genre_mask.npy", "centroids.npy", "list_offsets.npy", "list_members.npy")
+
+
+# ==============================
+# FEATURES
+# ==============================
+def _unit_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _zscore(values, clip=3.0):
+    values = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64')
+    known = ~np.isnan(values)
+    if not known.any():
+        return np.zeros(len(values))
+    std = values[known].std() or 1.0
+    z = (values - values[known].mean()) / std
+    # Unknown years/runtimes sit at the average rather than pulling movies towards each other
+    return np.clip(np.nan_to_num(z, nan=0.0), -clip, clip) / clip
+
+
+def _randomized_svd(matrix, k, oversample=10, power_iterations=2, seed=0):
+    """Top-k left singular vectors and values of a sparse matrix (Halko et al.), much faster than ARPACK here"""
+    rng = np.random.default_rng(seed)
+    basis = np.linalg.qr(matrix @ rng.standard_normal((matrix.shape[1], k + oversample)).astype('float32'))[0]
+    for _ in range(power_iterations):
+        basis = np.linalg.qr(matrix.T @ basis)[0]
+        basis = np.linalg.qr(matrix @ basis)[0]
+    u, s, _ = np.linalg.svd((matrix.T @ basis).T, full_matrices=False)
+    return (basis @ u)[:, :k], s[:k]
+
+
+def _spherical_kmeans(vectors, n_lists, iterations=IVF_KMEANS_ITERATIONS, seed=0):
+    """k-means on unit vectors by cosine similarity: one matrix product per iteration"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=n_lists, replace=False)]
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        members = sparse.csr_matrix(
+            (np.ones(len(vectors), dtype='float32'), (assignment, np.arange(len(vectors)))),
+            shape=(n_lists, len(vectors))
+        )
+        sums = np.asarray(members @ vectors)
+        # An empty list keeps its old centroid
+        empty = np.asarray(members.sum(axis=1)).ravel() == 0
+        sums[empty] = centroids[empty]
+        centroids = _unit_rows(sums).astype('float32')
+    return centroids
+
+
+def build_vectors(movies, genres, credits, dims=EMBEDDING_SVD_DIMS, min_credits=EMBEDDING_MIN_CREDITS):
+    """
+    movies:  DataFrame[tconst, year, runtime, averageRating, numVotes]
+    genres:  DataFrame[tconst, genre]
+    credits: DataFrame[nconst, tconst]
+    Returns (vectors float32 [movies x dims], genre_names, genre_mask uint64 per movie).
+    """
+    movie_index = pd.Index(movies['tconst'])
+    n_movies = len(movie_index)
+
+    genre_names = sorted(genres['genre'].dropna().unique())
+    if len(genre_names) > 64:
+        raise ValueError(f"{len(genre_names)} genres do not fit the 64-bit genre mask")
+    rows = movie_index.get_indexer(genres['tconst'])
+    cols = pd.Index(genre_names).get_indexer(genres['genre'])
+    keep = (rows >= 0) & (cols >= 0)
+    one_hot = np.zeros((n_movies, len(genre_names)), dtype='float32')
+    one_hot[rows[keep], cols[keep]] = 1.0
+    genre_mask = np.zeros(n_movies, dtype='uint64')
+    np.bitwise_or.at(genre_mask, rows[keep], np.left_shift(np.uint64(1), cols[keep].astype('uint64')))
+
+    metadata = np.column_stack([
+        _zscore(movies['year']),
+        _zscore(np.log1p(pd.to_numeric(movies['runtime'], errors='coerce'))),
+        _zscore(movies['averageRating']),
+        _zscore(np.log1p(pd.to_numeric(movies['numVotes'], errors='coerce'))),
+    ]).astype('float32')
+
+    # People credited on a single movie carry no co-occurrence signal; prolific people are damped like IDF
+    credits = credits.dropna().drop_duplicates()
+    credits = credits[movie_index.get_indexer(credits['tconst']) >= 0]
+    credit_counts = credits['nconst'].value_counts()
+    people = pd.Index(credit_counts.index[credit_counts >= min_credits])
+    credits = credits[credits['nconst'].isin(people)]
+    rows = movie_index.get_indexer(credits['tconst'])
+    cols = people.get_indexer(credits['nconst'])
+    weights = 1.0 / np.sqrt(credit_counts.reindex(people).to_numpy(dtype='float64'))
+    incidence = sparse.csr_matrix((weights[cols], (rows, cols)), shape=(n_movies, len(people)), dtype='float32')
+    k = min(dims, min(incidence.shape) - 1)
+    if k >= 1 and incidence.nnz:
+        u, s = _randomized_svd(incidence, k)
+        collaborators = (u * s).astype('float32')
+    else:
+        collaborators = np.zeros((n_movies, 0), dtype='float32')
+
+    vectors = np.hstack([
+        BLOCK_WEIGHTS["genres"] * _unit_rows(one_hot),
+        BLOCK_WEIGHTS["metadata"] * _unit_rows(metadata),
+        BLOCK_WEIGHTS["collaborators"] * _unit_rows(collaborators),
+    ])
+    return _unit_rows(vectors).astype('float32'), genre_names, genre_mask
+
+
+def build_ivf(vectors, n_lists=EMBEDDING_IVF_LISTS, seed=0):
+    """(centroids, list_offsets, list_members): the movies of list i are members[offsets[i]:offsets[i+1]]"""
+    n = len(vectors)
+    n_lists = n_lists or int(np.sqrt(n))
+    n_lists = max(1, min(n_lists, n))
+    rng = np.random.default_rng(seed)
+    sample = np.asarray(vectors[rng.choice(n, size=min(n, IVF_TRAINING_SAMPLE), replace=False)])
+    centroids = _spherical_kmeans(sample, n_lists, seed=seed)
+
+    assignment = np.empty(n, dtype='int64')
+    for start in range(0, n, 50_000):
+        assignment[start:start + 50_000] = np.argmax(vectors[start:start + 50_000] @ centroids.T, axis=1)
+    members = np.argsort(assignment, kind='stable').astype('int64')
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))]).astype('int64')
+    return centroids, offsets, members
+
+
+# ==============================
+# SERVING
+# ==============================
+class MovieEmbeddings:
+    """Memory-mapped vectors plus the IVF lists; searches are exact within the probed lists"""
+
+    def __init__(self, ids, vectors, genre_names, genre_mask, centroids, offsets, members, meta=None):
+        self.ids = ids
+        self.movie_index = pd.Index(ids)
+        self.vectors = vectors
+        self.genre_bits = {name: np.uint64(1) << np.uint64(i) for i, name in enumerate(genre_names)}
+        self.genre_mask = genre_mask
+        self.centroids = centroids
+        self.offsets = offsets
+        self.members = members
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _genre_filter(self, genres):
+        if genres is None:
+            return None
+        return np.bitwise_or.reduce([self.genre_bits[g] for g in genres if g in self.genre_bits] or [np.uint64(0)])
+
+    def search(self, query, k=RECOMMENDATION_LIMIT, exclude=(), genres=None, nprobe=EMBEDDING_NPROBE):
+        """
+        [(tconst, cosine similarity)] best first. `exclude` is a list of movie positions and
+        `genres` keeps movies in any of them. More lists are probed until k movies qualify.
+        """
+        query = np.asarray(query, dtype='float32')
+        wanted = self._genre_filter(genres)
+        excluded = np.asarray(sorted(set(exclude)), dtype='int64')
+        list_order = np.argsort(-(self.centroids @ query), kind='stable')
+        probed = 0
+        nprobe = max(1, nprobe)
+        while True:
+            lists = list_order[:probed + nprobe] if probed + nprobe < len(list_order) else list_order
+            positions = np.concatenate([self.members[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+            if wanted is not None:
+                positions = positions[(self.genre_mask[positions] & wanted) != 0]
+            if len(excluded):
+                positions = positions[~np.isin(positions, excluded)]
+            if len(positions) >= k or len(lists) == len(list_order):
+                break
+            probed, nprobe = len(lists), nprobe * 2
+
+        positions = np.sort(positions)  # sequential reads from the memory map
+        scores = self.vectors[positions] @ query
+        top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.ids[positions[i]], float(scores[i])) for i in top]
+
+    def similar(self, tconst, k=10, genres=None):
+        """'More like this': the movies closest to `tconst`, excluding itself"""
+        position = self.movie_index.get_indexer([tconst])[0]
+        if position < 0:
+            return []
+        return self.search(self.vectors[position], k, exclude=[position], genres=genres)
+
+    def user_vector(self, ratings):
+        """
+        Rating-weighted centroid of {tconst: rating}: movies above NEUTRAL_RATING pull towards
+        themselves, movies below push away. None if none of the rated movies are embedded.
+        """
+        positions = self.movie_index.get_indexer(list(ratings))
+        found = positions >= 0
+        if not found.any():
+            return None
+        positions = positions[found]
+        weights = np.asarray(list(ratings.values()), dtype='float32')[found] - NEUTRAL_RATING
+        centroid = weights @ self.vectors[positions]
+        if not np.any(weights) or np.linalg.norm(centroid) == 0:
+            # Only neutral (or perfectly cancelling) ratings: fall back to the plain mean
+            centroid = self.vectors[positions].mean(axis=0)
+        norm = np.linalg.norm(centroid)
+        return centroid / norm if norm > 0 else None
+
+    def recommend(self, ratings, genres, k=RECOMMENDATION_LIMIT):
+        """[{"id", "score"}] best first for a user whose ratings are {tconst: rating}, excluding rated movies"""
+        query = self.user_vector(ratings)
+        if query is None:
+            return []
+        rated = self.movie_index.get_indexer(list(ratings))
+        return [{"id": tconst, "score": score} for tconst, score in self.search(query, k, rated[rated >= 0], genres)]
+
+
+def _current_build(path=EMBEDDINGS_DIR):
+    """Name of the published build directory, or None if the job has not been run"""
+    try:
+        with open(os.path.join(path, POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def save_embeddings(path, ids, vectors, genre_names, genre_mask, ivf, meta):
+    """
+    Writes a complete build into a new directory, then points `current` at it with one os.replace.
+    Builds older than the previous one are removed; the previous one stays for readers still mapping it.
+    """
+    build = f"build-{time.time_ns()}"
+    os.makedirs(os.path.join(path, build))
+    centroids, offsets, members = ivf
+    arrays = dict(zip(FILES, (vectors, np.asarray(ids, dtype=str), genre_mask, centroids, offsets, members)))
+    for name, array in arrays.items():
+        np.save(os.path.join(path, build, name), array)
+    with open(os.path.join(path, build, "meta.json"), "w") as f:
+        json.dump({**meta, "genres": list(genre_names)}, f)
+
+    previous = _current_build(path)
+    with open(os.path.join(path, f"{POINTER}.tmp"), "w") as f:
+        f.write(build)
+    os.replace(os.path.join(path, f"{POINTER}.tmp"), os.path.join(path, POINTER))
+
+    for name in os.listdir(path):
+        if name.startswith("build-") and name not in (build, previous):
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+def load_embeddings(path=EMBEDDINGS_DIR):
+    """Memory-maps the published build, or returns None if the job has not been run"""
+    build = _current_build(path)
+    if build is None:
+        return None
+    try:
+        with open(os.path.join(path, build, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, build, name), mmap_mode='r') for name in FILES}
+    except FileNotFoundError:
+        return None
+    return MovieEmbeddings(
+        # Ids, masks and the IVF lists are small and read on every query, so they live in memory
+        arrays["ids.npy"].astype(object), arrays["vectors.npy"], meta["genres"], np.asarray(arrays["genre_mask.npy"]),
+        np.asarray(arrays["centroids.npy"]), np.asarray(arrays["list_offsets.npy"]),
+        np.asarray(arrays["list_members.npy"]), meta,
+    )
+
+
+_embeddings = None
+_embeddings_build = None
+
+
+def get_embeddings():
+    """The shared embeddings, re-mapped whenever the offline job writes a new build; None if never built"""
+    global _embeddings, _embeddings_build
+    build = _current_build()
+    if build != _embeddings_build:
+        _embeddings = load_embeddings() if build is not None else None
+        _embeddings_build = build
+    return _embeddings
+
+
+# ==============================
+# OFFLINE BUILD
+# ==============================
+def load_catalogue(db=None):
+    """(movies, genres, credits) frames for build_vectors(); people are keyed by nconst"""
+    db = db or Connect()
+    with db.session() as session:
+        movies = session.run("""
+            MATCH (m:Movie)
+            RETURN m.tconst AS tconst, m.startYear AS year, m.runtimeMinutes AS runtime,
+                   m.averageRating AS averageRating, m.numVotes AS numVotes
+        """).to_df().reindex(columns=['tconst', 'year', 'runtime', 'averageRating', 'numVotes'])
+        genres = session.run(
+            "MATCH (m:Movie)-[:HAS_GENRE]->(g:Genre) RETURN m.tconst AS tconst, g.type AS genre"
+        ).to_df().reindex(columns=['tconst', 'genre'])
+        # One role at a time keeps the transfer (and peak memory) per query bounded
+        credits = pd.concat([
+            session.run(
+                f"MATCH (p:Person)-[:{role}]->(m:Movie) RETURN p.nconst AS nconst, m.tconst AS tconst"
+            ).to_df().reindex(columns=['nconst', 'tconst'])
+            for role in COLLAB_ROLES
+        ], ignore_index=True)
+    return movies, genres, credits
+
+
+def build(db=None, path=EMBEDDINGS_DIR, dims=EMBEDDING_SVD_DIMS, n_lists=EMBEDDING_IVF_LISTS):
+    start = time.time()
+    movies, genres, credits = load_catalogue(db)
+    print(f"[INFO] Loaded {len(movies)} movies and {len(credits)} credits in {time.time() - start:.1f}s")
+
+    vectors, genre_names, genre_mask = build_vectors(movies, genres, credits, dims)
+    ivf = build_ivf(vectors, n_lists)
+    save_embeddings(path, movies['tconst'], vectors, genre_names, genre_mask, ivf, {
+        "built_at": time.time(), "movies": len(vectors), "dims": vectors.shape[1], "lists": len(ivf[0]),
+    })
+    print(f"[INFO] Wrote {vectors.shape[0]} x {vectors.shape[1]} vectors in {len(ivf[0])} lists "
+          f"to {path} ({time.time() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the movie embeddings and IVF index used for 'more like this'")
+    parser.add_argument("--dims", type=int, default=EMBEDDING_SVD_DIMS, help="SVD dimensions of the collaborator block")
+    parser.add_argument("--lists", type=int, default=EMBEDDING_IVF_LISTS, help="IVF lists (0 = square root of the catalogue)")
+    args = parser.parse_args()
+    build(dims=args.dims, n_lists=args.lists)
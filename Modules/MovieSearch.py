@@ -0,0 +1,176 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+import numpy as np
+from Database.Neo4j_Connection import Connect
+from Modules.ReferenceData import check_for_etl_update, on_catalogue_change
+from Modules.app_config import (
+    MOVIE_SEARCH_BACKEND, MOVIE_TITLE_FULLTEXT_INDEX, SEARCH_INDEX_REFRESH_SECONDS, SEARCH_RESULT_LIMIT
+)
+
+
+def normalize_title(title):
+    """Case-folded, accent-free, punctuation collapsed to single spaces; letters of any script are kept"""
+    title = unicodedata.normalize("NFKD", str(title)).casefold()
+    return " ".join("".join(c if c.isalnum() else " " for c in title if not unicodedata.combining(c)).split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MovieSearchIndex:
+    """
+    In-process title index for typeahead.
+
+    Prefix lookups binary-search a sorted array of every word-start suffix of each title, so
+    "godf" finds "The Godfather". When that yields too few hits, a trigram index supplies fuzzy
+    matches for typos. Either way only the top `limit` movies are returned.
+    """
+
+    def __init__(self, movies):
+        """movies: DataFrame[tconst, title, year, numVotes]"""
+        self.tconst = movies['tconst'].to_numpy(dtype=object)
+        self.title = movies['title'].to_numpy(dtype=object)
+        self.year = movies['year'].to_numpy(dtype=object)
+        self.num_votes = movies['numVotes'].fillna(0).to_numpy(dtype='float64')
+
+        keys, owners = [], []
+        grams = defaultdict(list)
+        for position, title in enumerate(self.title):
+            normalized = normalize_title(title)
+            for match in re.finditer(r"\S+", normalized):
+                keys.append(normalized[match.start():])
+                owners.append(position)
+            for gram in trigrams(normalized):
+                grams[gram].append(position)
+
+        order = np.argsort(np.array(keys, dtype=str), kind='stable')
+        self.keys = np.array(keys, dtype=str)[order]
+        self.key_owner = np.array(owners, dtype='int64')[order]
+        self.grams = {gram: np.array(positions, dtype='int64') for gram, positions in grams.items()}
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self.tconst)
+
+    def _by_votes(self, positions):
+        return positions[np.argsort(-self.num_votes[positions], kind='stable')]
+
+    def prefix_matches(self, query):
+        lo = np.searchsorted(self.keys, query, side='left')
+        hi = np.searchsorted(self.keys, query + "\U0010ffff", side='right')
+        return self._by_votes(np.unique(self.key_owner[lo:hi]))
+
+    def fuzzy_matches(self, query, min_similarity=0.5):
+        query_grams = [g for g in trigrams(query) if g in self.grams]
+        if not query_grams:
+            return np.array([], dtype='int64')
+        overlap = np.bincount(np.concatenate([self.grams[g] for g in query_grams]), minlength=len(self))
+        similarity = overlap / len(trigrams(query))
+        positions = np.flatnonzero(similarity >= min_similarity)
+        return positions[np.lexsort((-self.num_votes[positions], -similarity[positions]))]
+
+    def search(self, text, limit=SEARCH_RESULT_LIMIT):
+        query = normalize_title(text)
+        if not query:
+            return []
+        positions = self.prefix_matches(query)[:limit]
+        if len(positions) < limit:
+            fuzzy = self.fuzzy_matches(query)
+            fuzzy = fuzzy[~np.isin(fuzzy, positions)]
+            positions = np.concatenate([positions, fuzzy[:limit - len(positions)]])
+        return [{
+            "tconst": self.tconst[i],
+            "title": self.title[i],
+            "year": self.year[i],
+            "numVotes": int(self.num_votes[i]),
+        } for i in positions]
+
+
+# ==============================
+# LOADING FROM NEO4J
+# ==============================
+def load_search_index(db=None):
+    db = db or Connect()
+    with db.session() as session:
+        movies = session.run("""
+            MATCH (m:Movie)
+            RETURN m.tconst AS tconst, m.primaryTitle AS title, m.startYear AS year, m.numVotes AS numVotes
+        """).to_df().reindex(columns=['tconst', 'title', 'year', 'numVotes'])
+    return MovieSearchIndex(movies)
+
+
+_index = None
+_index_lock = threading.Lock()
+_refreshing = threading.Event()
+
+
+def _refresh():
+    global _index
+    try:
+        _index = load_search_index()
+    finally:
+        _refreshing.clear()
+
+
+@on_catalogue_change
+def _expire_index():
+    if _index is not None:
+        _index.loaded_at = 0
+
+
+def get_search_index():
+    """The shared index; reloaded in the background once older than SEARCH_INDEX_REFRESH_SECONDS or after an ETL run"""
+    global _index
+    check_for_etl_update()
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_search_index()
+    elif time.time() - _index.loaded_at > SEARCH_INDEX_REFRESH_SECONDS:
+        with _index_lock:
+            if not _refreshing.is_set():
+                _refreshing.set()
+                threading.Thread(target=_refresh, daemon=True).start()
+    return _index
+
+
+# ==============================
+# NEO4J FULL-TEXT BACKEND
+# ==============================
+def lucene_query(text):
+    """Every term fuzzy, the one being typed also as a prefix: 'godfathr par' -> 'godfathr~ AND (par* OR par~)'"""
+    terms = normalize_title(text).split()
+    if not terms:
+        return ""
+    *complete, last = terms
+    return " AND ".join([f"{t}~" for t in complete] + [f"({last}* OR {last}~)"])
+
+
+FULLTEXT_QUERY = """
+CALL db.index.fulltext.queryNodes($index, $query) YIELD node, score
+RETURN node.tconst AS tconst, node.primaryTitle AS title, node.startYear AS year, node.numVotes AS numVotes
+ORDER BY score DESC, node.numVotes DESC
+LIMIT $limit
+"""
+
+
+def search_fulltext(text, limit=SEARCH_RESULT_LIMIT, db=None):
+    query = lucene_query(text)
+    if not query:
+        return []
+    db = db or Connect()
+    results = db.run_query(FULLTEXT_QUERY, {"index": MOVIE_TITLE_FULLTEXT_INDEX, "query": query, "limit": limit})
+    return [dict(r) for r in results]
+
+
+def search_movies(text, limit=SEARCH_RESULT_LIMIT):
+    """Top `limit` movies matching what the user has typed so far"""
+    if MOVIE_SEARCH_BACKEND == "fulltext":
+        return search_fulltext(text, limit)
+    return get_search_index().search(text, limit)
+
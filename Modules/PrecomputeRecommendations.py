@@ -0,0 +1,120 @@
+"""
+Offline job that precomputes every user's recommendations, one list per genre.
+
+Results are stored on the User node (`precomputedRecommendations` as JSON
+{genre: [[tconst, score, numVotes], ...]}) together with the `ratingsVersion` they were
+computed from, so the Recommendations page serves them until the user rates another movie.
+Genres whose scoring had to be narrowed are left out, so the page scores them live.
+Users that are already up to date are skipped, which makes the job resumable.
+
+    python -m Modules.PrecomputeRecommendations [--processes N] [--shard I --shards N] [--force]
+"""
+import argparse
+import json
+import multiprocessing
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from Database.Neo4j_Connection import Connect
+from Modules.app_config import RECOMMENDER_ENGINE, PRECOMPUTE_PROCESSES
+from Modules.RecommendMovies import score_candidates
+from Modules.TasteProfiles import ensure_profile
+
+
+def pending_users(db, shard=0, shards=1, force=False):
+    """(username, ratingsVersion) for users in this shard whose precomputed lists are missing or stale"""
+    results = db.run_query("""
+        MATCH (u:User)
+        WHERE EXISTS { (u)-[:RATED]->(:Movie) }
+          AND ($force OR coalesce(u.precomputedVersion, -1) <> coalesce(u.ratingsVersion, 0))
+        RETURN u.username AS username, coalesce(u.ratingsVersion, 0) AS version
+        ORDER BY username
+    """, {"force": force})
+    return [
+        (r["username"], r["version"]) for r in results
+        if zlib.crc32(r["username"].encode("utf-8")) % shards == shard
+    ]
+
+
+def score_genre(user, genre, db):
+    """(rows, narrowed); narrowed lists were scored from a smaller candidate pool after running out of memory"""
+    if RECOMMENDER_ENGINE == "snapshot":
+        from Modules.GraphSnapshot import get_snapshot, get_user_ratings
+        snapshot = get_snapshot()
+        scored, _ = snapshot.recommend(get_user_ratings(user, db), [genre])
+        votes = snapshot.num_votes[snapshot.movie_index.get_indexer([r["id"] for r in scored])]
+        return [[r["id"], r["score"], int(v)] for r, v in zip(scored, votes)], False
+
+    return score_candidates(user, [genre], db)
+
+
+def precompute_user(user, version, genres):
+    """Runs in a worker process. Returns (user, number of stored recommendations)"""
+    db = Connect()
+    ensure_profile(user, db)
+    per_genre = {}
+    for genre in genres:
+        rows, narrowed = score_genre(user, genre, db)
+        # Left out, so the page scores this genre live instead of serving the narrowed list
+        if narrowed:
+            print(f"[INFO] {user}: {genre} ran out of memory and was narrowed; left to live scoring")
+            continue
+        per_genre[genre] = rows
+
+    # Stored against the version read before scoring: a rating submitted meanwhile leaves it stale
+    db.run_query("""
+        MATCH (u:User {username: $user})
+        SET u.precomputedRecommendations = $recommendations,
+            u.precomputedVersion = $version,
+            u.precomputedAt = timestamp()
+    """, {"user": user, "recommendations": json.dumps(per_genre, separators=(",", ":")), "version": version})
+    return user, sum(len(recs) for recs in per_genre.values())
+
+
+def run(processes=PRECOMPUTE_PROCESSES, shard=0, shards=1, force=False):
+    if RECOMMENDER_ENGINE == "embeddings":
+        print("[INFO] The embeddings engine answers in milliseconds and is never precomputed; "
+              "run `python -m Modules.MovieEmbeddings` to rebuild its index instead")
+        return
+    db = Connect()
+    genres = [r["type"] for r in db.run_query("MATCH (g:Genre) RETURN g.type AS type ORDER BY type")]
+    users = pending_users(db, shard, shards, force)
+    print(f"[INFO] Shard {shard + 1}/{shards}: {len(users)} users to precompute across {len(genres)} genres "
+          f"with {processes} processes")
+
+    start = time.time()
+    done = failed = stored = 0
+    # spawn, so no worker inherits the parent's driver sockets
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+        futures = {pool.submit(precompute_user, user, version, genres): user for user, version in users}
+        for future in as_completed(futures):
+            try:
+                _, count = future.result()
+                stored += count
+                done += 1
+            except Exception as e:
+                failed += 1
+                print(f"[ERROR] {futures[future]}: {e}")
+
+            finished = done + failed
+            if finished % 50 == 0 or finished == len(users):
+                elapsed = time.time() - start
+                print(f"[INFO] {finished}/{len(users)} users ({finished / elapsed:.2f} users/s, "
+                      f"{stored / elapsed:.0f} recommendations/s)")
+
+    print(f"[INFO] Precomputed {done} users in {time.time() - start:.1f}s ({failed} failed; rerun to retry them)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Precompute MovieQueue recommendations for every user")
+    parser.add_argument("--processes", type=int, default=PRECOMPUTE_PROCESSES, help="Worker processes")
+    parser.add_argument("--shard", type=int, default=0, help="Index of the user shard to process")
+    parser.add_argument("--shards", type=int, default=1, help="Total number of shards (e.g. one per machine)")
+    parser.add_argument("--force", action="store_true", help="Recompute users that are already up to date")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(args.processes, args.shard, args.shards, args.force)
@@ -0,0 +1,230 @@
+"""
+Write-behind queue for submitted ratings.
+
+enqueue() appends the rating to a local SQLite file and returns straight away; a background
+thread flushes queued ratings into Neo4j in batches (one UNWIND per transaction, see
+TasteProfiles.write_ratings) and retries with exponential backoff while Neo4j is unavailable.
+Rows are deleted only after their batch commits, so nothing is lost if the app stops, and
+replaying a batch is harmless, so a flush that fails after committing can simply be retried.
+
+Reads of a user's own data call flush_pending(user) first, so a rating always shows up in that
+user's recommendations and analytics (read-your-writes) even if the flusher is behind. When that
+flush cannot finish, the reader still answers but must not cache what it computed.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from Database.Neo4j_Connection import Connect
+from Modules.Cache import bump_rating_version
+from Modules.TasteProfiles import write_ratings
+from Modules.app_config import (
+    RATING_QUEUE_PATH, RATING_FLUSH_BATCH_SIZE, RATING_FLUSH_INTERVAL_SECONDS, RATING_FLUSH_MAX_BACKOFF_SECONDS
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_ratings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    tconst TEXT NOT NULL,
+    rating REAL NOT NULL,
+    discovery TEXT,
+    date TEXT,
+    time TEXT,
+    submitted_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pending_ratings_user ON pending_ratings (user, id);
+"""
+
+COLUMNS = ("id", "user", "tconst", "rating", "discovery", "date", "time")
+
+
+class RatingQueue:
+    def __init__(self, path=RATING_QUEUE_PATH, db=None):
+        self.path = path
+        self.db = db
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            self._pending = Counter(dict(conn.execute("SELECT user, count(*) FROM pending_ratings GROUP BY user")))
+
+        # One flush at a time, whether from the background thread or a reader
+        self._flush_lock = threading.Lock()
+        self._counts_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.failures = 0
+        self.flushed = 0
+        self.last_error = None
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    # ==============================
+    # SUBMITTING
+    # ==============================
+    def enqueue(self, user, tconst, rating, discovery, watch_date, watch_time):
+        """Durably queues the rating; it is in Neo4j within about RATING_FLUSH_INTERVAL_SECONDS"""
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO pending_ratings (user, tconst, rating, discovery, date, time, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user, tconst, float(rating), discovery, watch_date, watch_time, time.time()),
+            )
+        with self._counts_lock:
+            self._pending[user] += 1
+        bump_rating_version(user)
+        self.start()
+        self._wake.set()
+
+    def pending_count(self, user=None):
+        with self._counts_lock:
+            return self._pending[user] if user is not None else sum(self._pending.values())
+
+    def pending_rating(self, user, tconst):
+        """The user's latest queued rating of the movie, or None"""
+        if not self.pending_count(user):
+            return None
+        row = self._connection().execute(
+            "SELECT rating FROM pending_ratings WHERE user = ? AND tconst = ? ORDER BY id DESC LIMIT 1", (user, tconst)
+        ).fetchone()
+        return row[0] if row else None
+
+    # ==============================
+    # FLUSHING
+    # ==============================
+    def _rows(self, user=None):
+        query = f"SELECT {', '.join(COLUMNS)} FROM pending_ratings"
+        if user is not None:
+            return self._connection().execute(
+                f"{query} WHERE user = ? ORDER BY id LIMIT ?", (user, RATING_FLUSH_BATCH_SIZE)
+            ).fetchall()
+        return self._connection().execute(f"{query} ORDER BY id LIMIT ?", (RATING_FLUSH_BATCH_SIZE,)).fetchall()
+
+    def _write(self, rows):
+        # A movie rated twice while queued only needs its latest rating; rows are in submission order
+        latest = {}
+        for row in rows:
+            record = dict(zip(COLUMNS, row))
+            latest[(record["user"], record["tconst"])] = record
+        ratings = [{k: v for k, v in record.items() if k != "id"} for record in latest.values()]
+
+        db = self.db or Connect()
+        with db.session() as session:
+            session.execute_write(write_ratings, ratings)
+
+        ids = [row[0] for row in rows]
+        with self._connection() as conn:
+            conn.executemany("DELETE FROM pending_ratings WHERE id = ?", [(i,) for i in ids])
+        users = Counter(row[1] for row in rows)
+        with self._counts_lock:
+            self._pending.subtract(users)
+            self._pending += Counter()  # drop users with nothing left
+        # Anything cached while these were still queued was computed without them
+        for user in users:
+            bump_rating_version(user)
+        self.flushed += len(rows)
+
+    def flush(self, user=None):
+        """Writes queued ratings (only `user`'s if given) until none are left; raises if Neo4j fails"""
+        with self._flush_lock:
+            while self.pending_count(user):
+                rows = self._rows(user)
+                if not rows:
+                    break
+                self._write(rows)
+
+    def flush_pending(self, user):
+        """
+        Read-your-writes: makes sure the user's queued ratings are in Neo4j before their data is read.
+        False if some are still queued, in which case the caller must not cache its result.
+        """
+        if not self.pending_count(user):
+            return True
+        try:
+            if self.failures:
+                # The background flusher is backing off; one batch is enough to find out whether Neo4j is back
+                with self._flush_lock:
+                    rows = self._rows(user)
+                    if rows:
+                        self._write(rows)
+                self.failures = 0
+            else:
+                self.flush(user)
+        except Exception as e:
+            # The reader still gets an answer; the background flusher keeps retrying
+            print(f"[ERROR] Could not flush queued ratings for {user}: {e}")
+            self.last_error = str(e)
+            return False
+        return not self.pending_count(user)
+
+    def _run(self):
+        while True:
+            if self.failures:
+                # Submissions must not cut the backoff short
+                time.sleep(min(RATING_FLUSH_INTERVAL_SECONDS * 2 ** self.failures, RATING_FLUSH_MAX_BACKOFF_SECONDS))
+            else:
+                self._wake.wait(RATING_FLUSH_INTERVAL_SECONDS)
+                self._wake.clear()
+            if not self.pending_count():
+                continue
+            try:
+                self.flush()
+                self.failures = 0
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                print(f"[ERROR] Rating flush failed ({self.pending_count()} queued, attempt {self.failures}): {e}")
+
+    def start(self):
+        """Starts the background flusher once; ratings left over from a previous run are flushed first"""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rating-flusher", daemon=True)
+                self._thread.start()
+        if self.pending_count():
+            self._wake.set()
+
+    def stats(self):
+        return {"name": "rating queue", "pending": self.pending_count(), "flushed": self.flushed,
+                "failures": self.failures, "last_error": self.last_error}
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    """The process-wide queue"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = RatingQueue()
+    return _queue
+
+
+def enqueue(user, tconst, rating, discovery, watch_date, watch_time):
+    get_queue().enqueue(user, tconst, rating, discovery, watch_date, watch_time)
+
+
+def flush_pending(user):
+    return get_queue().flush_pending(user)
+
+
+def pending_count(user):
+    return get_queue().pending_count(user)
+
+
+def pending_rating(user, tconst):
+    return get_queue().pending_rating(user, tconst)
@@ -1,239 +1,279 @@
 from Database.Neo4j_Connection import Connect
+from Modules.app_config import (
+    RECOMMENDER_ENGINE, COLLAB_ROLES, RECOMMENDATION_LIMIT,
+    RECOMMENDATION_CACHE_SIZE, RECOMMENDATION_CACHE_TTL_SECONDS, PRECOMPUTE_MAX_AGE_SECONDS,
+    RECOMMENDATION_PAGE_SIZE, COLLAB_CAP_PER_ROLE, COLLAB_CAP_MIN
+)
+from Modules.Cache import TTLLRUCache, register_user_cache, rating_version
+from Modules.GraphSnapshot import get_snapshot, get_user_ratings
+from Modules.MovieEmbeddings import get_embeddings
+from Modules.TasteProfiles import ensure_profile
+from Modules.RatingQueue import flush_pending, pending_count
+from Modules.RecommendationCards import inject_card_styles, render_cards_html
 from neo4j.exceptions import TransientError
-from collections import defaultdict
 import streamlit as st
-
-role_map = {
-    "SHOT": "Cinematographer",
-    "EDITED": "Editor",
-    "CAST": "Casting Director",
-    "PRODUCED": "Producer",
-    "WROTE": "Writer",
-    "DESIGNED PRODUCTION": "Production Designer",
-    "FEATURED_IN_ARCHIVE_SOUND": "Archive Sound Contributor",
-    "FEATURED_IN_ARCHIVE_FOOTAGE": "Archive Footage Contributor",
-    "Designed Production": "Production Designer"
-}
-
-
-def get_candidate_movie_ids(user, genres):
-    db = Connect()
-
-    query = """
-    MATCH (u:User {username: $user})-[r:RATED]->(m:Movie)
-    WITH u, m, r.rating / 5.0 AS rating_weight
-
-    MATCH (m)<-[rel]-(p:Person)
-    WHERE type(rel) IN [
-        'ACTED_IN', 'DIRECTED', 'WROTE', 'PRODUCED', 'COMPOSED_SCORE_FOR',
-        'EDITED', 'SHOT', 'CAST', 'DESIGNED_PRODUCTION', 'ANIMATED'
-    ]
-
-    WITH u, p.name AS person_name, type(rel) AS role, rating_weight
-    WITH u, role, person_name, SUM(rating_weight) AS influence
-
-    WITH u, collect({person: person_name, role: role, weight: influence}) AS collaborators
-
-    UNWIND collaborators AS wc
-    MATCH (p:Person {name: wc.person})-[rel]->(rec:Movie)
-    WHERE type(rel) = wc.role
-
-    MATCH (rec)-[:HAS_GENRE]->(g:Genre)
-    WHERE g.type IN $genres AND NOT EXISTS {
-        MATCH (u)-[:RATED]->(rec)
-    }
-
-    WITH DISTINCT rec, collaborators
-    WITH rec, collaborators ORDER BY rec.numVotes DESC
-    LIMIT 75
-    RETURN rec.tconst AS id, collaborators
+import json
+import math
+
+
+# Bounded candidate generation: only the user's $per_role highest-weighted collaborators per role are
+# expanded, straight from the profile's Person nodes (so homonyms are never conflated), and each
+# candidate is scored in the same pass.
+SCORES_QUERY = """
+MATCH (u:User {username: $user})-[w:COLLAB_WEIGHT]->(p:Person)
+WITH u, w.role AS role, p, w.weight AS weight
+ORDER BY weight DESC
+WITH u, role, collect({person: p, weight: weight})[..$per_role] AS top
+UNWIND top AS c
+WITH u, role, c.person AS p, c.weight AS weight
+
+MATCH (p)-[rel]->(rec:Movie)
+WHERE type(rel) = role
+  AND EXISTS { MATCH (rec)-[:HAS_GENRE]->(g:Genre) WHERE g.type IN $genres }
+  AND NOT EXISTS { MATCH (u)-[:RATED]->(rec) }
+WITH rec, SUM(
+    CASE role
+        WHEN 'ACTED_IN' THEN 4.0
+        WHEN 'DIRECTED' THEN 3.0
+        WHEN 'WROTE' THEN 2.0
+        WHEN 'PRODUCED' THEN 2.0
+        WHEN 'COMPOSED_SCORE_FOR' THEN 2.0
+        ELSE 1.0
+    END * weight
+) AS total_collab_score
+ORDER BY rec.numVotes DESC
+LIMIT $limit
+
+WITH rec, total_collab_score + log(1 + rec.numVotes) + rec.averageRating * 1.5 AS total_score
+RETURN rec.tconst AS id, rec.numVotes AS votes, total_score
+ORDER BY total_score DESC
+"""
+
+# Card details for a page of already-scored ids ($scored: [{id, score}]), keeping only the people the user has already seen
+SCORED_DETAILS_QUERY = """
+MATCH (u:User {username: $user})-[w:COLLAB_WEIGHT]->(p:Person)
+WITH collect(DISTINCT w.role + '|' + p.name) AS seen
+UNWIND $scored AS s
+MATCH (rec:Movie {tconst: s.id})
+WITH rec, seen, s.score AS total_score
+
+OPTIONAL MATCH (rec)-[:HAS_GENRE]->(g:Genre)
+WITH rec, seen, total_score, collect(DISTINCT g.type) AS all_genres
+OPTIONAL MATCH (rec)<-[r]-(p:Person)
+WHERE type(r) IN $roles AND type(r) + '|' + p.name IN seen
+WITH rec, total_score, all_genres, collect(DISTINCT {name: p.name, role: type(r)}) AS collabs
+RETURN
+    rec.tconst AS id,
+    rec.primaryTitle AS recommendation,
+    rec.averageRating AS rec_rating,
+    rec.numVotes AS rec_votes,
+    rec.runtimeMinutes AS rec_runtime,
+    rec.startYear AS rec_year,
+    all_genres,
+    total_score,
+    [x IN collabs WHERE x.role = 'ACTED_IN' | x.name] AS shared_actors,
+    [x IN collabs WHERE x.role = 'DIRECTED' | x.name] AS shared_directors,
+    [x IN collabs WHERE x.role = 'COMPOSED_SCORE_FOR' | x.name] AS shared_composers,
+    [x IN collabs WHERE x.role IN ['WROTE','PRODUCED','EDITED','SHOT','CAST','DESIGNED_PRODUCTION','ANIMATED'] | [x.name, x.role]] AS shared_others
+ORDER BY total_score DESC
+"""
+
+
+def is_out_of_memory(error):
+    return "MemoryPoolOutOfMemoryError" in str(error)
+
+
+def _score_rows(db, user, genres, per_role):
+    results = db.run_query(SCORES_QUERY, {
+        "user": user, "genres": genres, "per_role": per_role, "limit": RECOMMENDATION_LIMIT
+    })
+    return [[r["id"], r["total_score"], r["votes"]] for r in results]
+
+
+def score_candidates(user, genres, db=None, per_role=COLLAB_CAP_PER_ROLE):
     """
+    Scored [[tconst, score, numVotes]] best first, plus whether the search had to be narrowed.
 
+    Runs one bounded query for all genres. If Neo4j still runs out of query memory, it falls
+    back to one query per genre, halving that genre's collaborator cap on every further
+    failure down to COLLAB_CAP_MIN, and merges the per-genre lists.
+    """
+    db = db or Connect()
     try:
-        results = db.run_query(query, {"user": user, "genres": genres})
-        return [{"id": r["id"], "collaborators": r["collaborators"]} for r in results], False
+        return _score_rows(db, user, genres, per_role), False
     except TransientError as e:
-        if "MemoryPoolOutOfMemoryError" in str(e):
-            st.error("🚨 Too many matching movies for your selected genres. Try narrowing your genre selection.")
-            return [], True
-        else:
+        if not is_out_of_memory(e):
             raise
 
-
-def get_scored_movies(ids, collaborators):
-    db = Connect()
-
-    query = """
-    UNWIND $ids AS movieId
-    MATCH (rec:Movie {tconst: movieId})
-    WITH rec, rec.averageRating AS rec_rating, rec.numVotes AS rec_votes
-
-    UNWIND $collaborators AS wc
-    MATCH (p:Person {name: wc.person})-[rel]->(rec)
-    WHERE type(rel) = wc.role
-
-    WITH rec, wc, type(rel) AS role, rec_rating, rec_votes
-    WITH rec, rec_rating, rec_votes,
-         SUM(
-            CASE role
-                WHEN 'ACTED_IN' THEN 4.0
-                WHEN 'DIRECTED' THEN 3.0
-                WHEN 'WROTE' THEN 2.0
-                WHEN 'PRODUCED' THEN 2.0
-                WHEN 'COMPOSED_SCORE_FOR' THEN 2.0
-                ELSE 1.0
-            END * wc.weight
-         ) AS total_collab_score
-
-    WITH rec,
-         total_collab_score,
-         log(1 + rec.numVotes) AS popularity_score,
-         rec.averageRating * 1.5 AS quality_score,
-         total_collab_score + log(1 + rec.numVotes) + rec.averageRating * 1.5 AS total_score
-
-    RETURN rec.tconst AS id, total_score
-    ORDER BY total_score DESC
+    per_genre = {}
+    for genre in genres:
+        cap = per_role
+        while True:
+            try:
+                per_genre[genre] = _score_rows(db, user, [genre], cap)
+                if cap < per_role:
+                    print(f"[INFO] {genre} for {user}: narrowed from {per_role} to {cap} collaborators per role")
+                break
+            except TransientError as e:
+                if not is_out_of_memory(e):
+                    raise
+                if cap <= COLLAB_CAP_MIN:
+                    print(f"[ERROR] Skipping {genre} for {user}: out of memory at every cap from {per_role} down to "
+                          f"{cap} collaborators per role (COLLAB_CAP_MIN); lower COLLAB_CAP_MIN or raise Neo4j's "
+                          f"transaction memory")
+                    per_genre[genre] = []
+                    break
+                cap = max(cap // 2, COLLAB_CAP_MIN)
+    return merge_rows(per_genre, genres), True
+
+
+def get_recommendations_cypher(user, genres):
     """
-
-    results = db.run_query(query, {"ids": ids, "collaborators": collaborators})
-    return [{"id": r["id"], "score": r["total_score"]} for r in results]
-
-def get_movie_details(ids):    
-    db = Connect()
-
-    query = """
-    UNWIND $ids AS movieId
-    MATCH (rec:Movie {tconst: movieId})
-    OPTIONAL MATCH (rec)-[:HAS_GENRE]->(g:Genre)
-    OPTIONAL MATCH (rec)<-[r]-(p:Person)
-    WHERE type(r) IN [
-        'ACTED_IN', 'DIRECTED', 'WROTE', 'PRODUCED', 'COMPOSED_SCORE_FOR',
-        'EDITED', 'SHOT', 'CAST', 'DESIGNED_PRODUCTION', 'ANIMATED'
-    ]
-    WITH rec, collect(DISTINCT g.type) AS all_genres,
-         collect(DISTINCT {name: p.name, role: type(r)}) AS collabs
-    RETURN 
-        rec.tconst AS id,
-        rec.primaryTitle AS recommendation,
-        rec.averageRating AS rec_rating,
-        rec.numVotes AS rec_votes,
-        rec.runtimeMinutes AS rec_runtime,
-        rec.startYear AS rec_year,
-        all_genres,
-        [x IN collabs WHERE x.role = 'ACTED_IN' | x.name] AS shared_actors,
-        [x IN collabs WHERE x.role = 'DIRECTED' | x.name] AS shared_directors,
-        [x IN collabs WHERE x.role = 'COMPOSED_SCORE_FOR' | x.name] AS shared_composers,
-        [x IN collabs WHERE x.role IN ['WROTE','PRODUCED','EDITED','SHOT','CAST','DESIGNED_PRODUCTION','ANIMATED'] | [x.name, x.role]] AS shared_others
+    Candidates and scores from the bounded generator; narrows rather than failing on memory errors.
+    The flag is True when it had to narrow, so the reduced list is not cached.
     """
-
-    results = db.run_query(query, {"ids": ids})
-
-    return results
-  
-def format_recommendations(details, score_lookup, collab_lookup, genres):
-    formatted_recommendations = []
-
-    for rec in details:
-        rec = dict(rec)
-        rec["total_score"] = score_lookup.get(rec["id"], 0.0)
-
-        seen_collabs = collab_lookup.get(rec["id"], [])
-        seen_set = {(c["person"], c["role"]) for c in seen_collabs}
-
-        # Filter down to shared people only
-        rec["shared_actors"] = [name for name in rec["shared_actors"] if (name, "ACTED_IN") in seen_set]
-        rec["shared_directors"] = [name for name in rec["shared_directors"] if (name, "DIRECTED") in seen_set]
-        rec["shared_composers"] = [name for name in rec["shared_composers"] if (name, "COMPOSED_SCORE_FOR") in seen_set]
-        rec["shared_others"] = [pair for pair in rec["shared_others"] if tuple(pair) in seen_set]
-
-        formatted_recommendations.append(rec)
+    db = Connect()
+    ensure_profile(user, db)
+    rows, narrowed = score_candidates(user, genres, db)
+    if narrowed:
+        st.warning("⚠️ That was a lot of movies to search, so these recommendations come from your closest collaborators only.")
+    return [{"id": movie_id, "score": score} for movie_id, score, _ in rows], narrowed
 
 
-    return formatted_recommendations, False
+def get_recommendations_snapshot(user, genres):
+    """Scores in-process over the shared CSR snapshot, so the database only serves small lookups"""
+    ensure_profile(user)
+    scored, _ = get_snapshot().recommend(get_user_ratings(user), genres)
+    return scored, False
 
 
-def get_recommendations(user, genres):
-    ids_and_collabs, memory_error = get_candidate_movie_ids(user, genres)
-    if memory_error or not ids_and_collabs:
-        return [], memory_error
-
-    ids = [r["id"] for r in ids_and_collabs]
-    collaborators = ids_and_collabs[0]["collaborators"] if ids_and_collabs else []
-
-    scored = get_scored_movies(ids, collaborators)
-    score_lookup = {r["id"]: r["score"] for r in scored}
-    collab_lookup = {r["id"]: collaborators for r in scored}  # assuming same collabs for each
-
-    details = get_movie_details([r["id"] for r in scored])
-    formatted, _ = format_recommendations(details, score_lookup, collab_lookup, genres)
-    return formatted, False
-    
-def display_recommendations(recommendations):
-    if not recommendations:
-        st.info("No recommendations found. Try rating more movies or selecting more genres.")
-        return
+def get_recommendations_embeddings(user, genres):
+    """Nearest movies to the user's rating-weighted taste vector; scores live when the index has not been built"""
+    embeddings = get_embeddings()
+    if embeddings is None:
+        print("[INFO] No movie embeddings built yet (python -m Modules.MovieEmbeddings); scoring with Cypher")
+        return get_recommendations_cypher(user, genres)
+    # The cards still list the collaborators from the user's taste profile
+    ensure_profile(user)
+    return embeddings.recommend(get_user_ratings(user), genres), False
 
-    st.success("Here are your personalized recommendations:")
 
-    for rec in recommendations:
-        html_parts = []
+def merge_rows(per_genre, genres, limit=RECOMMENDATION_LIMIT):
+    """
+    Rebuilds a multi-genre list from per-genre lists of [id, score, votes]. Each per-genre list
+    holds that genre's `limit` most-voted candidates, so their union contains the `limit`
+    most-voted candidates across all the genres, exactly as a single query selects them.
+    """
+    merged = {}
+    for genre in genres:
+        for movie_id, score, votes in per_genre[genre]:
+            merged[movie_id] = (score, votes)
+    candidates = sorted(merged.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+    candidates.sort(key=lambda item: item[1][0], reverse=True)
+    return [[movie_id, score, votes] for movie_id, (score, votes) in candidates]
 
-        # --- Start Card ---
-        html_parts.append("<div style='background:#1e1e1e;padding:20px;border-radius:16px;border:1px solid #444;margin-bottom:25px;box-shadow:0 4px 12px rgba(0,0,0,0.3);color:white;font-family:sans-serif;'>")
 
-        # Title
-        html_parts.append(f"<h2 style='margin-bottom:8px;'>🎬 {rec.get('recommendation')} <span style='font-size:0.7em; color:gray;'>({rec.get('rec_year')})</span></h2>")
+def merge_precomputed(per_genre, genres, limit=RECOMMENDATION_LIMIT):
+    return [{"id": movie_id, "score": score} for movie_id, score, _ in merge_rows(per_genre, genres, limit)]
 
-        # genre tags
-        all_genres = rec.get('all_genres') or rec.get('shared_genres') or []
-        genre_tags = " ".join([
-            f"<span style='background:#FF5C5C; color:white; padding:4px 8px; border-radius:8px; font-size:0.8em; margin-right:5px;'>{g}</span>"
-            for g in all_genres
-        ])
 
-        html_parts.append(f"<div style='margin-bottom:8px;'>{genre_tags}</div>")
+PRECOMPUTED_QUERY = """
+MATCH (u:User {username: $user})
+WHERE u.precomputedVersion = coalesce(u.ratingsVersion, 0)
+  AND timestamp() - u.precomputedAt < $max_age_ms
+RETURN u.precomputedRecommendations AS recommendations
+"""
 
-        # Info
-        html_parts.append(f"<p style='margin:2px 0;'><strong>Runtime:</strong> {rec.get('rec_runtime')} mins</p>")
-        html_parts.append(f"<p style='margin:2px 0;'><strong>Avg Rating:</strong> {round(rec.get('rec_rating')/2, 2)}/5 ⭐ | <strong>Votes:</strong> {rec.get('rec_votes'):,}</p>")
-        html_parts.append(f"<p style='margin:2px 0;'><strong>Recommendation Score:</strong> <span style='color:#ffd700;'>{rec.get('total_score', 0.0):.2f}</span></p>")
-        
-        # Explanation Dropdown
-        explanation_html = []
-        explanation_html.append("""
-        <details style='margin-top:15px;'>
-            <summary style='cursor: pointer; font-weight:bold; font-size:1.05em; padding:4px 0;'>💡 Why was this recommended?</summary>
-            <div style='margin-top:8px; transition: all 0.3s ease; line-height:1.6;'>
-        """)
 
-        if rec['shared_actors']:
-            explanation_html.append(f"<p style='margin:3px 0; font-weight:600;'>🎭 Familiar Actors:</p><p style='margin-left:12px; color:#ccc;'>{', '.join(rec.get('shared_actors'))}</p>")
+def get_recommendations_precomputed(user, genres):
+    """Results of the offline job, or None when they are missing or older than the user's ratings"""
+    db = Connect()
+    results = db.run_query(PRECOMPUTED_QUERY, {"user": user, "max_age_ms": PRECOMPUTE_MAX_AGE_SECONDS * 1000})
+    if not results:
+        return None
+    per_genre = json.loads(results[0]["recommendations"])
+    if any(genre not in per_genre for genre in genres):
+        return None
 
-        if rec['shared_directors']:
-            explanation_html.append(f"<p style='margin:3px 0; font-weight:600;'>🎬 Director(s):</p><p style='margin-left:12px; color:#ccc;'>{', '.join(rec.get('shared_directors'))}</p>")
+    return merge_precomputed(per_genre, genres)
 
-        if rec['shared_composers']:
-            explanation_html.append(f"<p style='margin:3px 0; font-weight:600;'>🎼 Composer(s):</p><p style='margin-left:12px; color:#ccc;'>{', '.join(rec.get('shared_composers'))}</p>")
 
-        # Group other collaborators (excluding composers)
-        crew_by_role = defaultdict(list)
-        for name, role in rec['shared_others']:
-            if role and role.upper() not in ["DIRECTED", "COMPOSED_MUSIC_FOR", "COMPOSER"]:                
-                crew_by_role[role].append(name)
+# Keyed on (username, genres, rating version), so a new rating never serves a stale list
+recommendation_cache = register_user_cache(
+    TTLLRUCache(RECOMMENDATION_CACHE_SIZE, RECOMMENDATION_CACHE_TTL_SECONDS, name="recommendations")
+)
 
-        if crew_by_role:
-            explanation_html.append("<p style='margin:3px 0; font-weight:600;'>🛠 Other Collaborators:</p><ul style='margin:0 0 0 15px;padding:0;list-style:none;color:#ccc;'>")
-            for role, people in sorted(crew_by_role.items()):
-                readable_role = role_map.get(role, role.replace("_", " ").title())
-                explanation_html.append(f"<li style='margin:2px 0;'>└ {readable_role}: {', '.join(sorted(people))}</li>")
-            explanation_html.append("</ul>")
 
-        explanation_html.append("</div></details>")
-        html_parts.extend(explanation_html)
+def get_recommendations(user, genres):
+    """Ranked [{"id", "score"}] for the user and genres; card details come from get_movie_details()"""
+    # Results computed while some of the user's ratings are still queued miss them, so they are not cached
+    flushed = flush_pending(user)
+    key = (user, tuple(sorted(genres)), rating_version(user))
+    cached = recommendation_cache.get(key)
+    if cached is not None:
+        return cached, False
+
+    # Embedding lookups are cheaper than reading the precomputed lists back, and precomputed lists
+    # cannot include queued ratings
+    precomputed = None
+    if RECOMMENDER_ENGINE != "embeddings" and flushed:
+        precomputed = get_recommendations_precomputed(user, genres)
+    if precomputed is not None:
+        recommendation_cache.set(key, precomputed)
+        return precomputed, False
+
+    if RECOMMENDER_ENGINE == "embeddings":
+        recommendations, memory_error = get_recommendations_embeddings(user, genres)
+    elif RECOMMENDER_ENGINE == "snapshot":
+        recommendations, memory_error = get_recommendations_snapshot(user, genres)
+    else:
+        recommendations, memory_error = get_recommendations_cypher(user, genres)
+
+    # A narrowed list is recomputed (and warned about) on the next run rather than served silently
+    if not memory_error and flushed:
+        recommendation_cache.set(key, recommendations)
+    return recommendations, memory_error
+
+
+def get_movie_details(user, scored):
+    """Card details for one page of scored ids, keeping only the people the user has already seen"""
+    key = (user, "details", tuple(r["id"] for r in scored), rating_version(user))
+
+    def fetch():
+        results = Connect().run_query(SCORED_DETAILS_QUERY, {"user": user, "scored": scored, "roles": COLLAB_ROLES})
+        return [dict(r) for r in results]
+
+    if pending_count(user):
+        return fetch()
+    return recommendation_cache.get_or_compute(key, fetch)
+
+
+def display_recommendations(user, scored, view_key=None, page_size=RECOMMENDATION_PAGE_SIZE):
+    """Renders one page of cards; details are only fetched for the page being shown"""
+    if not scored:
+        st.info("No recommendations found. Try rating more movies or selecting more genres.")
+        return
 
-        # --- End Card ---
-        html_parts.append("</div>")
+    # A new genre selection starts again from the first page
+    if st.session_state.get("recommendation_view") != view_key:
+        st.session_state.recommendation_view = view_key
+        st.session_state.recommendation_page = 0
 
-        html = "".join(html_parts)
-        st.markdown(html, unsafe_allow_html=True)
+    n_pages = math.ceil(len(scored) / page_size)
+    page = min(st.session_state.get("recommendation_page", 0), n_pages - 1)
+    start = page * page_size
 
+    st.success("Here are your personalized recommendations:")
+    inject_card_styles()
+    st.markdown(render_cards_html(get_movie_details(user, scored[start:start + page_size])), unsafe_allow_html=True)
+
+    def go_to(target):
+        st.session_state.recommendation_page = target
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("◀ Previous", on_click=go_to, args=(page - 1,), disabled=page == 0)
+    with col2:
+        st.caption(f"Page {page + 1} of {n_pages} · {len(scored)} recommendations")
+    with col3:
+        st.button("Next ▶", on_click=go_to, args=(page + 1,), disabled=page >= n_pages - 1)
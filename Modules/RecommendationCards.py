@@ -0,0 +1,86 @@
+from collections import defaultdict
+from html import escape
+import streamlit as st
+
+role_map = {
+    "SHOT": "Cinematographer",
+    "EDITED": "Editor",
+    "CAST": "Casting Director",
+    "PRODUCED": "Producer",
+    "WROTE": "Writer",
+    "DESIGNED PRODUCTION": "Production Designer",
+    "FEATURED_IN_ARCHIVE_SOUND": "Archive Sound Contributor",
+    "FEATURED_IN_ARCHIVE_FOOTAGE": "Archive Footage Contributor",
+    "Designed Production": "Production Designer"
+}
+
+# Sent once per page instead of being repeated inline on every element of every card
+CARD_CSS = """
+.mq-card{background:#1e1e1e;padding:20px;border-radius:16px;border:1px solid #444;margin-bottom:25px;box-shadow:0 4px 12px rgba(0,0,0,0.3);color:white;font-family:sans-serif;}
+.mq-card h2{margin-bottom:8px;}
+.mq-year{font-size:0.7em;color:gray;}
+.mq-tags{margin-bottom:8px;}
+.mq-tag{background:#FF5C5C;color:white;padding:4px 8px;border-radius:8px;font-size:0.8em;margin-right:5px;}
+.mq-card p{margin:2px 0;}
+.mq-score{color:#ffd700;}
+.mq-why{margin-top:15px;}
+.mq-why summary{cursor:pointer;font-weight:bold;font-size:1.05em;padding:4px 0;}
+.mq-why-body{margin-top:8px;line-height:1.6;}
+.mq-why-body p.mq-label{margin:3px 0;font-weight:600;}
+.mq-why-body p.mq-people{margin-left:12px;color:#ccc;}
+.mq-crew{margin:0 0 0 15px;padding:0;list-style:none;color:#ccc;}
+.mq-crew li{margin:2px 0;}
+"""
+
+
+def inject_card_styles():
+    st.markdown(f"<style>{CARD_CSS}</style>", unsafe_allow_html=True)
+
+
+def _people(label, names):
+    return f"<p class='mq-label'>{label}</p><p class='mq-people'>{escape(', '.join(names))}</p>"
+
+
+def render_card_html(rec):
+    """HTML for one recommendation card; styling comes from CARD_CSS"""
+    rating = rec.get('rec_rating')
+    votes = rec.get('rec_votes')
+    genres = rec.get('all_genres') or rec.get('shared_genres') or []
+
+    parts = [
+        "<div class='mq-card'>",
+        f"<h2>🎬 {escape(str(rec.get('recommendation')))} <span class='mq-year'>({rec.get('rec_year')})</span></h2>",
+        "<div class='mq-tags'>" + "".join(f"<span class='mq-tag'>{escape(g)}</span>" for g in genres) + "</div>",
+        f"<p><strong>Runtime:</strong> {rec.get('rec_runtime')} mins</p>",
+        f"<p><strong>Avg Rating:</strong> {f'{round(rating / 2, 2)}/5' if rating is not None else 'N/A'} ⭐ | "
+        f"<strong>Votes:</strong> {f'{votes:,}' if votes is not None else 'N/A'}</p>",
+        f"<p><strong>Recommendation Score:</strong> <span class='mq-score'>{rec.get('total_score') or 0.0:.2f}</span></p>",
+        "<details class='mq-why'><summary>💡 Why was this recommended?</summary><div class='mq-why-body'>",
+    ]
+
+    if rec.get('shared_actors'):
+        parts.append(_people("🎭 Familiar Actors:", rec['shared_actors']))
+    if rec.get('shared_directors'):
+        parts.append(_people("🎬 Director(s):", rec['shared_directors']))
+    if rec.get('shared_composers'):
+        parts.append(_people("🎼 Composer(s):", rec['shared_composers']))
+
+    # Group other collaborators (excluding composers)
+    crew_by_role = defaultdict(list)
+    for name, role in rec.get('shared_others') or []:
+        if role and role.upper() not in ["DIRECTED", "COMPOSED_MUSIC_FOR", "COMPOSER"]:
+            crew_by_role[role].append(name)
+
+    if crew_by_role:
+        parts.append("<p class='mq-label'>🛠 Other Collaborators:</p><ul class='mq-crew'>")
+        for role, people in sorted(crew_by_role.items()):
+            readable_role = role_map.get(role, role.replace("_", " ").title())
+            parts.append(f"<li>└ {escape(readable_role)}: {escape(', '.join(sorted(people)))}</li>")
+        parts.append("</ul>")
+
+    parts.append("</div></details></div>")
+    return "".join(parts)
+
+
+def render_cards_html(recs):
+    return "".join(render_card_html(rec) for rec in recs)
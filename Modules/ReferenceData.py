@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from Database.Neo4j_Connection import Connect
+from Modules.Cache import TTLLRUCache
+from Modules.app_config import (
+    ETL_MARKER_PATH, REFERENCE_TTL_SECONDS, REFERENCE_MOVIE_CACHE_SIZE, REFERENCE_WARM_MOVIES,
+    REFERENCE_MARKER_CHECK_SECONDS
+)
+
+# Shared by every Streamlit session in the process
+lookup_cache = TTLLRUCache(16, REFERENCE_TTL_SECONDS, name="reference lists")
+movie_cache = TTLLRUCache(REFERENCE_MOVIE_CACHE_SIZE, REFERENCE_TTL_SECONDS, name="movie metadata")
+
+MOVIE_METADATA_QUERY = """
+UNWIND $ids AS movieId
+MATCH (m:Movie {tconst: movieId})
+OPTIONAL MATCH (m)-[:HAS_GENRE]->(g:Genre)
+WITH m, collect(DISTINCT g.type) AS genres
+RETURN m.tconst AS tconst, m.primaryTitle AS title, m.startYear AS year, m.runtimeMinutes AS runtime,
+       m.averageRating AS rating, m.numVotes AS votes, genres
+"""
+
+GENRES_QUERY = "MATCH (g:Genre) RETURN DISTINCT g.type AS type ORDER BY type"
+PROFESSIONS_QUERY = "MATCH (p:Profession) RETURN DISTINCT p.type AS type ORDER BY type"
+
+# The IS NOT NULL lets the planner walk the numVotes index in order instead of sorting every movie
+TOP_MOVIES_QUERY = """
+MATCH (m:Movie)
+WHERE m.numVotes IS NOT NULL
+RETURN m.tconst AS tconst
+ORDER BY m.numVotes DESC
+LIMIT $limit
+"""
+
+
+# ==============================
+# ETL-DRIVEN INVALIDATION
+# ==============================
+_UNSEEN = object()
+_marker_mtime = _UNSEEN
+_marker_checked = 0.0
+_marker_lock = threading.Lock()
+_listeners = []
+
+
+def on_catalogue_change(callback):
+    """Registers a callback to run when the ETL marker changes (e.g. to reload an in-process index)"""
+    _listeners.append(callback)
+    return callback
+
+
+def _marker_version():
+    try:
+        return os.stat(ETL_MARKER_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def check_for_etl_update():
+    """Drops all reference data if the ETL has completed since the last check (checked at most every few seconds)"""
+    global _marker_mtime, _marker_checked
+    now = time.time()
+    if now - _marker_checked < REFERENCE_MARKER_CHECK_SECONDS:
+        return False
+    with _marker_lock:
+        _marker_checked = now
+        version = _marker_version()
+        changed = _marker_mtime is not _UNSEEN and version != _marker_mtime
+        _marker_mtime = version
+    if changed:
+        print("[INFO] ETL completion marker changed; dropping cached reference data")
+        lookup_cache.invalidate()
+        movie_cache.invalidate()
+        for callback in _listeners:
+            callback()
+    return changed
+
+
+# ==============================
+# LOOKUPS
+# ==============================
+def _lookup(key, query):
+    check_for_etl_update()
+    return lookup_cache.get_or_compute(key, lambda: [r["type"] for r in Connect().run_query(query)])
+
+
+def get_genres():
+    return _lookup("genres", GENRES_QUERY)
+
+
+def get_professions():
+    return _lookup("professions", PROFESSIONS_QUERY)
+
+
+def get_movies(tconsts):
+    """{tconst: metadata} for the given ids; only the ones not already cached are fetched, in one query"""
+    check_for_etl_update()
+    found, missing = {}, []
+    for tconst in dict.fromkeys(tconsts):
+        movie = movie_cache.get(tconst)
+        if movie is None:
+            missing.append(tconst)
+        else:
+            found[tconst] = movie
+    if missing:
+        for record in Connect().run_query(MOVIE_METADATA_QUERY, {"ids": missing}):
+            movie = dict(record)
+            movie_cache.set(movie["tconst"], movie)
+            found[movie["tconst"]] = movie
+    return found
+
+
+def get_movie(tconst):
+    return get_movies([tconst]).get(tconst)
+
+
+def warm_reference_data(movies=REFERENCE_WARM_MOVIES):
+    """Loads the lookup lists and the most-voted movies' metadata"""
+    start = time.time()
+    get_genres()
+    get_professions()
+    db = Connect()
+    ids = [r["tconst"] for r in db.run_query(TOP_MOVIES_QUERY, {"limit": movies})]
+    get_movies(ids)
+    print(f"[INFO] Warmed reference data ({len(ids)} movies) in {time.time() - start:.1f}s")
+
+
+_warm_started = False
+_warm_lock = threading.Lock()
+
+
+def warm_in_background():
+    """Starts warming once per process; later calls return immediately"""
+    global _warm_started
+    with _warm_lock:
+        if _warm_started:
+            return
+        _warm_started = True
+    threading.Thread(target=warm_reference_data, name="reference-warmup", daemon=True).start()
+
+
+def stats():
+    return [lookup_cache.stats(), movie_cache.stats()]
@@ -0,0 +1,151 @@
+"""
+Materialized per-user taste profiles.
+
+    (u:User)-[:COLLAB_WEIGHT {role, weight}]->(p:Person)      weight = SUM(rating / 5) over rated movies p worked on in `role`
+    (u:User)-[:GENRE_PROFILE {count, ratingSum}]->(g:Genre)   over rated movies in genre g
+
+Both are kept current by write_ratings() in the same transaction as the RATED writes, so
+recommendation and analytics reads cost O(profile) instead of O(ratings × crew).
+Backfill existing users with:
+
+    python -m Modules.TasteProfiles [--all]
+"""
+import argparse
+import time
+from Database.Neo4j_Connection import Connect
+from Modules.app_config import COLLAB_ROLES
+
+# Applies each rating and the delta it causes to its user's profile. Replaying a row is harmless:
+# the second application sees its own rating as the old one, so the delta is zero.
+RATING_WRITE_QUERY = """
+UNWIND $ratings AS row
+MERGE (u:User {username: row.user})
+WITH u, row
+MATCH (m:Movie {tconst: row.tconst})
+MERGE (u)-[r:RATED]->(m)
+WITH u, m, r, row, coalesce(r.rating, 0.0) AS old_rating, r.rating IS NULL AS is_new
+SET r.rating = row.rating,
+    r.discovery = row.discovery,
+    r.date = date(row.date),
+    r.time = time(row.time),
+    u.ratingsVersion = coalesce(u.ratingsVersion, 0) + 1
+WITH u, m, row.rating - old_rating AS delta, CASE WHEN is_new THEN 1 ELSE 0 END AS added
+
+CALL {
+    WITH u, m, delta
+    MATCH (m)<-[rel]-(p:Person)
+    WHERE type(rel) IN $roles
+    MERGE (u)-[w:COLLAB_WEIGHT {role: type(rel)}]->(p)
+    ON CREATE SET w.weight = 0.0
+    SET w.weight = w.weight + delta / 5.0
+}
+CALL {
+    WITH u, m, delta, added
+    MATCH (m)-[:HAS_GENRE]->(g:Genre)
+    MERGE (u)-[gp:GENRE_PROFILE]->(g)
+    ON CREATE SET gp.count = 0, gp.ratingSum = 0.0
+    SET gp.count = gp.count + added,
+        gp.ratingSum = gp.ratingSum + delta
+}
+RETURN DISTINCT u.username AS user, coalesce(u.profileBuilt, false) AS profile_built
+"""
+
+# Recomputes the whole profile from RATED edges
+REBUILD_QUERY = """
+MATCH (u:User {username: $user})
+OPTIONAL MATCH (u)-[old:COLLAB_WEIGHT|GENRE_PROFILE]->()
+DELETE old
+WITH DISTINCT u
+
+CALL {
+    WITH u
+    MATCH (u)-[r:RATED]->(:Movie)<-[rel]-(p:Person)
+    WHERE type(rel) IN $roles
+    WITH u, p, type(rel) AS role, SUM(r.rating / 5.0) AS weight
+    CREATE (u)-[:COLLAB_WEIGHT {role: role, weight: weight}]->(p)
+}
+CALL {
+    WITH u
+    MATCH (u)-[r:RATED]->(:Movie)-[:HAS_GENRE]->(g:Genre)
+    WITH u, g, count(*) AS count, SUM(r.rating) AS rating_sum
+    CREATE (u)-[:GENRE_PROFILE {count: count, ratingSum: rating_sum}]->(g)
+}
+SET u.profileBuilt = true
+"""
+
+PROFILE_BUILT_QUERY = "MATCH (u:User {username: $user}) RETURN coalesce(u.profileBuilt, false) AS built"
+
+# The user's current rating of one movie (shown before they rate it again)
+EXISTING_RATING_QUERY = "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie {tconst: $tconst}) RETURN r.rating AS rating"
+
+
+def rebuild_profile(tx, user):
+    tx.run(REBUILD_QUERY, {"user": user, "roles": COLLAB_ROLES}).consume()
+
+
+def write_ratings(tx, ratings):
+    """
+    Applies [{user, tconst, rating, discovery, date, time}] in one statement. A user whose profile
+    predates these ratings was never built, so it is derived from scratch instead.
+    Submitted ratings reach it only through Modules/RatingQueue.
+    """
+    for record in tx.run(RATING_WRITE_QUERY, {"ratings": ratings, "roles": COLLAB_ROLES}).data():
+        if not record["profile_built"]:
+            rebuild_profile(tx, record["user"])
+        _built_profiles.add(record["user"])
+
+
+# Users whose profile is known to exist, so the check below runs once per user per process
+_built_profiles = set()
+
+
+def mark_profile_built(user):
+    """For writers that rebuilt the profile themselves (e.g. bulk imports)"""
+    _built_profiles.add(user)
+
+
+def forget_profile(user):
+    """For writers that leave the profile stale until they finish (see ensure_profile)"""
+    _built_profiles.discard(user)
+
+
+def ensure_profile(user, db=None):
+    """Builds the user's profile if they rated movies before profiles existed"""
+    if user in _built_profiles:
+        return
+    db = db or Connect()
+    with db.session() as session:
+        built = session.run(PROFILE_BUILT_QUERY, {"user": user}).single()
+        if built is None:
+            return
+        if not built["built"]:
+            session.execute_write(rebuild_profile, user)
+    _built_profiles.add(user)
+
+
+# ==============================
+# BACKFILL
+# ==============================
+def backfill(db=None, rebuild_all=False):
+    db = db or Connect()
+    where = "" if rebuild_all else "WHERE NOT coalesce(u.profileBuilt, false)"
+    users = [r["username"] for r in db.run_query(f"MATCH (u:User) {where} RETURN u.username AS username")]
+    print(f"[INFO] Building taste profiles for {len(users)} users...")
+
+    start = time.time()
+    with db.session() as session:
+        for i, user in enumerate(users, 1):
+            session.execute_write(rebuild_profile, user)
+            if i % 100 == 0 or i == len(users):
+                print(f"[INFO] {i}/{len(users)} profiles built ({i / (time.time() - start):.1f} users/s)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill MovieQueue taste profiles")
+    parser.add_argument("--all", action="store_true", help="Rebuild every user's profile, not just missing ones")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    backfill(rebuild_all=args.all)
@@ -0,0 +1,153 @@
+import os
+
+# ===============================
+# Recommendation engine
+# ===============================
+
+# "cypher" scores inside Neo4j; "snapshot" scores in-process over a CSR copy of the graph;
+# "embeddings" looks up the movies nearest the user's taste vector (see Modules/MovieEmbeddings.py)
+RECOMMENDER_ENGINE = os.getenv("MOVIEQUEUE_RECOMMENDER", "cypher")
+
+# How long an in-process graph snapshot is served before it is reloaded in the background
+SNAPSHOT_REFRESH_SECONDS = int(os.getenv("MOVIEQUEUE_SNAPSHOT_REFRESH_SECONDS", 3600))
+
+# Candidates kept per request (highest numVotes first), before scoring
+RECOMMENDATION_LIMIT = 75
+
+# Collaborators expanded per role when generating candidates (highest profile weight first);
+# on a Neo4j out-of-memory error the cap is halved per genre down to COLLAB_CAP_MIN
+COLLAB_CAP_PER_ROLE = int(os.getenv("MOVIEQUEUE_COLLAB_CAP_PER_ROLE", 200))
+COLLAB_CAP_MIN = 10
+
+# Recommendation cards rendered (and detailed) per page
+RECOMMENDATION_PAGE_SIZE = 10
+
+# Person -> Movie relationships that count as collaborations
+COLLAB_ROLES = [
+    'ACTED_IN', 'DIRECTED', 'WROTE', 'PRODUCED', 'COMPOSED_SCORE_FOR',
+    'EDITED', 'SHOT', 'CAST', 'DESIGNED_PRODUCTION', 'ANIMATED'
+]
+
+# Score multiplier per role (everything else counts 1.0)
+ROLE_WEIGHTS = {
+    'ACTED_IN': 4.0,
+    'DIRECTED': 3.0,
+    'WROTE': 2.0,
+    'PRODUCED': 2.0,
+    'COMPOSED_SCORE_FOR': 2.0,
+}
+
+# Per-user recommendation result cache (entries are also dropped whenever the user rates a movie)
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("MOVIEQUEUE_RECOMMENDATION_CACHE_SIZE", 512))
+RECOMMENDATION_CACHE_TTL_SECONDS = int(os.getenv("MOVIEQUEUE_RECOMMENDATION_CACHE_TTL_SECONDS", 900))
+
+# ===============================
+# Movie title search
+# ===============================
+
+# "memory" searches a cached in-process prefix/trigram index; "fulltext" queries Neo4j's full-text index
+MOVIE_SEARCH_BACKEND = os.getenv("MOVIEQUEUE_SEARCH_BACKEND", "memory")
+
+# Name of the full-text index declared in Database/Schema.py
+MOVIE_TITLE_FULLTEXT_INDEX = "movie_title_fulltext"
+
+# How long the in-process title index is served before it is reloaded in the background
+SEARCH_INDEX_REFRESH_SECONDS = int(os.getenv("MOVIEQUEUE_SEARCH_INDEX_REFRESH_SECONDS", 3600))
+
+# Matches shown for each typed query
+SEARCH_RESULT_LIMIT = 10
+
+# ===============================
+# Precomputed recommendations
+# ===============================
+
+# Precomputed lists older than this are ignored and scored live instead
+PRECOMPUTE_MAX_AGE_SECONDS = int(os.getenv("MOVIEQUEUE_PRECOMPUTE_MAX_AGE_SECONDS", 24 * 3600))
+
+# Worker processes used by `python -m Modules.PrecomputeRecommendations`
+PRECOMPUTE_PROCESSES = int(os.getenv("MOVIEQUEUE_PRECOMPUTE_PROCESSES", os.cpu_count() or 1))
+
+# ===============================
+# Movie embeddings
+# ===============================
+
+# Written by `python -m Modules.MovieEmbeddings` and memory-mapped by the app (relative to the project root)
+EMBEDDINGS_DIR = os.getenv("MOVIEQUEUE_EMBEDDINGS_DIR", "Data/embeddings")
+
+# Dimensions of the collaborator block (truncated SVD of the movie x person credits)
+EMBEDDING_SVD_DIMS = 64
+
+# People need at least this many credits to contribute to the collaborator block
+EMBEDDING_MIN_CREDITS = 2
+
+# IVF lists built by the job (0 = square root of the catalogue) and how many are searched per query
+EMBEDDING_IVF_LISTS = 0
+EMBEDDING_NPROBE = int(os.getenv("MOVIEQUEUE_EMBEDDING_NPROBE", 16))
+
+# ===============================
+# Analytics
+# ===============================
+
+# Per-user analytics result cache (entries are also dropped whenever the user rates a movie)
+ANALYTICS_CACHE_SIZE = int(os.getenv("MOVIEQUEUE_ANALYTICS_CACHE_SIZE", 512))
+ANALYTICS_CACHE_TTL_SECONDS = int(os.getenv("MOVIEQUEUE_ANALYTICS_CACHE_TTL_SECONDS", 900))
+
+# Finished Plotly figures, keyed on a hash of the data they draw
+FIGURE_CACHE_SIZE = 1024
+FIGURE_CACHE_TTL_SECONDS = 3600
+
+# ===============================
+# Ratings
+# ===============================
+
+# Ratings written per UNWIND when importing a Letterboxd/IMDb export
+BULK_RATING_BATCH_SIZE = 1000
+
+# Submitted ratings are acknowledged once they are in this local SQLite queue (relative to the project root)
+RATING_QUEUE_PATH = os.getenv("MOVIEQUEUE_RATING_QUEUE", "Data/rating_queue.sqlite3")
+
+# The background flusher writes at most this many queued ratings per transaction, at least this often
+RATING_FLUSH_BATCH_SIZE = 500
+RATING_FLUSH_INTERVAL_SECONDS = float(os.getenv("MOVIEQUEUE_RATING_FLUSH_INTERVAL_SECONDS", 1.0))
+
+# Failed flushes are retried with exponential backoff, capped at this many seconds
+RATING_FLUSH_MAX_BACKOFF_SECONDS = 60
+
+# ===============================
+# Admin
+# ===============================
+
+# Comma-separated usernames allowed to open the admin pages (e.g. Query Stats)
+ADMIN_USERS = {u.strip() for u in os.getenv("MOVIEQUEUE_ADMINS", "").split(",") if u.strip()}
+
+# ===============================
+# Reference data
+# ===============================
+
+# Written by ETL/MovieQueueETL.py after every successful load (relative to the project root);
+# ETL/ETL_config.py reads the same variable
+ETL_MARKER_PATH = os.getenv("MOVIEQUEUE_ETL_MARKER", "Data/etl_completed.json")
+
+# Genres, professions and movie metadata are served from memory for this long
+REFERENCE_TTL_SECONDS = int(os.getenv("MOVIEQUEUE_REFERENCE_TTL_SECONDS", 6 * 3600))
+
+# Movies whose metadata is kept in memory at once, and how many of the most-voted are loaded at startup
+REFERENCE_MOVIE_CACHE_SIZE = 50_000
+REFERENCE_WARM_MOVIES = 5_000
+
+# How often the ETL marker is checked for changes
+REFERENCE_MARKER_CHECK_SECONDS = 30
+
+# ===============================
+# Authentication
+# ===============================
+
+# bcrypt work factor for new and upgraded hashes (each +1 doubles the cost of a login)
+BCRYPT_ROUNDS = int(os.getenv("MOVIEQUEUE_BCRYPT_ROUNDS", 12))
+
+# Most bcrypt calls that run at once; further logins wait (on their script thread) for a free worker
+AUTH_HASH_WORKERS = int(os.getenv("MOVIEQUEUE_AUTH_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Signed-in sessions are remembered for this long, so reruns and page switches do not run bcrypt again
+SESSION_TOKEN_TTL_SECONDS = int(os.getenv("MOVIEQUEUE_SESSION_TTL_SECONDS", 12 * 3600))
+SESSION_TOKEN_CACHE_SIZE = 10_000
@@ -1,34 +1,37 @@
 import streamlit as st
-import bcrypt
 from Database.Neo4j_Connection import Connect
-
-
-def create_user(username, password, db):
-    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-    with db.driver.session() as session:
-        session.run("CREATE (u:User {username: $username, password: $password})",
-                    username=username, password=hashed)
-
-def verify_user(username, password, db):
-    with db.driver.session() as session:
-        result = session.run("MATCH (u:User {username: $username}) RETURN u.password AS password",
-                             username=username)
-        record = result.single()
-        if record:
-            stored_hash = record["password"]
-            return bcrypt.checkpw(password.encode(), stored_hash.encode())
+from Modules import AuthService
+
+
+def restore_session():
+    """
+    True while this browser session holds a live token. The token is a bearer credential, so it
+    only ever lives in st.session_state (server side), never in the URL where it could be copied;
+    a full page reload therefore means logging in again.
+    """
+    username = AuthService.session_user(st.session_state.get("auth_token"))
+    if username is None:
+        # Expired or revoked (e.g. signed out in another tab)
+        if st.session_state.get("logged_in"):
+            st.session_state.logged_in = False
+            st.session_state.username = ""
+            st.session_state.auth_token = None
         return False
+    st.session_state.logged_in = True
+    st.session_state.username = username
+    return True
 
-def user_exists(username, db):
-    with db.driver.session() as session:
-        result = session.run("MATCH (u:User {username: $username}) RETURN u", username=username)
-        return result.single() is not None
+def sign_out():
+    AuthService.logout(st.session_state.get("auth_token"))
+    st.session_state.logged_in = False
+    st.session_state.username = ""
+    st.session_state.auth_token = None
 
 def login_blocker():
     if "logged_in" not in st.session_state:
         st.session_state.logged_in = False
 
-    if not st.session_state.logged_in:
+    if not restore_session():
         st.warning("You must login to access this page.")
         show_login()
         st.stop()
@@ -38,6 +41,7 @@ def init_session_state():
         st.session_state.logged_in = False
     if "username" not in st.session_state:
         st.session_state.username = ""
+    restore_session()
 
 def show_login():
 
@@ -58,9 +62,11 @@ def show_login():
             submitted = st.form_submit_button("🚪 Login")
 
             if submitted:
-                if verify_user(username, password, db):
+                token = AuthService.login(username, password, db)
+                if token:
                     st.session_state.logged_in = True
                     st.session_state.username = username
+                    st.session_state.auth_token = token
                     st.success("✅ Login successful! Use the sidebar to navigate.")
                     st.rerun()
                 else:
@@ -86,8 +92,7 @@ def show_login():
                     st.error("❌ Passwords do not match.")
                 elif len(password) < 4:
                     st.warning("⚠ Password should be at least 4 characters.")  # optional
-                elif not user_exists(username, db):
-                    create_user(username, password, db)
+                elif AuthService.register(username, password, db):
                     st.success("🎉 Account created! You can now login.")
                     st.session_state.show_register = False  # Return to login form
                 else:
@@ -1,6 +1,8 @@
 import streamlit as st
 from Modules.auth import init_session_state
 from Modules.Menu import global_sidebar
+from Modules.ReferenceData import warm_in_background
+from Modules.RatingQueue import get_queue
 
 st.set_page_config(page_title="MovieQueue | Welcome", page_icon="🎬", layout="wide")
 
@@ -11,6 +13,12 @@ st.set_page_config(page_title="MovieQueue | Welcome", page_icon="🎬", layout="
 init_session_state()
 global_sidebar()
 
+# Genres and popular movie metadata load once per server process, in the background
+warm_in_background()
+
+# Flushes ratings queued before a restart and keeps new ones flowing into Neo4j
+get_queue().start()
+
 # ------------------------
 # Public Home Page Content
 # ------------------------
@@ -2,6 +2,12 @@ import streamlit as st
 from Modules.Menu import global_sidebar
 from Modules.InitializeSessionStates import init_session_state
 from Database.Neo4j_Connection import Connect
+from Modules.MovieSearch import search_movies
+from Modules.ReferenceData import get_movie, get_movies
+from Modules.MovieEmbeddings import get_embeddings
+from Modules.TasteProfiles import EXISTING_RATING_QUERY
+from Modules.RatingQueue import enqueue, pending_rating
+from Modules.BulkRatings import import_ratings
 import datetime
 import pandas as pd
 
@@ -32,24 +38,28 @@ def show():
     # ---------- Autocomplete Search ----------
     st.subheader("Search Movie")
 
-    movie_query = """
-    MATCH (m:Movie)
-    OPTIONAL MATCH (m)-[:HAS_GENRE]->(g:Genre)
-    WITH m, collect(DISTINCT g.type) AS genres
-    RETURN m.tconst AS tconst, m.primaryTitle AS title, m.startYear AS year, m.runtimeMinutes AS runtime, m.averageRating AS rating, genres
-    ORDER BY m.primaryTitle
-    """
+    search_text = st.text_input("Start typing a title", placeholder="e.g. The Godfather")
+    matches = search_movies(search_text) if search_text else []
 
-    movies = db.run_query(movie_query)
-    movies = [dict(movie) for movie in movies]
-
-    movie_options = {f"{m['title']} ({m['year']})": m for m in movies}
-    selected_title = st.selectbox("Select Movie", [""] + list(movie_options.keys()))
+    # Keyed on tconst: different movies can share a title and year, and then also show their IMDb id
+    movie_labels = {m['tconst']: f"{m['title']} ({m['year']})" for m in matches}
+    repeated = {label for label in movie_labels.values() if list(movie_labels.values()).count(label) > 1}
+    movie_labels = {tconst: f"{label} · {tconst}" if label in repeated else label for tconst, label in movie_labels.items()}
+    selected_tconst = st.selectbox("Select Movie", [""] + list(movie_labels.keys()),
+                                   format_func=lambda tconst: movie_labels.get(tconst, ""))
 
     # ---------- Movie Info ----------
-    if selected_title and selected_title in movie_options:
-        movie = movie_options[selected_title]
-
+    movie = None
+    if selected_tconst in movie_labels:
+        tconst = selected_tconst
+        movie = get_movie(tconst)
+        existing = db.run_query(EXISTING_RATING_QUERY, {"user": st.session_state.username, "tconst": tconst})
+        # A rating still waiting in the write-behind queue is newer than what Neo4j has
+        queued = pending_rating(st.session_state.username, tconst)
+        if queued is not None:
+            existing = [{"rating": queued}]
+
+    if movie:
         with st.container():
             st.markdown("---")
             st.subheader(f"{movie['title']} ({movie['year']})")
@@ -61,9 +71,6 @@ def show():
             st.markdown(f"Genres: {genre_tags}", unsafe_allow_html=True)
 
             # Check if user already rated this
-            existing_rating_query = "MATCH (u:User {username: $user})-[r:RATED]->(m:Movie {tconst: $tconst}) RETURN r.rating AS rating"
-            existing = db.run_query(existing_rating_query, {"user": st.session_state.username, "tconst": movie['tconst']})
-
             if existing:
                 st.warning(f"You have already rated this movie: {existing[0]['rating']}/5")
 
@@ -80,29 +87,58 @@ def show():
 
             # ---------- Submit ----------
             if st.button("Submit Rating"):
-                db.run_query("""
-                    MERGE (u:User {username: $user})
-                    WITH u
-                    MATCH (m:Movie {tconst: $tconst})
-                    MERGE (u)-[r:RATED]->(m)
-                    SET r.rating = $rating,
-                        r.discovery = $discovery,
-                        r.date = date($date),
-                        r.time = time($time)
-                    """, {
-                        "user": st.session_state.username,
-                        "tconst": movie['tconst'],
-                        "rating": rating,
-                        "discovery": discovery,
-                        "date": watch_date.isoformat(),
-                        "time": watch_time.isoformat()
-                    })
+                # Acknowledged once it is in the local queue; the flusher writes it to Neo4j in the background
+                enqueue(
+                    st.session_state.username,
+                    movie['tconst'],
+                    rating,
+                    discovery,
+                    watch_date.isoformat(),
+                    watch_time.isoformat(),
+                )
 
                 st.success("✅ Rating submitted!")
-                st.rerun()
+
+            # ---------- More Like This ----------
+            embeddings = get_embeddings()
+            if embeddings is not None:
+                similar = embeddings.similar(movie['tconst'], k=5)
+                if similar:
+                    with st.expander("🎞 More like this"):
+                        details = get_movies([tconst for tconst, _ in similar])
+                        for tconst, similarity in similar:
+                            if tconst in details:
+                                st.write(f"**{details[tconst]['title']}** ({details[tconst]['year']}) · "
+                                         f"{similarity:.0%} similar")
 
     else:
-        st.info("Please select a movie to continue.")
+        st.info("Search for a movie and select it to continue.")
+
+    # ---------- Bulk Import ----------
+    st.markdown("---")
+    with st.expander("📥 Import your ratings from Letterboxd or IMDb"):
+        st.write("Upload `ratings.csv` (or `diary.csv`) from a Letterboxd export, or `ratings.csv` from IMDb. "
+                 "Movies you have already rated here are updated to the imported rating.")
+        upload = st.file_uploader("Export file", type="csv")
+        if upload is not None and st.button("Import Ratings"):
+            try:
+                with st.spinner("Matching titles and importing..."):
+                    result = import_ratings(st.session_state.username, upload, db)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                st.success(f"✅ Imported {result['written']} ratings from {result['source'].title()} "
+                           f"in {result['seconds']:.1f}s")
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Rows", result["rows"])
+                col2.metric("Matched", result["matched"])
+                col3.metric("Not found", len(result["unmatched"]))
+                st.caption(", ".join(f"{how}: {count}" for how, count in sorted(result["match_methods"].items()))
+                           + (f" · {result['duplicates']} repeats kept once" if result["duplicates"] else "")
+                           + (f" · {result['unrated']} rows without a rating skipped" if result["unrated"] else ""))
+                if len(result["unmatched"]):
+                    st.write("Not found in the MovieQueue catalogue:")
+                    st.dataframe(result["unmatched"], use_container_width=True, hide_index=True)
 
 
 
@@ -0,0 +1,81 @@
+import streamlit as st
+import pandas as pd
+from Modules.Menu import global_sidebar
+from Modules.InitializeSessionStates import init_session_state
+from Modules.app_config import ADMIN_USERS
+from Database.QueryStats import query_stats, SLOW_QUERY_MS
+from Modules import ReferenceData
+from Modules.RecommendMovies import recommendation_cache
+from Modules.GetAnalytics import analytics_cache
+from Modules.Analytics_Utils import figure_cache
+from Modules.AuthService import sessions
+from Modules.RatingQueue import get_queue
+
+from Modules.auth import login_blocker
+
+# protect the page
+login_blocker()
+
+st.set_page_config(page_title="Query Stats", page_icon="⏱", layout="wide")
+
+
+def show():
+    if st.session_state.username not in ADMIN_USERS:
+        st.warning("This page is only available to administrators.")
+        st.stop()
+
+    st.title("⏱ Query Stats")
+    st.caption(f"Every Neo4j query this app process has run, grouped by fingerprint. "
+               f"Read-only queries slower than {SLOW_QUERY_MS:.0f} ms get a PROFILE plan sampled in the background.")
+
+    st.subheader("Caches")
+    caches = ReferenceData.stats() + [recommendation_cache.stats(), analytics_cache.stats(), figure_cache.stats(), sessions.stats()]
+    st.dataframe(pd.DataFrame(caches).round(3), use_container_width=True, hide_index=True)
+    queue = get_queue().stats()
+    st.caption(f"Rating queue: {queue['pending']} pending, {queue['flushed']} flushed, "
+               f"{queue['failures']} consecutive failed flushes" + (f" (last error: {queue['last_error']})" if queue['last_error'] else ""))
+
+    st.subheader("Queries")
+    entries = query_stats.snapshot()
+    if not entries:
+        st.info("No queries recorded yet.")
+        return
+
+    df = pd.DataFrame(entries)
+    df["db_hits"] = [p.get("db_hits") if p else None for p in df["profile"]]
+    columns = ["id", "count", "errors", "p50_ms", "p95_ms", "p99_ms", "max_ms", "total_ms", "avg_rows",
+               "server_available_after_ms", "server_consumed_after_ms", "db_hits", "query"]
+    st.dataframe(df[columns].round(2), use_container_width=True, hide_index=True)
+
+    # Sampled plans
+    profiled = [e for e in entries if e["profile"]]
+    if profiled:
+        st.subheader("Sampled Plans")
+    for entry in profiled:
+        profile = entry["profile"]
+        with st.expander(f"{entry['id']} · p95 {entry['p95_ms']:.0f} ms · {profile.get('db_hits', 'n/a')} db hits"):
+            st.code(entry["query"], language="cypher")
+            if "error" in profile:
+                st.error(profile["error"])
+            else:
+                st.code("\n".join(
+                    f"{'  ' * step['depth']}{step['operator']}  rows={step['rows']}  dbHits={step['db_hits']}"
+                    for step in profile["plan"]
+                ))
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("Download JSON", query_stats.to_json(), "query_stats.json", "application/json")
+    with col2:
+        st.download_button("Download Prometheus", query_stats.to_prometheus(), "query_stats.prom", "text/plain")
+    with col3:
+        if st.button("Reset"):
+            query_stats.reset()
+            st.rerun()
+
+
+init_session_state()
+
+show()
+
+global_sidebar()